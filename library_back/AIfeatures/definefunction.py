@@ -1,18 +1,27 @@
+import logging
 import sqlite3
 import os
+import time
 
-from rich import print as rprint
+from .definesettings import get_embeddings, get_llm, singleton, INDEX_PATH, DB_PATH
 
-from langchain_community.vectorstores import FAISS
-from langchain_core.documents import Document
+logger = logging.getLogger(__name__)
 
-from .definesettings import llm, embeddings, INDEX_PATH, DB_PATH
 
 def get_vectorstore():
-    
+    """카테고리 벡터 인덱스 (프로세스에서 처음 부를 때 한 번만 불러온다. 카테고리가 없으면 None이고, 생길 때까지 매번 다시 확인한다.)"""
+    return singleton("vectorstore", load_vectorstore)
+
+
+def load_vectorstore():
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
+
+    embeddings = get_embeddings()
+
     # 1. 이미 저장된 벡터 DB가 있는지 확인 (재사용)
     if os.path.exists(INDEX_PATH):
-        print("저장된 벡터 인덱스를 불러옵니다...")
+        logger.info("저장된 벡터 인덱스를 불러옵니다...")
         # allow_dangerous_deserialization=True는 로컬 파일을 신뢰할 때 필요
         vectorstore = FAISS.load_local(
             INDEX_PATH, 
@@ -22,7 +31,7 @@ def get_vectorstore():
         return vectorstore
 
     # 2. 저장된 게 없다면? -> SQLite에서 읽어서 새로 생성 (최초 1회 실행)
-    print("새로운 벡터 인덱스를 생성합니다 (SQLite에서 로드하기)...")
+    logger.info("새로운 벡터 인덱스를 생성합니다 (SQLite에서 로드하기)...")
     
     # SQLite 연결
     if not os.path.exists(DB_PATH):
@@ -48,6 +57,16 @@ def get_vectorstore():
     vectorstore = FAISS.from_documents(documents, embeddings)
 
     vectorstore.save_local(INDEX_PATH)
-    rprint("인덱스 생성 및 저장 완료!")
+    logger.info("인덱스 생성 및 저장 완료!")
     
-    return vectorstore
\ No newline at end of file
+    return vectorstore
+
+
+def warmup():
+    """LLM / 임베딩 클라이언트와 벡터 인덱스를 미리 만들고 단계별 소요 시간(초)을 반환한다."""
+    timings = {}
+    for name, load in (("llm", get_llm), ("embeddings", get_embeddings), ("vectorstore", get_vectorstore)):
+        started = time.perf_counter()
+        load()
+        timings[name] = time.perf_counter() - started
+    return timings
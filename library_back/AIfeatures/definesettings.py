@@ -1,28 +1,69 @@
 import os
+import threading
+from pathlib import Path
+
 from dotenv import load_dotenv
-from rich import print as rprint
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
 
 load_dotenv()
 TTB_KEY = os.getenv('ALADIN_TTB_KEY')
 API_KEY = os.getenv('GMS_KEY')
+BASE_URL = "https://gms.ssafy.io/gmsapi/api.openai.com/v1"
 
 # 환경 변수 설정 (실제 키로 교체 필요)
-os.environ["OPENAI_API_KEY"] = API_KEY
-
-llm = ChatOpenAI(
-    model="gpt-4o-mini",
-    openai_api_key=os.getenv('GMS_KEY'),
-    base_url="https://gms.ssafy.io/gmsapi/api.openai.com/v1"
-)
-
-embeddings = OpenAIEmbeddings(
-    model="text-embedding-3-small",
-    openai_api_key=os.getenv('GMS_KEY'),
-    openai_api_base="https://gms.ssafy.io/gmsapi/api.openai.com/v1"
-)
+if API_KEY:
+    os.environ["OPENAI_API_KEY"] = API_KEY
 
 MY_PATH = os.getenv('DB_FILE_PATH')
 DB_PATH = MY_PATH
-print(DB_PATH)
-INDEX_PATH = "faiss_index"  # 벡터 DB가 저장될 폴더 이름
\ No newline at end of file
+# 벡터 DB가 저장될 폴더 (manage.py를 실행하는 위치와 상관없이 library_back/faiss_index)
+INDEX_PATH = str(Path(__file__).resolve().parent.parent / "faiss_index")
+
+# langchain / OpenAI 클라이언트는 import만 해도 몇 초가 걸려서 처음 쓰는 순간에 만든다.
+# (manage.py 명령, migrate, articles만 쓰는 요청은 이 비용을 내지 않는다. 미리 띄우려면 manage.py warmup)
+# vectorstore를 만들면서 embeddings를 꺼내기 때문에 RLock
+_lock = threading.RLock()
+_clients = {}
+
+
+def singleton(name, factory):
+    """
+    name으로 factory() 결과를 한 번만 만들어서 프로세스 안에서 같이 쓴다.
+    None(아직 만들 게 없음, 예: 카테고리가 없는 벡터 인덱스)은 기억하지 않고 다음 호출에서 다시 만든다.
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = factory()
+                if client is not None:
+                    _clients[name] = client
+    return client
+
+
+def _create_llm():
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        openai_api_key=API_KEY,
+        base_url=BASE_URL
+    )
+
+
+def _create_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        openai_api_key=API_KEY,
+        openai_api_base=BASE_URL
+    )
+
+
+def get_llm():
+    return singleton("llm", _create_llm)
+
+
+def get_embeddings():
+    return singleton("embeddings", _create_embeddings)
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 새 프로세스에서 django.setup()과 URLconf 로딩을 재고 무거운 모듈이 올라왔는지 본다.
+PROBE = """
+import json, os, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urlconf = time.perf_counter()
+result = {
+    "setup": setup - started,
+    "urlconf": urlconf - setup,
+    "modules": [name for name in ("langchain_core", "langchain_openai", "faiss") if name in sys.modules],
+}
+if "--warmup" in sys.argv:
+    from AIfeatures.definefunction import warmup
+    result["warmup"] = warmup()
+result["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "프로세스 시작 비용을 잽니다. 새 프로세스에서 django.setup()과 URLconf 로딩 시간, 최대 메모리, "
+        "langchain / faiss가 import됐는지를 --repeat번 재서 가장 빠른 값을 보여 줍니다. "
+        "--warmup이면 AI 클라이언트 / 벡터 인덱스를 불러오는 비용(첫 추천 요청이 내는 비용)도 잽니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="반복 횟수 (가장 빠른 값 사용)")
+        parser.add_argument("--warmup", action="store_true", help="AI 클라이언트 / 벡터 인덱스 로딩도 재기")
+
+    def _probe(self, warmup):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "library_back.settings")}
+        command = [sys.executable, "-c", PROBE] + (["--warmup"] if warmup else [])
+        completed = subprocess.run(command, cwd=Path(settings.BASE_DIR), env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "실패")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        results = [self._probe(options["warmup"]) for _ in range(options["repeat"])]
+        best = min(results, key=lambda result: result["setup"] + result["urlconf"])
+
+        self.stdout.write(
+            f"django.setup {best['setup'] * 1000:.0f}ms / URLconf {best['urlconf'] * 1000:.0f}ms / "
+            f"합계 {(best['setup'] + best['urlconf']) * 1000:.0f}ms (최대 RSS {best['rss_mb']:.0f}MB, {len(results)}회 중 최소)"
+        )
+        if best["modules"]:
+            self.stdout.write(self.style.WARNING(f"시작할 때 import된 무거운 모듈: {', '.join(best['modules'])}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("시작할 때 langchain / faiss를 import하지 않습니다."))
+        if "warmup" in best:
+            timings = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in best["warmup"].items())
+            self.stdout.write(f"warmup (첫 추천 요청 비용): {timings}")
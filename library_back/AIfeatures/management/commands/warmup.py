@@ -0,0 +1,29 @@
+import shutil
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from AIfeatures.definefunction import warmup
+from AIfeatures.definesettings import API_KEY, INDEX_PATH
+
+
+class Command(BaseCommand):
+    help = (
+        "AI 추천(AIfeatures)에 쓰는 LLM / 임베딩 클라이언트와 카테고리 벡터 인덱스를 미리 불러옵니다. "
+        "인덱스가 없으면 카테고리로 새로 만들어 저장합니다. (첫 추천 요청이 기다리지 않도록 배포 후 실행)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild-index", action="store_true", help="저장된 벡터 인덱스를 지우고 다시 만들기")
+
+    def handle(self, *args, **options):
+        if not API_KEY:
+            self.stdout.write(self.style.WARNING("GMS_KEY가 없어서 임베딩 / LLM 호출은 실패할 수 있습니다."))
+        if options["rebuild_index"] and Path(INDEX_PATH).exists():
+            shutil.rmtree(INDEX_PATH)
+            self.stdout.write(f"{INDEX_PATH}를 지웠습니다.")
+
+        timings = warmup()
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name:>12}: {seconds * 1000:.0f}ms")
+        self.stdout.write(self.style.SUCCESS(f"준비 완료 (총 {sum(timings.values()) * 1000:.0f}ms)"))
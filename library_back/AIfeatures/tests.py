@@ -1,3 +1,48 @@
-from django.test import TestCase
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import resolve
+
+from . import definefunction, definesettings
 
 # Create your tests here.
+
+
+class LazyClientTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(definesettings._clients, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_urlconf_does_not_create_clients(self):
+        resolve("/api/v1/aifeatures/recommends/")
+        self.assertEqual(definesettings._clients, {})
+
+    def test_singleton_created_once(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(definesettings.singleton("test", factory)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(map(id, results))), 1)
+
+    def test_singleton_does_not_remember_none(self):
+        # 카테고리가 없어서 None이던 벡터 인덱스는 카테고리가 생기면 다시 만든다.
+        vectorstore = object()
+        with mock.patch.object(definefunction, "load_vectorstore", side_effect=[None, vectorstore]) as load:
+            self.assertIsNone(definefunction.get_vectorstore())
+            self.assertIs(definefunction.get_vectorstore(), vectorstore)
+            self.assertIs(definefunction.get_vectorstore(), vectorstore)
+        self.assertEqual(load.call_count, 2)
@@ -1,15 +1,10 @@
+import logging
 import sqlite3
 import requests
 import json
 
-from rich import print as rprint
-
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-
 from .definefunction import get_vectorstore
-from .definesettings import llm, embeddings, DB_PATH, TTB_KEY
+from .definesettings import get_llm, DB_PATH, TTB_KEY
 
 from .serializers import RecommendationSerializer
 
@@ -17,23 +12,20 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view
 
-# 최초 실행시 FAITH 생성...
-vectorstore = get_vectorstore()
-# 있으면 저장된 파일을 불러온다.
-retriever = vectorstore.as_retriever()
+logger = logging.getLogger(__name__)
 
-# 벡터를 불러오는 것이 먼저겠어
-vectorstore = FAISS.load_local(
-    "faiss_index",
-    embeddings,
-    allow_dangerous_deserialization=True
-)
-retriever = vectorstore.as_retriever(search_kwargs={"k": 1})
+# 벡터 인덱스 / LLM은 URLconf를 읽을 때가 아니라 첫 요청에서 한 번만 불러온다. (AIfeatures.definesettings)
 
 # Create your views here.
 
 @api_view(['POST'])
 def recommends(request):
+    # langchain은 import 비용이 커서 실제로 쓰는 요청에서만 불러온다.
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    llm = get_llm()
+    vectorstore = get_vectorstore()
 
     # 1. AI는 관련된 카테고리를 골라야 한다.
     # retriever를 통해서 user_input과 관련된 문서를 가져온다.
@@ -41,8 +33,8 @@ def recommends(request):
 
     user_input = request.data.get('question')
 
-    # 완전 관계 없는 것은 추천할 수 없다.
-    found_docs_with_score = vectorstore.similarity_search_with_score(user_input, k=1)
+    # 완전 관계 없는 것은 추천할 수 없다. (카테고리가 없어서 인덱스가 없으면 바로 외부 검색)
+    found_docs_with_score = vectorstore.similarity_search_with_score(user_input, k=1) if vectorstore else []
 
     # 기본값으로 설정
     items_for_chain = "[]"
@@ -52,20 +44,22 @@ def recommends(request):
 
     if found_docs_with_score:
         doc, score = found_docs_with_score[0]
-        rprint(f"유사도 점수 확인: {score} (카테고리: {doc.page_content})")
+        logger.info("유사도 점수 확인: %s (카테고리: %s)", score, doc.page_content)
 
         # 점수가 임계값보다 낮아야(거리가 가까워야) 유효한 카테고리로 인정
         if score <= threshold:
-            rprint("[green]적절한 유사도를 가졌으니 내부 DB에서 검색을 실행합니다.[/green]")
+            logger.info("적절한 유사도를 가졌으니 내부 DB에서 검색을 실행합니다.")
             category_name = doc.page_content
-            print(f'일치하다고 생각되는 카테고리 : {category_name}')
+            logger.info("일치하다고 생각되는 카테고리 : %s", category_name)
             # DB 조회 실행
             items_for_chain = search_DB_books([doc], user_input, llm)
         else:
-            rprint("[yellow]유사도가 너무 낮아 카테고리 매칭을 건너뛰고 외부 검색을 실행합니다.[/yellow]")
+            logger.info("유사도가 너무 낮아 카테고리 매칭을 건너뛰고 외부 검색을 실행합니다.")
             # 이 경우 search_DB_books를 타지 않거나, 
             # 내부 로직에 의해 자동으로 외부 검색(search_aladin_books)이 실행되도록 유도
             items_for_chain = search_DB_books([], user_input, llm)
+    else:
+        items_for_chain = search_DB_books([], user_input, llm)
 
     # Chaining!
     # LangChain에서는 정확한 수행을 위해서 페르소나와 행동을 지정하라고 하던데...
@@ -109,17 +103,17 @@ def recommends(request):
 # 1순위는 받은 배열에 따라 분기를 나누느 함수이다.
 def search_DB_books(category_docs, user_query, llm):
     if not category_docs:
-        print("이건 검색결과입니다!")
+        logger.info("이건 검색결과입니다!")
         # 2순위인 검색 API를 불러오기로 했다.
         search_keyword = get_search_keyword(user_query, llm)
-        print(search_keyword)
+        logger.info("검색어 : %s", search_keyword)
         items = search_aladin_books(search_keyword)
         return json.dumps(items, ensure_ascii=False) # 데이터 포장!
     
     # 검색된 카테고리 정보 추출
     category_id = category_docs[0].metadata['id']
     category_name = category_docs[0].page_content
-    print(f"카테고리 : {category_name} (ID: {category_id})")
+    logger.info("카테고리 : %s (ID: %s)", category_name, category_id)
     
     # 위족에서 닫았기 때문에 다시 열어준다.
     conn = sqlite3.connect(DB_PATH)
@@ -135,7 +129,7 @@ def search_DB_books(category_docs, user_query, llm):
 
     # 데이터 가공하기
     if rows:
-        rprint(f"DB에서 {len(rows)}권의 책을 찾았습니다.")
+        logger.info("DB에서 %d권의 책을 찾았습니다.", len(rows))
         for row in rows:
             book_info = {
                 "title": row[1],       # 제목 컬럼 순서
@@ -147,16 +141,16 @@ def search_DB_books(category_docs, user_query, llm):
             
     try:
         items = selected_items # 배열의 형태로 받았다.
-        rprint('items에 값이 있습니다!')
+        logger.info("items에 값이 있습니다!")
 
         # 카테고리는 있어도, Books Table에는 매칭되지 않는 Category가 있을 수 있다.
         # 이 경우에도 검색 수행!
 
         if not items:
-            print("이건 검색결과입니다!")
+            logger.info("이건 검색결과입니다!")
             # 2순위인 검색 API를 불러오기로 했다.
             search_keyword = get_search_keyword(user_query, llm)
-            print(search_keyword)
+            logger.info("검색어 : %s", search_keyword)
             items = search_aladin_books(search_keyword)
         return json.dumps(items, ensure_ascii=False) # 데이터 포장!
     except:
@@ -164,7 +158,7 @@ def search_DB_books(category_docs, user_query, llm):
 
 # 2순위 실행 : 검색함수
 def search_aladin_books(user_query):
-    print(user_query)
+    logger.info("알라딘 검색 : %s", user_query)
     search_url = "http://www.aladin.co.kr/ttb/api/ItemSearch.aspx"
     params = {
         'ttbkey': TTB_KEY,
@@ -175,18 +169,19 @@ def search_aladin_books(user_query):
         'Version': '20131101'
     }
     response = requests.get(search_url, params=params)
-    print(response)
+    logger.info("알라딘 응답 : %s", response.status_code)
     return response.json().get('item', [])
 
 # 3순위 실행 : 키워드를 뽑아내는 또 다른 체이닝!
 def get_search_keyword(user_input, llm):
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
 
     template = """
     사용자의 요청({user_input})을 기반으로 책을 찾을 때 사용할 핵심 검색어 1개를 단 1개의 단어 형태로 응답하세요.
     (예시: 심리학, 에세이, 파이썬)
     """
     keyword_prompt = ChatPromptTemplate.from_template(template)
-    print(f'적절할 것 같은 검색어 : {keyword_prompt}')
     # Chaining!
     chain = keyword_prompt | llm | StrOutputParser()
     return chain.invoke({"user_input": user_input})
\ No newline at end of file
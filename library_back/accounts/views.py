@@ -1,3 +1,5 @@
+import logging
+
 from django.shortcuts import render
 from django.db import connection, transaction
 
@@ -7,19 +9,28 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
+from articles import leaderboard
 from articles.models import Comment
 
+logger = logging.getLogger(__name__)
+
 # Create your views here.
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def signout(request):
-    print("===========")
-    print(f'delete : {request.user}')
-    print("===========")
     user = request.user
+    logger.info("signout: %s", user)
     try:
-        Comment.objects.filter(user=user).delete()
+        with transaction.atomic():
+            # 책별 댓글 수는 미리 세지 않고 책마다 실제로 지운 행 수로 뺀다.
+            # (세고 나서 지우기 전에 다른 요청이 같은 댓글을 지우면 두 번 빠진다.)
+            comment_qs = Comment.objects.filter(user=user)
+            removed = {}
+            for book_id in comment_qs.order_by().values_list("book_id", flat=True).distinct():
+                _, deleted = comment_qs.filter(book_id=book_id).delete()
+                removed[book_id] = deleted.get(Comment._meta.label, 0)
+            leaderboard.record_comments({book_id: -count for book_id, count in removed.items()})
 
         with connection.cursor() as cursor:
             cursor.execute("PRAGMA foreign_keys = OFF;")
@@ -28,16 +39,13 @@ def signout(request):
             finally:
                 cursor.execute("PRAGMA foreign_keys = ON;")
 
-        print("...Complete!")
-        
         response = Response(status=status.HTTP_204_NO_CONTENT)
         response.delete_cookie('access_token')
         response.delete_cookie('refresh_token')
         return response
     
     except Exception as e:
-        print(type(e))
-        print(e)
+        logger.exception("signout failed: %s", user)
         return Response(
             {'error': 'Error!', 'details': str(e)}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -94,8 +102,6 @@ class CookieTokenObtainPairView(TokenObtainPairView):
             "access": access,
         }
 
-        print(response.data)
-
         return response
     
 class CookieTokenRefreshView(TokenRefreshView):
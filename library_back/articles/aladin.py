@@ -0,0 +1,207 @@
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from django.conf import settings
+
+from .importer import BookImporter
+from .models import Category, Checkpoint
+
+
+# 알라딘 ItemSearch API -> Book 동기화 (manage.py sync_aladin)
+# - Category 이름으로 검색해서 페이지를 넘기며 가져온다.
+# - 페이지 요청은 ThreadPoolExecutor(workers)에서 동시에 보내고, 전체 요청 속도는 token bucket으로 제한한다.
+# - DB 쓰기는 메인 스레드 한 곳에서 BookImporter로 batch upsert 한다.
+# - 카테고리별로 "여기까지 DB에 반영된 페이지"를 Checkpoint에 남겨서, 중간에 끊기면 다음 페이지부터 이어간다.
+
+CHECKPOINT = "aladin:{category_id}"
+
+# 알라딘 응답에 없는 author_info, author_photo는 기존 값을 지우지 않도록 갱신 대상에서 뺀다.
+UPDATE_FIELDS = (
+    "category", "title", "description", "cover", "publisher", "pub_date",
+    "author", "customer_review_rank", "subTitle", "updated_at",
+)
+
+MAX_PER_PAGE = 50
+
+
+class RateLimiter:
+    """초당 rate개, 최대 burst개까지 몰아서 쓸 수 있는 token bucket (스레드 간 공유)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class AladinError(Exception):
+    pass
+
+
+class AladinClient:
+    """ItemSearch 페이지 요청. 스레드마다 requests.Session을 따로 쓴다."""
+
+    def __init__(self, base_url=None, ttb_key=None, rate=None, timeout=10, retries=3):
+        self.base_url = base_url or settings.ALADIN_API_URL
+        self.ttb_key = ttb_key if ttb_key is not None else settings.ALADIN_TTB_KEY
+        self.limiter = RateLimiter(settings.ALADIN_SYNC_RATE if rate is None else rate)
+        self.timeout = timeout
+        self.retries = retries
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def search(self, query, page, per_page=MAX_PER_PAGE):
+        params = {
+            "ttbkey": self.ttb_key,
+            "Query": query,
+            "QueryType": "Keyword",
+            "SearchTarget": "Book",
+            "start": page,
+            "MaxResults": per_page,
+            "output": "js",
+            "Version": "20131101",
+        }
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self._session().get(self.base_url, params=params, timeout=self.timeout)
+                # 429 / 5xx는 잠깐 쉬었다가 다시 시도
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise AladinError(f"HTTP {response.status_code}")
+                response.raise_for_status()
+                return response.json()
+            except (requests.RequestException, ValueError, AladinError) as error:
+                if attempt == self.retries:
+                    raise AladinError(f"{query!r} page {page}: {error}") from error
+                time.sleep(0.5 * 2 ** attempt)
+
+
+class _CategoryState:
+    def __init__(self, category, committed=0, last_page=None, done=False):
+        self.category = category
+        # DB에 반영된 연속 페이지 끝 / 이번 실행의 첫 페이지
+        self.committed = committed
+        self.first_page = committed + 1
+        self.last_page = last_page
+        self.done = done
+        # DB에 반영됐지만 앞 페이지가 아직이라 committed를 못 올린 페이지
+        self.fetched = set()
+
+
+def _load_state(category, restart):
+    checkpoint = None if restart else Checkpoint.objects.filter(
+        name=CHECKPOINT.format(category_id=category.id)
+    ).first()
+    state = checkpoint.state if checkpoint else {}
+    return _CategoryState(
+        category,
+        committed=state.get("page", 0),
+        last_page=state.get("last_page"),
+        done=state.get("done", False),
+    )
+
+
+def _save_state(state):
+    Checkpoint.objects.update_or_create(
+        name=CHECKPOINT.format(category_id=state.category.id),
+        defaults={"state": {
+            "page": state.committed, "last_page": state.last_page, "done": state.done,
+        }},
+    )
+
+
+def sync(client, categories=None, max_pages=4, per_page=MAX_PER_PAGE, workers=None,
+         batch_size=500, restart=False, progress=None):
+    """
+    카테고리마다 최대 max_pages 페이지를 가져와서 upsert 하고 ImportResult를 반환한다.
+    restart=True면 Checkpoint를 무시하고 처음부터 가져온다.
+    """
+    workers = workers or settings.ALADIN_SYNC_WORKERS
+    per_page = min(per_page, MAX_PER_PAGE)
+    categories = categories if categories is not None else Category.objects.exclude(name="전체").order_by("id")
+
+    states = {}
+    for category in categories:
+        state = _load_state(category, restart)
+        if not state.done:
+            states[category.id] = state
+
+    # (category_id, page) 중 아이템까지 importer에 다 넣은 페이지. 다음 flush가 끝나야 DB에 반영된 것으로 본다.
+    fed = []
+
+    def on_flush(result):
+        touched = set()
+        for category_id, page in fed:
+            states[category_id].fetched.add(page)
+            touched.add(category_id)
+        fed.clear()
+        for category_id in touched:
+            state = states[category_id]
+            while state.committed + 1 in state.fetched:
+                state.fetched.discard(state.committed + 1)
+                state.committed += 1
+            state.done = state.last_page is not None and state.committed >= state.last_page
+            _save_state(state)
+        if progress:
+            progress(result)
+
+    importer = BookImporter(batch_size=batch_size, progress=on_flush, update_fields=UPDATE_FIELDS)
+
+    # 카테고리별 첫 페이지로 전체 페이지 수를 안 뒤에 나머지 페이지를 넣는다.
+    queue = deque((state, state.first_page) for state in states.values())
+    in_flight = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aladin") as pool:
+            while queue or in_flight:
+                # 결과가 메모리에 쌓이지 않도록 동시에 걸어두는 요청 수를 제한한다.
+                while queue and len(in_flight) < workers * 2:
+                    state, page = queue.popleft()
+                    future = pool.submit(client.search, state.category.name, page, per_page)
+                    in_flight[future] = (state, page)
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    state, page = in_flight.pop(future)
+                    data = future.result()
+
+                    if page == state.first_page:
+                        total = int(data.get("totalResults") or 0)
+                        state.last_page = min(max_pages, max(1, math.ceil(total / per_page)))
+                        queue.extend((state, next_page) for next_page in range(page + 1, state.last_page + 1))
+
+                    for item in data.get("item", []):
+                        item["category"] = state.category.id
+                        item.pop("categoryName", None)
+                        importer.feed(item)
+                    fed.append((state.category.id, page))
+    finally:
+        # 중간에 실패해도 이미 받은 페이지까지는 반영하고 Checkpoint를 남긴다.
+        result = importer.finish()
+        # 마지막 flush가 비어 있으면 on_flush가 안 불리므로 남은 페이지를 직접 반영
+        if fed:
+            on_flush(result)
+    return result
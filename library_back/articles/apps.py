@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ArticlesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'articles'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(_ensure_fts_triggers, sender=self)
+
+
+def _ensure_fts_triggers(using, **kwargs):
+    # 테이블을 다시 만드는 마이그레이션이 FTS 트리거를 지워도 검색이 말없이 비지 않도록
+    from .search import ensure_fts_triggers
+    ensure_fts_triggers(using)
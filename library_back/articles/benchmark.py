@@ -0,0 +1,254 @@
+import datetime
+import platform
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import Book, Comment, Favorite
+
+
+# REST API 부하 / 벤치마크 (manage.py bench_api)
+# endpoint마다 clients개 스레드가 동시에 요청을 보내고 지연 시간 p50/p95/p99, 처리량, 요청당 쿼리 수를 잰다.
+# - 기본은 프로세스 안에서 APIClient로 호출 (네트워크 없이 Django + DB만, 쿼리 수도 같이 잼)
+# - base_url을 주면 실행 중인 서버에 HTTP로 요청 (쿼리 수는 못 잼)
+
+API = "/api/v1/articles"
+
+
+class Context:
+    """요청 경로를 만들 때 쓰는 id 표본 (매 요청마다 DB를 보지 않도록 미리 뽑아둔다)"""
+
+    def __init__(self, sample_size=10000):
+        self.book_ids = list(Book.objects.order_by("?").values_list("id", flat=True)[:sample_size])
+        # 댓글이 많은 책 위주로 댓글 목록을 본다.
+        self.commented_book_ids = list(
+            Book.objects.filter(comment_count__gt=0).order_by("-comment_count")
+            .values_list("id", flat=True)[:1000]
+        ) or self.book_ids
+        user_ids = list(
+            Favorite.objects.order_by().values_list("user_id", flat=True).distinct()[:1000]
+        )
+        User = get_user_model()
+        self.users = list(User.objects.filter(id__in=user_ids)) or list(User.objects.all()[:100])
+        if not self.book_ids or not self.users:
+            raise ValueError("Benchmark needs at least one book and one user. Seed data first.")
+
+    def dataset(self):
+        return {
+            "books": Book.objects.count(),
+            "users": get_user_model().objects.count(),
+            "favorites": Favorite.objects.count(),
+            "comments": Comment.objects.count(),
+        }
+
+
+# endpoint 이름 -> (rng, ctx) -> (경로, 로그인 필요 여부)
+SCENARIOS = {
+    "books": lambda rng, ctx: (f"{API}/books/", False),
+    "books_detail": lambda rng, ctx: (f"{API}/books/{rng.choice(ctx.book_ids)}/", False),
+    "popular_books": lambda rng, ctx: (f"{API}/books/popular/", False),
+    "trending_books": lambda rng, ctx: (f"{API}/books/trending/?window={rng.choice(('24h', '7d'))}", False),
+    "recommended_books": lambda rng, ctx: (f"{API}/books/recommended/", True),
+    "comments": lambda rng, ctx: (f"{API}/books/{rng.choice(ctx.commented_book_ids)}/comments/", False),
+    "favorite": lambda rng, ctx: (f"{API}/favorites/", True),
+}
+
+
+class InProcessDriver:
+    """스레드마다 APIClient를 하나씩 쓰고 요청마다 실행된 쿼리 수를 센다."""
+
+    measures_queries = True
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _client(self, user):
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if user not in clients:
+            client = APIClient(HTTP_HOST="localhost")
+            if user is not None:
+                client.force_authenticate(user)
+            clients[user] = client
+        return clients[user]
+
+    def request(self, path, user):
+        client = self._client(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(path)
+        return response.status_code, len(queries), response.get("X-Cache")
+
+    def close_thread(self):
+        connection.close()
+
+
+class HttpDriver:
+    """실행 중인 서버(runserver, gunicorn 등)에 HTTP로 요청한다."""
+
+    measures_queries = False
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self._local = threading.local()
+        self._tokens = {}
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def request(self, path, user):
+        headers = {}
+        if user is not None:
+            if user.pk not in self._tokens:
+                self._tokens[user.pk] = str(AccessToken.for_user(user))
+            headers["Authorization"] = f"Bearer {self._tokens[user.pk]}"
+        response = self._session().get(self.base_url + path, headers=headers)
+        return response.status_code, None, response.headers.get("X-Cache")
+
+    def close_thread(self):
+        pass
+
+
+def percentile(sorted_values, p):
+    """정렬된 값의 p(0~100) 백분위수 (선형 보간)"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(samples, wall_time):
+    latencies = sorted(sample[0] for sample in samples)
+    errors = sum(1 for sample in samples if sample[1] >= 400)
+    queries = sorted(sample[2] for sample in samples if sample[2] is not None)
+    cache_hits = sum(1 for sample in samples if sample[3] == "HIT")
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / wall_time, 2) if wall_time else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+            **{
+                f"p{p}": round(percentile(latencies, p) * 1000, 3) if latencies else None
+                for p in (50, 95, 99)
+            },
+            "max": round(latencies[-1] * 1000, 3) if latencies else None,
+        },
+        "queries": {
+            "p50": percentile(queries, 50),
+            "max": queries[-1],
+        } if queries else None,
+        "cache_hit_ratio": round(cache_hits / len(samples), 3) if samples else None,
+    }
+
+
+def run_endpoint(name, driver, ctx, clients, requests_per_endpoint, warmup, random_seed):
+    scenario = SCENARIOS[name]
+    samples = []
+    lock = threading.Lock()
+
+    def call(rng):
+        path, needs_login = scenario(rng, ctx)
+        user = rng.choice(ctx.users) if needs_login else None
+        started = time.perf_counter()
+        status, query_count, cache_status = driver.request(path, user)
+        return time.perf_counter() - started, status, query_count, cache_status
+
+    def worker(index, count):
+        rng = random.Random(random_seed * 1000 + index)
+        local = []
+        try:
+            for _ in range(count):
+                local.append(call(rng))
+        finally:
+            driver.close_thread()
+        with lock:
+            samples.extend(local)
+
+    warmup_rng = random.Random(random_seed)
+    for _ in range(warmup):
+        call(warmup_rng)
+
+    counts = [requests_per_endpoint // clients + (1 if i < requests_per_endpoint % clients else 0)
+              for i in range(clients)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for future in [pool.submit(worker, i, count) for i, count in enumerate(counts)]:
+            future.result()
+    return summarize(samples, time.perf_counter() - started)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(endpoints=None, clients=8, requests_per_endpoint=500, warmup=20, base_url=None,
+        random_seed=0, progress=None):
+    """벤치마크를 돌리고 JSON으로 저장할 결과 dict를 반환한다."""
+    endpoints = endpoints or list(SCENARIOS)
+    driver = HttpDriver(base_url) if base_url else InProcessDriver()
+    ctx = Context()
+
+    results = {}
+    for name in endpoints:
+        results[name] = run_endpoint(name, driver, ctx, clients, requests_per_endpoint, warmup, random_seed)
+        if progress:
+            progress(name, results[name])
+
+    return {
+        "meta": {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+            "mode": "http" if base_url else "in-process",
+            "base_url": base_url,
+        },
+        "config": {
+            "clients": clients,
+            "requests_per_endpoint": requests_per_endpoint,
+            "warmup": warmup,
+            "random_seed": random_seed,
+        },
+        "dataset": ctx.dataset(),
+        "endpoints": results,
+    }
+
+
+def compare(previous, current):
+    """두 결과의 endpoint별 p95 / 처리량 변화 [(이름, 이전 p95, 현재 p95, 이전 rps, 현재 rps)]"""
+    rows = []
+    for name, result in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if before is None:
+            continue
+        rows.append((
+            name,
+            before["latency_ms"]["p95"], result["latency_ms"]["p95"],
+            before["throughput_rps"], result["throughput_rps"],
+        ))
+    return rows
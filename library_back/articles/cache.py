@@ -0,0 +1,92 @@
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from rest_framework import status
+
+from . import versioning
+
+
+# 조회 API 응답 캐시
+# 키 = endpoint + 쿼리 파라미터 + 응답 형식 + 데이터 버전(articles.versioning)
+# 데이터가 바뀌면 signal이 버전을 올리기 때문에 예전 키는 다시 읽히지 않고 timeout으로 사라진다.
+# 렌더링이 끝난 JSON bytes를 저장해서, 캐시 hit이면 queryset도 serializer도 타지 않는다.
+
+STATS_KEY = "response-cache:stats:{endpoint}:{kind}"
+
+_endpoints = set()
+
+
+def _count(endpoint, kind):
+    key = STATS_KEY.format(endpoint=endpoint, kind=kind)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def stats():
+    result = {}
+    for endpoint in sorted(_endpoints):
+        result[endpoint] = {
+            kind: cache.get(STATS_KEY.format(endpoint=endpoint, kind=kind), 0)
+            for kind in ("hits", "misses")
+        }
+    return result
+
+
+def cached_response(*scopes):
+    """
+    @api_view 아래에 붙여서 200 JSON 응답을 bytes로 캐시한다.
+    scopes: 이 응답이 의존하는 데이터 버전 (기본은 카탈로그)
+    """
+    scopes = scopes or (versioning.CATALOG,)
+
+    def decorator(view):
+        endpoint = view.__name__
+        _endpoints.add(endpoint)
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            renderer = request.accepted_renderer
+            if request.method != "GET" or renderer.format != "json":
+                return view(request, *args, **kwargs)
+
+            versions, _ = versioning.for_request(request, scopes)
+            stamp = "-".join(str(version) for version in versions)
+            raw = f"{request.get_full_path()}|{request.accepted_media_type}"
+            key = f"response-cache:{endpoint}:{stamp}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+            cached = cache.get(key)
+            if cached is not None:
+                _count(endpoint, "hits")
+                content, headers = cached
+                response = HttpResponse(content, content_type=renderer.media_type, headers=headers)
+                response["X-Cache"] = "HIT"
+                return response
+
+            _count(endpoint, "misses")
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK or not hasattr(response, "data"):
+                return response
+
+            content = renderer.render(
+                response.data,
+                request.accepted_media_type,
+                {"request": request, "response": response},
+            )
+            headers = {
+                name: value for name, value in response.items() if name.lower() != "content-type"
+            }
+            cache.set(key, (content, headers), settings.RESPONSE_CACHE_TIMEOUT)
+
+            response = HttpResponse(content, content_type=renderer.media_type, headers=headers)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
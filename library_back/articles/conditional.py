@@ -0,0 +1,40 @@
+import hashlib
+from functools import wraps
+
+from django.views.decorators.http import condition
+
+from . import versioning
+
+
+# 카탈로그 조회 API용 조건부 GET (ETag / Last-Modified)
+# ETag는 데이터 버전 + 요청 경로(쿼리 포함) + Accept로 만든다.
+# If-None-Match / If-Modified-Since가 맞으면 view 본문(queryset, serializer)을 타기 전에 304를 돌려준다.
+# 검증자는 2xx(와 304) 응답에만 붙인다. 404 / 400에 붙이면 클라이언트가 에러 응답을 캐시해 두고
+# 같은 ETag로 다시 물어봐서 304를 받게 된다.
+
+def catalog_conditional(*scopes):
+    scopes = scopes or (versioning.CATALOG,)
+
+    def etag(request, *args, **kwargs):
+        versions, _ = versioning.for_request(request, scopes)
+        raw = f"{versions}|{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        _, updated_at = versioning.for_request(request, scopes)
+        return updated_at
+
+    def decorator(func):
+        conditional_func = condition(etag_func=etag, last_modified_func=last_modified)(func)
+
+        @wraps(func)
+        def inner(request, *args, **kwargs):
+            response = conditional_func(request, *args, **kwargs)
+            if response.status_code != 304 and not 200 <= response.status_code < 300:
+                del response["ETag"]
+                del response["Last-Modified"]
+            return response
+
+        return inner
+
+    return decorator
@@ -0,0 +1,89 @@
+import csv
+import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Book
+
+
+# 도서 전체 내보내기 (GET /books/export/, manage.py export_books)
+# values().iterator(chunk_size)로 chunk씩 읽어서 한 줄씩 만들어 흘려보내므로
+# 모델 인스턴스도, 전체 목록도 메모리에 올리지 않는다.
+
+FIELDS = (
+    "id", "category_id", "title", "subTitle", "description", "isbn", "cover", "publisher",
+    "pub_date", "author", "author_info", "author_photo", "customer_review_rank",
+    "views", "comment_count", "score", "updated_at",
+)
+
+TYPES = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# StreamingHttpResponse에 한 줄씩 넘기면 write 호출이 너무 잦아서 이 크기만큼 모아서 보낸다.
+BUFFER_SIZE = 64 * 1024
+
+
+def parse_updated_since(value):
+    """ISO 날짜/시각 문자열 -> aware datetime, 형식이 틀리면 ValueError"""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime.datetime.combine(day, datetime.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, timezone.get_current_timezone())
+    return moment
+
+
+def rows(updated_since=None, chunk_size=2000):
+    queryset = Book.objects.order_by("id")
+    if updated_since is not None:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    return queryset.values_list(*FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _buffered(lines):
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _ndjson_lines(values):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for row in values:
+        yield encoder.encode(dict(zip(FIELDS, row))) + "\n"
+
+
+class _Echo:
+    # csv.writer가 쓴 한 줄을 그대로 돌려받기 위한 가짜 파일
+    def write(self, value):
+        return value
+
+
+def _csv_lines(values):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in values:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, "isoformat") else value for value in row
+        )
+
+
+def stream(export_type, updated_since=None, chunk_size=2000):
+    """export_type("ndjson" | "csv") 형식의 문자열 chunk를 차례로 돌려준다."""
+    values = rows(updated_since, chunk_size)
+    lines = _csv_lines(values) if export_type == "csv" else _ndjson_lines(values)
+    return _buffered(lines)
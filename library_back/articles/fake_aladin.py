@@ -0,0 +1,87 @@
+import json
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# 오프라인 테스트 / 벤치마크용 가짜 알라딘 ItemSearch 서버 (manage.py fake_aladin)
+# 같은 검색어 + 페이지면 항상 같은 아이템을 돌려준다.
+
+PATH = "/ttb/api/ItemSearch.aspx"
+
+WORDS = ("바다", "기억", "도시", "여름", "편지", "시간", "사람", "마음", "겨울", "나무", "숲", "거리")
+
+
+def make_item(query, index):
+    seed = zlib.crc32(query.encode())
+    rng = random.Random(seed * 100003 + index)
+    title = " ".join(rng.sample(WORDS, 2))
+    return {
+        "title": f"{title} {index}",
+        "author": f"작가{rng.randint(1, 500)} (지은이)",
+        "pubDate": (date(2000, 1, 1) + timedelta(days=rng.randint(0, 9000))).isoformat(),
+        "description": f"{query} 분야의 {title} 이야기. " * rng.randint(1, 5),
+        "isbn": f"{seed % 10 ** 4:04d}{index:06d}",
+        "isbn13": f"979{seed % 10 ** 4:04d}{index:06d}",
+        "cover": f"https://image.aladin.co.kr/product/fake/{index}.jpg",
+        "categoryName": f"국내도서>{query}",
+        "publisher": f"출판사{rng.randint(1, 50)}",
+        "customerReviewRank": rng.randint(0, 10),
+        "subInfo": {"subTitle": f"{query} 부제"},
+    }
+
+
+def make_handler(total, latency, error_rate):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body):
+            content = json.dumps(body, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != PATH:
+                return self._send(404, {"errorMessage": "Not found."})
+            if latency:
+                time.sleep(latency)
+            if error_rate and random.random() < error_rate:
+                return self._send(503, {"errorMessage": "Service unavailable."})
+
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            query = params.get("Query", "")
+            page = max(1, int(params.get("start", 1)))
+            per_page = min(50, max(1, int(params.get("MaxResults", 10))))
+            start = (page - 1) * per_page
+            items = [make_item(query, index) for index in range(start, min(start + per_page, total))]
+            self._send(200, {
+                "totalResults": total,
+                "startIndex": page,
+                "itemsPerPage": per_page,
+                "query": query,
+                "item": items,
+            })
+
+    return Handler
+
+
+def make_server(host="127.0.0.1", port=0, total=200, latency=0.0, error_rate=0.0):
+    """port=0이면 빈 포트를 잡는다. server.server_address로 실제 주소를 확인"""
+    return ThreadingHTTPServer((host, port), make_handler(total, latency, error_rate))
+
+
+def start_in_thread(**options):
+    """테스트용: 백그라운드 스레드에서 띄우고 (server, base_url)을 반환한다."""
+    server = make_server(**options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}{PATH}"
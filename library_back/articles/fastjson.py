@@ -0,0 +1,54 @@
+import functools
+
+import orjson
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+
+# 목록 API의 serializer 우회 경로 (settings.FAST_JSON_RESPONSES)
+# BookSerializer / PopularBookSerializer / CategoryListSerializer는 모델 필드를 그대로 옮기기만 해서
+# QuerySet.values()로 읽은 dict를 orjson으로 바로 인코딩해도 같은 JSON이 나온다.
+# 모델 인스턴스 생성, 필드별 to_representation, json.dumps를 모두 건너뛴다.
+# 출력은 DRF JSONRenderer와 바이트 단위로 같다. (compact, ensure_ascii=False, U+2028/U+2029 escape)
+
+LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+class Rows(list):
+    """FastJSONRenderer가 orjson으로 바로 인코딩하는 행 목록 (값은 str / int / None만)"""
+
+
+def enabled():
+    return settings.FAST_JSON_RESPONSES
+
+
+@functools.cache
+def field_names(serializer_class):
+    """serializer가 내려주는 필드 이름 (출력 순서 그대로)"""
+    return tuple(serializer_class().fields)
+
+
+def project(rows, names):
+    """values() dict에서 serializer 필드 순서대로 names만 남긴다. (cursor용으로 더 읽은 키 제거)"""
+    return Rows({name: row[name] for name in names} for row in rows)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Rows는 orjson으로, 나머지는 기존 JSONRenderer로 렌더링한다."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            type(data) is Rows
+            and self.compact and not self.ensure_ascii
+            and not self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            try:
+                content = orjson.dumps(data)
+            except orjson.JSONEncodeError:
+                # 64bit를 넘는 정수, 짝 없는 surrogate 등은 json.dumps에 맡긴다.
+                pass
+            else:
+                for raw, escaped in LINE_SEPARATORS:
+                    content = content.replace(raw, escaped)
+                return content
+        return super().render(data, accepted_media_type, renderer_context)
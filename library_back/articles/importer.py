@@ -0,0 +1,338 @@
+import gzip
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import ngram, versioning
+from .models import Book, Category
+
+
+# 대용량 도서 목록 가져오기 (manage.py import_books)
+# - JSON 배열(loaddata fixture 형식 / 필드 dict)과 NDJSON을 조금씩 읽으면서 한 건씩 꺼낸다.
+# - batch_size건씩 모아서 isbn 기준으로 이미 있는 책은 bulk_update, 없는 책은 bulk_create 한다.
+# - 메모리에는 읽기 버퍼 + 배치 하나만 올라가므로 파일 크기와 상관없이 사용량이 일정하다.
+# bulk 작업은 signal을 보내지 않으므로 배치마다 n-gram 색인을 직접 고치고, 끝나면 CATALOG 버전을 직접 올린다.
+
+# 가져올 때 덮어쓰는 필드 (views / comment_count / score / recommends는 건드리지 않음)
+UPDATE_FIELDS = (
+    "category", "title", "description", "cover", "publisher", "pub_date",
+    "author", "author_info", "author_photo", "customer_review_rank", "subTitle", "updated_at",
+)
+REQUIRED_FIELDS = ("isbn", "title", "pub_date", "category")
+OPTIONAL_TEXT_FIELDS = (
+    "description", "cover", "publisher", "author", "author_info", "author_photo", "subTitle",
+)
+
+# 알라딘 API 응답(item) 필드 이름 -> Book 필드 이름
+ALADIN_FIELDS = {
+    "pubDate": "pub_date",
+    "customerReviewRank": "customer_review_rank",
+    "categoryName": "category",
+}
+
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def open_source(path):
+    """'-'는 stdin, .gz는 압축을 풀면서 읽는다."""
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_records(stream, chunk_size=1 << 16):
+    """
+    JSON 배열 / NDJSON / 이어붙인 JSON 객체를 chunk_size씩 읽으면서 객체를 하나씩 돌려준다.
+    배열 전체를 json.load 하지 않으므로 파일이 커도 메모리는 한 chunk + 한 레코드 정도만 쓴다.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+    in_array = None
+    eof = False
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if in_array is None:
+                in_array = char == "["
+                if in_array:
+                    pos += 1
+                    continue
+            if in_array and char == ",":
+                pos += 1
+                continue
+            if in_array and char == "]":
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 레코드가 chunk 경계에서 잘렸을 수 있으니 더 읽어서 다시 시도
+                if eof or len(buffer) - pos > MAX_RECORD_SIZE:
+                    raise
+            else:
+                yield record
+                continue
+        elif eof:
+            if in_array:
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            return
+
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+
+class CategoryResolver:
+    """
+    category 값(pk / 이름 / 알라딘 categoryName '국내도서>소설/시/희곡>한국소설')을 Category id로 바꾼다.
+    전체 Category를 한 번만 읽어두고, create=True면 없는 이름은 배치 단위로 한꺼번에 만든다.
+    """
+
+    def __init__(self, create=False):
+        self.create = create
+        self.by_id = {}
+        self.by_name = {}
+        for category_id, name in Category.objects.values_list("id", "name"):
+            self.by_id[category_id] = category_id
+            self.by_name[name] = category_id
+
+    def _name(self, value):
+        if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+            return None
+        parts = [part.strip() for part in str(value).split(">") if part.strip()]
+        for part in parts:
+            if part in self.by_name:
+                return part
+        # 알라딘 경로면 두 번째 단계('국내도서' 다음)를 카테고리 이름으로 쓴다.
+        if len(parts) > 1:
+            return parts[1]
+        return parts[0] if parts else None
+
+    def missing(self, values):
+        names = set()
+        for value in values:
+            name = self._name(value)
+            if name is not None and name not in self.by_name:
+                names.add(name)
+        return names
+
+    def prepare(self, values):
+        """배치에 나온 category 값 중 없는 이름을 한 번에 만든다."""
+        if not self.create:
+            return
+        names = self.missing(values)
+        if not names:
+            return
+        Category.objects.bulk_create((Category(name=name) for name in names), ignore_conflicts=True)
+        for category_id, name in Category.objects.filter(name__in=names).values_list("id", "name"):
+            self.by_id[category_id] = category_id
+            self.by_name[name] = category_id
+
+    def resolve(self, value):
+        if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+            return self.by_id.get(int(value))
+        return self.by_name.get(self._name(value))
+
+
+def normalize(record):
+    """fixture 형식 / 필드 dict / 알라딘 item을 Book 필드 dict로 바꾼다."""
+    if not isinstance(record, dict):
+        raise ValidationError("Record must be a JSON object.")
+    if "fields" in record and "model" in record:
+        record = record["fields"]
+
+    row = {}
+    for key, value in record.items():
+        key = ALADIN_FIELDS.get(key, key)
+        if key in UPDATE_FIELDS or key == "isbn":
+            row[key] = value
+    # 알라딘은 isbn(10자리)과 isbn13을 같이 준다.
+    if record.get("isbn13"):
+        row["isbn"] = record["isbn13"]
+    if "subTitle" not in row and isinstance(record.get("subInfo"), dict):
+        row["subTitle"] = record["subInfo"].get("subTitle", "")
+    return row
+
+
+def _truncate(name, value):
+    # 선택 필드는 길이 초과로 행 전체를 버리지 않고 잘라서 넣는다. (기존 fixture에도 500자 넘는 author_info가 있음)
+    value = str(value or "")
+    max_length = Book._meta.get_field(name).max_length
+    return value[:max_length] if max_length else value
+
+
+def _update_rows(books, fields):
+    """
+    같은 UPDATE 문 하나를 executemany로 반복 실행한다.
+    bulk_update는 필드마다 CASE WHEN을 배치 크기만큼 늘어놓아서 배치가 커지면 오히려 느려진다.
+    """
+    quote = connection.ops.quote_name
+    meta = Book._meta
+    model_fields = [meta.get_field(name) for name in fields]
+    sql = "UPDATE {} SET {} WHERE {} = %s".format(
+        quote(meta.db_table),
+        ", ".join(f"{quote(model_field.column)} = %s" for model_field in model_fields),
+        quote(meta.pk.column),
+    )
+    params = [
+        [model_field.get_db_prep_save(getattr(book, model_field.attname), connection)
+         for model_field in model_fields] + [book.pk]
+        for book in books
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    invalid: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class BookImporter:
+    """
+    레코드를 feed()로 한 건씩 넣으면 batch_size건마다 upsert 한다. 마지막에 finish()를 호출해야 한다.
+    progress(result)는 배치가 반영될 때마다 호출된다.
+    update_fields: 이미 있는 책에서 덮어쓸 필드 (원본에 없는 필드를 빈 값으로 덮지 않도록 줄일 수 있음)
+    """
+
+    def __init__(self, batch_size=1000, create_categories=False, max_errors=20, progress=None,
+                 update_fields=UPDATE_FIELDS):
+        self.batch_size = batch_size
+        self.update_fields = tuple(update_fields)
+        self.max_errors = max_errors
+        self.progress = progress
+        self.categories = CategoryResolver(create=create_categories)
+        self.result = ImportResult()
+        self._batch = {}
+        self._started = time.perf_counter()
+
+    def _error(self, number, message):
+        self.result.invalid += 1
+        if len(self.result.errors) < self.max_errors:
+            self.result.errors.append(f"#{number}: {message}")
+
+    def feed(self, record):
+        self.result.rows += 1
+        try:
+            row = normalize(record)
+            missing = [name for name in REQUIRED_FIELDS if row.get(name) in (None, "")]
+            if missing:
+                raise ValidationError(f"Missing fields: {', '.join(missing)}")
+        except ValidationError as error:
+            self._error(self.result.rows, "; ".join(error.messages))
+            return
+
+        # 같은 배치 안에서 isbn이 겹치면 나중 것이 이긴다.
+        self._batch[str(row["isbn"]).strip()] = (self.result.rows, row)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def finish(self):
+        self.flush()
+        if self.result.created or self.result.updated:
+            versioning.bump(versioning.CATALOG)
+        self.result.elapsed = time.perf_counter() - self._started
+        return self.result
+
+    def _build(self, isbn, number, row):
+        category_id = self.categories.resolve(row["category"])
+        if category_id is None:
+            self._error(number, f"Unknown category: {row['category']!r}")
+            return None
+
+        values = {name: _truncate(name, row.get(name)) for name in OPTIONAL_TEXT_FIELDS}
+        values.update({
+            name: row[name] for name in ("title", "pub_date") if name in row
+        })
+        book = Book(isbn=isbn, category_id=category_id,
+                    customer_review_rank=row.get("customer_review_rank"), **values)
+        # 값이 빈 선택 필드는 blank 검사에서 뺀다. (category FK 검사는 resolver가 이미 함)
+        exclude = ["category", "recommends"] + [name for name in OPTIONAL_TEXT_FIELDS if not values[name]]
+        try:
+            book.clean_fields(exclude=exclude)
+        except ValidationError as error:
+            messages = [
+                f"{name}: {' '.join(errors)}" for name, errors in error.message_dict.items()
+            ]
+            self._error(number, "; ".join(messages))
+            return None
+        return book
+
+    def _book_grams(self, book_ids):
+        if not book_ids or not ngram.enabled():
+            return {}
+        books = Book.objects.filter(pk__in=book_ids).only("id", *ngram.SEARCH_FIELDS)
+        return {book.pk: ngram.book_grams(book) for book in books}
+
+    def flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, {}
+        self.categories.prepare(row["category"] for _, row in batch.values())
+
+        books = {}
+        for isbn, (number, row) in batch.items():
+            book = self._build(isbn, number, row)
+            if book is not None:
+                books[isbn] = book
+
+        with transaction.atomic():
+            # isbn이 중복된 기존 데이터가 있으면 가장 먼저 들어온 책을 갱신한다.
+            existing = dict(
+                Book.objects.filter(isbn__in=books).order_by("-id").values_list("isbn", "id")
+            )
+            now = timezone.now()
+            to_update, to_create = [], []
+            for isbn, book in books.items():
+                if isbn in existing:
+                    book.pk = existing[isbn]
+                    book.updated_at = now
+                    to_update.append(book)
+                else:
+                    to_create.append(book)
+            old_grams = self._book_grams([book.pk for book in to_update])
+            if to_update:
+                _update_rows(to_update, self.update_fields)
+            if to_create:
+                Book.objects.bulk_create(to_create, batch_size=self.batch_size)
+            if ngram.enabled():
+                # update_fields에 없는 검색 필드는 DB 값이 남아 있으므로 갱신한 책은 다시 읽는다.
+                new_grams = self._book_grams([book.pk for book in to_update])
+                new_grams.update((book.pk, ngram.book_grams(book)) for book in to_create)
+                ngram.update_books({
+                    book_id: (old_grams.get(book_id, set()), grams) for book_id, grams in new_grams.items()
+                })
+
+        self.result.created += len(to_create)
+        self.result.updated += len(to_update)
+        self.result.elapsed = time.perf_counter() - self._started
+        if self.progress:
+            self.progress(self.result)
+
+
+def import_books(records, **options):
+    """records(dict iterable)를 모두 가져오고 ImportResult를 반환한다."""
+    importer = BookImporter(**options)
+    for record in records:
+        importer.feed(record)
+    return importer.finish()
@@ -0,0 +1,69 @@
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Book, Comment
+
+
+# 인기 도서 리더보드
+# score(= views + comment_count)를 Book에 저장해 두고, 조회수/댓글이 바뀔 때마다 같이 올려준다.
+# ("-score", "-views", "-id") 인덱스를 타기 때문에 TOP N 조회는 N개만 읽으면 끝난다.
+# score가 같고 views도 같으면 댓글 수도 같으므로 예전의 "-comment_count" 정렬은 따로 필요 없다.
+
+ORDERING = ("-score", "-views", "-id")
+
+
+def _bulk_increment(deltas, *fields):
+    """{book_id: delta}를 UPDATE 한 번으로 fields에 더한다."""
+    deltas = {book_id: delta for book_id, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+
+    delta_expr = Case(
+        *[When(pk=book_id, then=Value(delta)) for book_id, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return Book.objects.filter(pk__in=deltas.keys()).update(
+        **{field: F(field) + delta_expr for field in fields}
+    )
+
+
+def record_views(deltas):
+    return _bulk_increment(deltas, "views", "score")
+
+
+def record_comments(deltas):
+    # 댓글 생성/삭제와 같은 transaction 안에서 불러야 comment_count가 어긋나지 않는다.
+    return _bulk_increment(deltas, "comment_count", "score")
+
+
+def _actual_comment_count():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(book=OuterRef("pk"))
+            .order_by()
+            .values("book")
+            .annotate(count=Count("id"))
+            .values("count")
+        ),
+        Value(0),
+    )
+
+
+def reconcile_comment_counts():
+    """comment_count가 실제 댓글 수와 다른 Book만 찾아서 고친다. 고친 권수를 반환"""
+    drifted_ids = list(
+        Book.objects.annotate(actual=_actual_comment_count())
+        .exclude(comment_count=F("actual"))
+        .values_list("id", flat=True)
+    )
+    if drifted_ids:
+        Book.objects.filter(id__in=drifted_ids).update(comment_count=_actual_comment_count())
+        Book.objects.filter(id__in=drifted_ids).update(score=F("views") + F("comment_count"))
+    return len(drifted_ids)
+
+
+def rebuild():
+    """comment_count를 맞춘 뒤 Book 전체의 score를 views + comment_count로 다시 계산한다."""
+    reconcile_comment_counts()
+    return Book.objects.update(score=F("views") + F("comment_count"))
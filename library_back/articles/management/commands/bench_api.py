@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from articles import benchmark, synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "REST API 벤치마크: endpoint마다 동시 클라이언트로 요청을 보내고 p50/p95/p99 지연 시간, 처리량, "
+        "요청당 쿼리 수를 JSON으로 저장합니다. --seed로 합성 데이터를 먼저 넣을 수 있습니다. "
+        "개발 DB를 건드리지 않으려면 LIBRARY_DB_PATH로 별도 DB 파일을 지정하세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", action="store_true", help="벤치마크 전에 합성 데이터 추가")
+        parser.add_argument("--books", type=int, default=100000)
+        parser.add_argument("--users", type=int, default=50000)
+        parser.add_argument("--favorites-per-user", type=int, default=10)
+        parser.add_argument("--comments", type=int, default=1000000)
+        parser.add_argument("--endpoints", default=",".join(benchmark.SCENARIOS),
+                            help="쉼표로 구분한 endpoint 이름")
+        parser.add_argument("--clients", type=int, default=8, help="동시 클라이언트(스레드) 수")
+        parser.add_argument("--requests", type=int, default=500, help="endpoint마다 보낼 요청 수")
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--base-url", default=None, help="실행 중인 서버 주소 (없으면 프로세스 안에서 호출)")
+        parser.add_argument("--random-seed", type=int, default=0)
+        parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본 benchmarks/<시각>-<commit>.json)")
+        parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON")
+
+    def handle(self, *args, **options):
+        endpoints = [name.strip() for name in options["endpoints"].split(",") if name.strip()]
+        unknown = set(endpoints) - set(benchmark.SCENARIOS)
+        if unknown:
+            raise CommandError(f"알 수 없는 endpoint: {', '.join(sorted(unknown))}")
+
+        if options["seed"]:
+            self.stdout.write("합성 데이터 추가 중...")
+            synthetic.seed(
+                books=options["books"],
+                users=options["users"],
+                favorites_per_user=options["favorites_per_user"],
+                comments=options["comments"],
+                random_seed=options["random_seed"],
+                progress=lambda name, count, seconds: self.stdout.write(f"  {name}: {count} ({seconds:.1f}s)"),
+            )
+
+        def progress(name, result):
+            latency = result["latency_ms"]
+            queries = result["queries"]["max"] if result["queries"] else "-"
+            self.stdout.write(
+                f"{name:<18} p50 {latency['p50']:>8.2f}ms  p95 {latency['p95']:>8.2f}ms  "
+                f"p99 {latency['p99']:>8.2f}ms  {result['throughput_rps']:>8.1f} req/s  "
+                f"쿼리 최대 {queries}  오류 {result['errors']}"
+            )
+
+        try:
+            result = benchmark.run(
+                endpoints=endpoints,
+                clients=options["clients"],
+                requests_per_endpoint=options["requests"],
+                warmup=options["warmup"],
+                base_url=options["base_url"],
+                random_seed=options["random_seed"],
+                progress=progress,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        output = options["output"]
+        if output is None:
+            stamp = result["meta"]["created_at"][:19].replace(":", "").replace("-", "")
+            output = Path(settings.BASE_DIR) / "benchmarks" / f"{stamp}-{(result['meta']['commit'] or 'unknown')[:8]}.json"
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        self.stdout.write(self.style.SUCCESS(f"결과 저장: {output}"))
+
+        if options["compare"]:
+            previous = json.loads(Path(options["compare"]).read_text(encoding="utf-8"))
+            self.stdout.write("endpoint           p95(이전 -> 현재)          req/s(이전 -> 현재)")
+            for name, before_p95, p95, before_rps, rps in benchmark.compare(previous, result):
+                self.stdout.write(
+                    f"{name:<18} {before_p95:>8.2f} -> {p95:>8.2f}ms ({(p95 - before_p95) / before_p95:+.0%})  "
+                    f"{before_rps:>8.1f} -> {rps:>8.1f} ({(rps - before_rps) / before_rps:+.0%})"
+                )
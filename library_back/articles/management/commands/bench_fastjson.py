@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from articles import fastjson
+from articles.models import Book
+from articles.serializers import BookSerializer, PopularBookSerializer
+
+SERIALIZERS = {
+    "book": BookSerializer,
+    "popular": PopularBookSerializer,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "목록 응답 생성 비교: ModelSerializer + JSONRenderer 와 values() + orjson(articles.fastjson). "
+        "행 수별로 쿼리부터 JSON bytes까지 걸린 시간을 재고, 두 출력이 바이트 단위로 같은지 확인합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000", help="쉼표로 구분한 행 수")
+        parser.add_argument("--serializer", choices=SERIALIZERS, default="book")
+        parser.add_argument("--repeat", type=int, default=3, help="크기마다 반복 횟수 (가장 빠른 값 사용)")
+
+    def handle(self, *args, **options):
+        serializer_class = SERIALIZERS[options["serializer"]]
+        names = fastjson.field_names(serializer_class)
+        sizes = [int(size) for size in options["sizes"].split(",") if size.strip()]
+        total = Book.objects.count()
+        if not total:
+            raise CommandError("책이 없습니다. manage.py generate_dataset으로 먼저 데이터를 넣으세요.")
+
+        def serializer_path(size):
+            books = Book.objects.order_by("id")[:size]
+            return JSONRenderer().render(serializer_class(books, many=True).data)
+
+        def fast_path(size):
+            rows = Book.objects.order_by("id").values(*names)[:size]
+            return fastjson.FastJSONRenderer().render(fastjson.project(rows, names))
+
+        self.stdout.write(f"serializer={serializer_class.__name__} books={total}")
+        self.stdout.write(f"{'rows':>8}{'serializer ms':>16}{'fastjson ms':>14}{'speedup':>10}{'bytes':>12}  same")
+        for size in sizes:
+            if size > total:
+                self.stdout.write(self.style.WARNING(f"{size}: 책이 {total}권뿐이라 {total}행으로 잽니다."))
+            timings = {}
+            outputs = {}
+            for name, build in (("serializer", serializer_path), ("fastjson", fast_path)):
+                best = None
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    outputs[name] = build(size)
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                timings[name] = best * 1000
+
+            same = outputs["serializer"] == outputs["fastjson"]
+            self.stdout.write(
+                f"{size:>8}{timings['serializer']:>16.1f}{timings['fastjson']:>14.1f}"
+                f"{timings['serializer'] / timings['fastjson']:>9.1f}x{len(outputs['fastjson']):>12}  "
+                + ("yes" if same else "NO")
+            )
+            if not same:
+                raise CommandError(f"{size}행: 두 출력이 다릅니다.")
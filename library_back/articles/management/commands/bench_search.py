@@ -0,0 +1,96 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from articles import ngram, search
+from articles.models import Book, BookNgram
+
+
+class Command(BaseCommand):
+    help = (
+        "검색 방식별 precision / recall과 지연 시간을 비교합니다. "
+        "(description icontains / FTS5 / n-gram, 정답은 검색어마다 어느 검색 필드엔가 부분 문자열로 들어 있는 책)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--query", action="append", dest="queries", help="검색어 (여러 번 지정 가능)")
+        parser.add_argument("--sample", type=int, default=20, help="검색어를 지정하지 않았을 때 뽑을 개수")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rows = list(Book.objects.values_list("id", *search.SEARCH_FIELDS))
+        documents = {row[0]: [(value or "").lower() for value in row[1:]] for row in rows}
+
+        if not BookNgram.objects.exists():
+            self.stdout.write("n-gram 색인이 비어 있어서 먼저 만듭니다...")
+            ngram.rebuild()
+
+        queries = options["queries"] or self._sample_queries(rows, options["sample"], options["seed"])
+        methods = {
+            "icontains(description)": self._icontains,
+            "fts5": self._fts,
+            # gram 교집합만 (부분 문자열 확인 전)
+            f"{ngram.ngram_size()}-gram 후보": ngram.candidate_ids,
+            f"{ngram.ngram_size()}-gram": self._ngram,
+        }
+        results = {name: {"precision": [], "recall": [], "latency": []} for name in methods}
+
+        for q in queries:
+            terms = ngram.tokenize(q)
+            truth = {
+                book_id for book_id, texts in documents.items()
+                if terms and all(any(term in text for text in texts) for term in terms)
+            }
+            if not truth:
+                continue
+            for name, method in methods.items():
+                found = set()
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    found = set(method(q))
+                    results[name]["latency"].append((time.perf_counter() - started) * 1000)
+                results[name]["recall"].append(len(found & truth) / len(truth))
+                # 찾은 게 없으면 틀린 것도 없다.
+                results[name]["precision"].append(len(found & truth) / len(found) if found else 1.0)
+
+        self.stdout.write(f"books={len(rows)} queries={len(queries)} repeat={options['repeat']}")
+        self.stdout.write(f"{'method':<24}{'precision':>10}{'recall':>8}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, result in results.items():
+            if not result["recall"]:
+                continue
+            latency = sorted(result["latency"])
+            p95 = latency[min(len(latency) - 1, int(len(latency) * 0.95))]
+            self.stdout.write(
+                f"{name:<24}{statistics.mean(result['precision']):>10.3f}{statistics.mean(result['recall']):>8.3f}"
+                f"{statistics.median(latency):>10.3f}{p95:>10.3f}"
+            )
+
+    def _sample_queries(self, rows, count, seed):
+        # 제목/설명 어절에서 2~4글자 부분 문자열을 뽑는다. (어절 중간도 포함)
+        rng = random.Random(seed)
+        tokens = [token for row in rows for token in ngram.tokenize(f"{row[1]} {row[5]}") if len(token) >= 2]
+        queries = set()
+        while tokens and len(queries) < count:
+            token = rng.choice(tokens)
+            length = rng.randint(2, min(4, len(token)))
+            start = rng.randint(0, len(token) - length)
+            queries.add(token[start:start + length])
+        return sorted(queries)
+
+    def _ngram(self, q):
+        return ngram.matching_books(q).values_list("id", flat=True)
+
+    def _icontains(self, q):
+        return Book.objects.filter(description__icontains=q).values_list("id", flat=True)
+
+    def _fts(self, q):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT rowid FROM articles_book_fts WHERE articles_book_fts MATCH %s",
+                [search.fts_query(q)],
+            )
+            return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from articles import ngram
+
+
+class Command(BaseCommand):
+    help = "Book 검색용 n-gram 역색인(BookNgram)을 처음부터 다시 만듭니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        gram_count = ngram.rebuild(batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{ngram.ngram_size()}-gram {gram_count}개 색인 완료 ({elapsed:.2f}s)"
+        ))
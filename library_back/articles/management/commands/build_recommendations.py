@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from articles import recommender
+
+
+class Command(BaseCommand):
+    help = "즐겨찾기 기반 협업 필터링 이웃(BookNeighbor)을 다시 계산합니다. (cron 등으로 주기 실행)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=None, help="책마다 저장할 이웃 수")
+        parser.add_argument("--max-per-user", type=int, default=None, help="사용자별로 사용할 최근 즐겨찾기 수")
+        parser.add_argument("--if-changed", action="store_true", help="마지막 계산 이후 즐겨찾기가 바뀌었을 때만 실행")
+
+    def handle(self, *args, **options):
+        if options["if_changed"] and not recommender.is_stale():
+            self.stdout.write("즐겨찾기 변경이 없어서 건너뜁니다.")
+            return
+
+        started = time.perf_counter()
+        count = recommender.rebuild(options["top_k"], options["max_per_user"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"이웃 {count}개 저장 완료 ({elapsed:.2f}s)"))
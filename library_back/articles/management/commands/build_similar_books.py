@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from articles import similarity
+
+
+class Command(BaseCommand):
+    help = (
+        "내용(description, author, category, publisher) 기반 유사 도서를 계산해서 Book.recommends에 저장합니다. "
+        "기본은 마지막 실행 이후 바뀐 책만 다시 계산합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="모든 책을 다시 계산")
+        parser.add_argument("--top-k", type=int, default=None, help="책마다 저장할 유사 도서 수")
+        parser.add_argument("--dimensions", type=int, default=None, help="feature hashing 차원 수")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = similarity.rebuild(
+            full=options["full"], top_k=options["top_k"], dimensions=options["dimensions"]
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{count}권의 유사 도서를 다시 계산했습니다. ({elapsed:.2f}s)"))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from articles import export
+
+
+class Command(BaseCommand):
+    help = "Book 전체를 NDJSON 또는 CSV로 내보냅니다. chunk 단위로 읽어서 바로 쓰므로 메모리 사용량이 일정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--type", choices=sorted(export.TYPES), default="ndjson")
+        parser.add_argument("--output", "-o", default="-", help="저장할 파일 경로 ('-'는 stdout)")
+        parser.add_argument("--updated-since", default=None, help="이 시각 이후 바뀐 책만 (ISO 8601)")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            updated_since = export.parse_updated_since(options["updated_since"])
+        except ValueError:
+            raise CommandError("--updated-since는 ISO 8601 날짜/시각이어야 합니다.")
+
+        started = time.perf_counter()
+        to_stdout = options["output"] == "-"
+        output = self.stdout if to_stdout else open(options["output"], "w", encoding="utf-8", newline="")
+        size = 0
+        try:
+            for chunk in export.stream(options["type"], updated_since, options["chunk_size"]):
+                if to_stdout:
+                    output.write(chunk, ending="")
+                else:
+                    output.write(chunk)
+                size += len(chunk)
+        finally:
+            if not to_stdout:
+                output.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(f"{size:,}자 내보내기 완료 ({elapsed:.2f}s)"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from articles import fake_aladin
+
+
+class Command(BaseCommand):
+    help = "오프라인 테스트 / 벤치마크용 가짜 알라딘 ItemSearch 서버를 띄웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--total", type=int, default=200, help="검색어마다 돌려줄 전체 결과 수")
+        parser.add_argument("--latency", type=float, default=0.0, help="요청마다 지연 시간(초)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="503을 돌려줄 비율 (0~1)")
+
+    def handle(self, *args, **options):
+        server = fake_aladin.make_server(
+            options["host"], options["port"],
+            total=options["total"], latency=options["latency"], error_rate=options["error_rate"],
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(
+            f"가짜 알라딘 서버: http://{host}:{port}{fake_aladin.PATH} (Ctrl+C로 종료)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
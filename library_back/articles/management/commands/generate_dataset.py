@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from articles import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "성능 측정용 합성 데이터(한국어 도서, 카테고리, 관심 카테고리가 있는 사용자, 즐겨찾기, 댓글, 조회수)를 "
+        "bulk insert로 추가합니다. 인기도는 Zipf 분포를 따릅니다. "
+        "개발 DB를 건드리지 않으려면 LIBRARY_DB_PATH로 별도 DB 파일을 지정하세요."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=100000)
+        parser.add_argument("--users", type=int, default=50000)
+        parser.add_argument("--favorites-per-user", type=float, default=10, help="사용자별 평균 즐겨찾기 수")
+        parser.add_argument("--comments", type=int, default=1000000)
+        parser.add_argument("--views", type=int, default=None, help="새 책에 나눠줄 조회수 합계 (기본 책 수 x 50)")
+        parser.add_argument("--zipf", type=float, default=1.1, help="Zipf 지수 (클수록 인기 책에 몰림)")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        def progress(name, count, seconds):
+            rate = count / seconds if seconds else 0
+            self.stdout.write(f"{name:<16} {count:>10,}건 {seconds:>7.1f}s ({rate:,.0f}건/s)")
+
+        started = time.perf_counter()
+        created = synthetic.seed(
+            books=options["books"],
+            users=options["users"],
+            favorites_per_user=options["favorites_per_user"],
+            comments=options["comments"],
+            views=options["views"],
+            zipf_exponent=options["zipf"],
+            batch_size=options["batch_size"],
+            random_seed=options["random_seed"],
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"합계 {sum(created.values()):,}건 추가 ({elapsed:.1f}s). "
+            "검색 n-gram 색인과 추천 / 유사 도서는 build_* 명령으로 다시 만드세요."
+        ))
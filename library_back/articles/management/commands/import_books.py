@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from articles import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "JSON 배열(fixture 형식 포함) / NDJSON 도서 목록을 조금씩 읽으면서 isbn 기준으로 "
+        "batch 단위 upsert 합니다. '-'는 stdin, .gz는 압축을 풀면서 읽습니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="가져올 파일 경로")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--create-categories", action="store_true",
+                            help="없는 카테고리 이름은 새로 만듦 (기본은 해당 행을 건너뜀)")
+        parser.add_argument("--progress-every", type=int, default=50000,
+                            help="이 행 수마다 진행 상황 출력")
+
+    def handle(self, *args, **options):
+        progress_every = options["progress_every"]
+        last_report = [0]
+
+        def progress(result):
+            if result.rows - last_report[0] >= progress_every:
+                last_report[0] = result.rows
+                self.stdout.write(
+                    f"{result.rows}행 처리 (추가 {result.created} / 갱신 {result.updated} / "
+                    f"오류 {result.invalid}) {result.rows_per_second:,.0f}행/s"
+                )
+
+        try:
+            with importer.open_source(options["path"]) as stream:
+                result = importer.import_books(
+                    importer.iter_records(stream),
+                    batch_size=options["batch_size"],
+                    create_categories=options["create_categories"],
+                    progress=progress,
+                )
+        except OSError as error:
+            raise CommandError(f"파일을 열 수 없습니다: {error}")
+        except ValueError as error:
+            raise CommandError(f"JSON 형식 오류: {error}")
+
+        for message in result.errors:
+            self.stderr.write(message)
+        if result.invalid > len(result.errors):
+            self.stderr.write(f"... 외 {result.invalid - len(result.errors)}건")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.rows}행 처리: 추가 {result.created}권, 갱신 {result.updated}권, 오류 {result.invalid}건 "
+            f"({result.elapsed:.2f}s, {result.rows_per_second:,.0f}행/s)"
+        ))
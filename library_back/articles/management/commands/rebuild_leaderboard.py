@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from articles import leaderboard
+
+
+class Command(BaseCommand):
+    help = "인기 도서 리더보드(Book.score)를 views + 댓글 수로 처음부터 다시 계산합니다."
+
+    def handle(self, *args, **options):
+        updated = leaderboard.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"{updated}권의 score를 다시 계산했습니다."))
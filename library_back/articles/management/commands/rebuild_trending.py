@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from articles import trending
+
+
+class Command(BaseCommand):
+    help = (
+        "최근 인기 점수(articles.trending)를 정리합니다. 기본은 compaction(시간 bucket 합치기 / 오래된 bucket 삭제 / "
+        "rebase)이고, --rebuild면 남아 있는 이벤트로 점수를 처음부터 다시 계산합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="이벤트로 점수 다시 계산")
+
+    def handle(self, *args, **options):
+        result = trending.compact(force=True)
+        self.stdout.write(
+            f"compaction: 하루 단위로 합친 bucket {result['rolled_up']}개, 삭제 {result['deleted']}개"
+            + (", rebase 함" if result["rebased"] else "")
+        )
+        if options["rebuild"]:
+            count = trending.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"점수 {count}개를 다시 계산했습니다."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from articles import leaderboard
+
+
+class Command(BaseCommand):
+    help = "Book.comment_count를 실제 댓글 수와 비교해서 어긋난 책만 다시 맞춥니다."
+
+    def handle(self, *args, **options):
+        fixed = leaderboard.reconcile_comment_counts()
+        if fixed:
+            self.stdout.write(self.style.WARNING(f"{fixed}권의 comment_count를 바로잡았습니다."))
+        else:
+            self.stdout.write(self.style.SUCCESS("어긋난 comment_count가 없습니다."))
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from articles import aladin
+from articles.models import Category
+
+
+class Command(BaseCommand):
+    help = (
+        "알라딘 ItemSearch API에서 카테고리별로 도서를 가져와 isbn 기준으로 upsert 합니다. "
+        "카테고리별 진행 상황을 Checkpoint에 남겨서 중간에 끊기면 이어서 가져옵니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--category", type=int, action="append", help="카테고리 id (여러 번 지정 가능, 기본은 전체)")
+        parser.add_argument("--pages", type=int, default=4, help="카테고리마다 가져올 최대 페이지 수")
+        parser.add_argument("--per-page", type=int, default=aladin.MAX_PER_PAGE)
+        parser.add_argument("--workers", type=int, default=None, help="동시에 요청하는 스레드 수")
+        parser.add_argument("--rate", type=float, default=None, help="초당 최대 요청 수 (0이면 제한 없음)")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--base-url", default=None, help="ItemSearch 주소 (fake_aladin 서버 등)")
+        parser.add_argument("--ttb-key", default=None)
+        parser.add_argument("--restart", action="store_true", help="Checkpoint를 무시하고 처음부터")
+
+    def handle(self, *args, **options):
+        categories = None
+        if options["category"]:
+            categories = list(Category.objects.filter(id__in=options["category"]).order_by("id"))
+            if not categories:
+                raise CommandError("해당하는 카테고리가 없습니다.")
+
+        client = aladin.AladinClient(
+            base_url=options["base_url"], ttb_key=options["ttb_key"], rate=options["rate"]
+        )
+
+        def progress(result):
+            self.stdout.write(
+                f"{result.rows}건 처리 (추가 {result.created} / 갱신 {result.updated} / 오류 {result.invalid}) "
+                f"{result.rows_per_second:,.0f}건/s"
+            )
+
+        try:
+            result = aladin.sync(
+                client,
+                categories=categories,
+                max_pages=options["pages"],
+                per_page=options["per_page"],
+                workers=options["workers"],
+                batch_size=options["batch_size"],
+                restart=options["restart"],
+                progress=progress,
+            )
+        except aladin.AladinError as error:
+            raise CommandError(f"알라딘 요청 실패: {error} (다시 실행하면 이어서 가져옵니다)")
+
+        for message in result.errors:
+            self.stderr.write(message)
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.rows}건 처리: 추가 {result.created}권, 갱신 {result.updated}권, 오류 {result.invalid}건 "
+            f"({result.elapsed:.2f}s, {result.rows_per_second:,.0f}건/s)"
+        ))
@@ -0,0 +1,46 @@
+import datetime
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from articles import recommender
+from articles.serializers import BookSerializer
+
+
+class Command(BaseCommand):
+    help = "최근 활동한 사용자(로그인, 댓글)의 추천 결과를 미리 계산해서 추천 캐시에 넣어 둡니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="최근 며칠 안에 활동한 사용자")
+        parser.add_argument("--limit", type=int, default=None, help="최대 사용자 수")
+        parser.add_argument("--force", action="store_true", help="이미 캐시된 사용자도 다시 계산")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - datetime.timedelta(days=options["days"])
+        user_qs = (
+            get_user_model().objects
+            .filter(Q(last_login__gte=since) | Q(comment__created_at__gte=since.date()))
+            .order_by("-last_login")
+            .values_list("id", flat=True)
+            .distinct()
+        )
+        if options["limit"]:
+            user_qs = user_qs[: options["limit"]]
+
+        started = time.perf_counter()
+        warmed = skipped = 0
+        for user_id in user_qs.iterator():
+            if not options["force"] and recommender.get_cached(user_id) is not None:
+                skipped += 1
+                continue
+            serializer = BookSerializer(recommender.recommend_for_user(user_id), many=True)
+            recommender.set_cached(user_id, list(serializer.data))
+            warmed += 1
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"추천 캐시 warm-up: {warmed}명 계산, {skipped}명 건너뜀 ({elapsed:.2f}s)"
+        ))
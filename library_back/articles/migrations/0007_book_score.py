@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:19
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_score(apps, schema_editor):
+    Book = apps.get_model('articles', 'Book')
+    Comment = apps.get_model('articles', 'Comment')
+    comment_count = (
+        Comment.objects.filter(book=OuterRef('pk'))
+        .order_by()
+        .values('book')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Book.objects.update(score=F('views') + Coalesce(Subquery(comment_count), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0006_book_book_category_id_idx_book_book_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='score',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-score', '-views', '-id'], name='book_popular_idx'),
+        ),
+        migrations.RunPython(fill_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:21
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Book = apps.get_model('articles', 'Book')
+    Comment = apps.get_model('articles', 'Comment')
+    comment_count = (
+        Comment.objects.filter(book=OuterRef('pk'))
+        .order_by()
+        .values('book')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Book.objects.update(comment_count=Coalesce(Subquery(comment_count), Value(0)))
+    Book.objects.update(score=F('views') + F('comment_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0007_book_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
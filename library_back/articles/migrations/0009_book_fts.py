@@ -0,0 +1,76 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:21
+
+from django.db import migrations
+
+# Book 검색용 SQLite FTS5 인덱스 (articles.search)
+# content='articles_book' 외부 콘텐츠 테이블이라 본문은 중복 저장하지 않고,
+# 검색 대상 컬럼이 바뀔 때만 트리거로 인덱스를 고친다. (views/score UPDATE에는 반응하지 않음)
+
+FTS_COLUMNS = 'title, "subTitle", author, publisher, description'
+NEW_VALUES = 'new.title, new."subTitle", new.author, new.publisher, new.description'
+OLD_VALUES = 'old.title, old."subTitle", old.author, old.publisher, old.description'
+
+CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE articles_book_fts USING fts5(
+        {FTS_COLUMNS},
+        content='articles_book', content_rowid='id', tokenize='unicode61'
+    )
+    """,
+    "INSERT INTO articles_book_fts(articles_book_fts) VALUES ('rebuild')",
+    f"""
+    CREATE TRIGGER articles_book_fts_ai AFTER INSERT ON articles_book BEGIN
+        INSERT INTO articles_book_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {NEW_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER articles_book_fts_ad AFTER DELETE ON articles_book BEGIN
+        INSERT INTO articles_book_fts(articles_book_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, {OLD_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER articles_book_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON articles_book BEGIN
+        INSERT INTO articles_book_fts(articles_book_fts, rowid, {FTS_COLUMNS})
+        VALUES ('delete', old.id, {OLD_VALUES});
+        INSERT INTO articles_book_fts(rowid, {FTS_COLUMNS}) VALUES (new.id, {NEW_VALUES});
+    END
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS articles_book_fts_au",
+    "DROP TRIGGER IF EXISTS articles_book_fts_ad",
+    "DROP TRIGGER IF EXISTS articles_book_fts_ai",
+    "DROP TABLE IF EXISTS articles_book_fts",
+]
+
+
+# SQLite에서 articles_book을 다시 만드는 마이그레이션(AddField / AlterField 등)은 트리거를 같이 지운다.
+# 그런 마이그레이션 뒤에 트리거를 다시 만들고 인덱스를 다시 채우는 데 쓴다.
+RECREATE_TRIGGERS_SQL = [
+    *DROP_SQL[:3],
+    *CREATE_SQL[2:],
+    CREATE_SQL[1],
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # FTS5는 SQLite 전용, 다른 DB에서는 articles.search가 icontains로 대신 찾는다.
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0008_book_comment_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
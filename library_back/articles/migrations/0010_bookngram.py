@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0009_book_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookNgram',
+            fields=[
+                ('gram', models.CharField(max_length=16, primary_key=True, serialize=False)),
+                ('postings', models.BinaryField()),
+            ],
+        ),
+    ]
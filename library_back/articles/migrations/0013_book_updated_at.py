@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:31
+
+from importlib import import_module
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# SQLite에서 AddField(default)는 articles_book을 새로 만들어 복사하는 방식이라
+# 0009_book_fts의 FTS 트리거가 같이 지워진다. 트리거를 다시 만들고 인덱스를 다시 채운다.
+book_fts = import_module('articles.migrations.0009_book_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0012_bookneighbor_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(book_fts._run(book_fts.RECREATE_TRIGGERS_SQL), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:34
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# SQLite에서 AlterField는 articles_book을 새로 만들어 복사하는 방식이라 FTS 트리거를 다시 만든다. (0013과 같음)
+book_fts = import_module('articles.migrations.0009_book_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0013_book_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='isbn',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+        migrations.RunPython(book_fts._run(book_fts.RECREATE_TRIGGERS_SQL), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-18 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0015_comment_book_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['category', '-views', '-id'], name='book_category_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['category', '-pub_date', '-id'], name='book_category_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['category', '-customer_review_rank', '-id'], name='book_category_rank_idx'),
+        ),
+    ]
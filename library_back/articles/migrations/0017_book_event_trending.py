@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0016_book_category_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField()),
+                ('hour', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='articles.book')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='bookevent_hour_idx')],
+                'unique_together': {('book', 'kind', 'hour')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(max_length=8)),
+                ('score', models.FloatField(default=0)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='articles.book')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['window', '-score', '-book'], name='trending_window_score_idx')],
+                'unique_together': {('book', 'window')},
+            },
+        ),
+    ]
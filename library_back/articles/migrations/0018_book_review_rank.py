@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:28
+
+from importlib import import_module
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+# NOT NULL 컬럼 추가라 SQLite에서는 articles_book을 다시 만든다. FTS 트리거를 다시 만든다. (0013과 같음)
+book_fts = import_module('articles.migrations.0009_book_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0017_book_event_trending'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='book',
+            name='book_category_rank_idx',
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='review_rank',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce('customer_review_rank', models.Value(-1)), output_field=models.IntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['category', '-review_rank', '-id'], name='book_category_rank_idx'),
+        ),
+        migrations.RunPython(book_fts._run(book_fts.RECREATE_TRIGGERS_SQL), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # 자동으로 만들어진 Book.recommends 테이블(articles_book_recommends)을 그대로 through 모델로 쓰고
+    # rank / score 컬럼만 더한다. 기존 목록은 rank = 0, score = 0으로 남는다.
+
+    dependencies = [
+        ('articles', '0018_book_review_rank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookVector',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='articles.book')),
+                ('vector', models.BinaryField()),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='BookRecommendation',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('from_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation_links', to='articles.book')),
+                        ('to_book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='articles.book')),
+                    ],
+                    options={
+                        'db_table': 'articles_book_recommends',
+                        'unique_together': {('from_book', 'to_book')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='book',
+                    name='recommends',
+                    field=models.ManyToManyField(blank=True, related_name='recommended_by', through='articles.BookRecommendation', through_fields=('from_book', 'to_book'), to='articles.book'),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bookrecommendation',
+            name='rank',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bookrecommendation',
+            name='score',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
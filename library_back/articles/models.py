@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.conf import settings
 
 # Create your models here.
@@ -8,10 +9,13 @@ class Category(models.Model):
 
 class Book(models.Model):
     views = models.PositiveIntegerField(default=0)
+    # 댓글 수 / 인기 순위용 점수(views + comment_count), articles.leaderboard에서 관리
+    comment_count = models.PositiveIntegerField(default=0)
+    score = models.PositiveIntegerField(default=0)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='books')
     title = models.CharField(max_length=200)
     description = models.TextField()
-    isbn = models.CharField(max_length=20)
+    isbn = models.CharField(max_length=20, db_index=True)
     cover = models.CharField(max_length=300) 
     publisher = models.CharField(max_length=100)
     pub_date = models.DateField()
@@ -19,13 +23,36 @@ class Book(models.Model):
     author_info = models.CharField(max_length=500) 
     author_photo = models.CharField(max_length=300)
     customer_review_rank = models.IntegerField(null=True, blank=True)
+    # 평점 순 정렬 키: NULL(평점 없음)을 -1로 바꾼 NOT NULL 값이라 cursor 페이지네이션이 인덱스 범위로 바로 찾아간다.
+    review_rank = models.GeneratedField(
+        expression=Coalesce("customer_review_rank", models.Value(-1)),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
     subTitle = models.CharField(max_length=50)
     recommends = models.ManyToManyField(
         'self',
         symmetrical=False,
         related_name='recommended_by',
-        blank=True
+        blank=True,
+        through='BookRecommendation',
+        through_fields=('from_book', 'to_book'),
     )
+    # 내용이 바뀐 시각 (views/score처럼 UPDATE로만 바뀌는 값은 반영되지 않음)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # books 목록의 category/author 필터 + id keyset 페이지네이션용
+            models.Index(fields=["category", "id"], name="book_category_id_idx"),
+            models.Index(fields=["author", "id"], name="book_author_id_idx"),
+            # 인기 TOP N
+            models.Index(fields=["-score", "-views", "-id"], name="book_popular_idx"),
+            # 카테고리별 정렬 목록 (categories/<id>/books/?sort=)
+            models.Index(fields=["category", "-views", "-id"], name="book_category_views_idx"),
+            models.Index(fields=["category", "-pub_date", "-id"], name="book_category_pub_date_idx"),
+            models.Index(fields=["category", "-review_rank", "-id"], name="book_category_rank_idx"),
+        ]
 
 # class Article(models.Model):
 #     book = models.ForeignKey(Book, on_delete=models.CASCADE)
@@ -40,6 +67,84 @@ class Comment(models.Model):
     content = models.CharField(max_length=100)
     created_at = models.DateField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # 책별 댓글 최신순 keyset 페이지네이션
+            models.Index(fields=["book", "-id"], name="comment_book_id_idx"),
+        ]
+
+class CatalogVersion(models.Model):
+    # 데이터가 바뀔 때마다 올라가는 버전 번호 (articles.versioning)
+    scope = models.CharField(max_length=30, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+class BookRecommendation(models.Model):
+    # Book.recommends의 through 테이블 (내용 기반 유사 도서, articles.similarity)
+    # rank: 유사도 순위(0부터), score: cosine 유사도 / fixture로 들어온 목록은 둘 다 0
+    from_book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='recommendation_links')
+    to_book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField(default=0)
+    score = models.FloatField(default=0.0)
+
+    class Meta:
+        db_table = 'articles_book_recommends'
+        unique_together = ('from_book', 'to_book',)
+
+class BookVector(models.Model):
+    # 유사 도서 계산용 feature hashing 벡터 (articles.similarity)
+    # 바뀐 책만 다시 featurize 하도록 (열 번호 uint16, log TF float32) 쌍을 bytes로 저장한다.
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    vector = models.BinaryField()
+
+class Checkpoint(models.Model):
+    # 배치 작업의 마지막 실행 상태 (재실행/이어하기용)
+    name = models.CharField(max_length=100, primary_key=True)
+    state = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+class BookNeighbor(models.Model):
+    # 즐겨찾기 기반 item-item 협업 필터링 결과 (articles.recommender)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('book', 'neighbor',)
+
+class BookEvent(models.Model):
+    # 시간(hour) 단위로 모은 조회 / 댓글 수 (articles.trending)
+    # hour = epoch 기준 시간 번호, 오래된 bucket은 하루 단위(hour % 24 == 0)로 합쳐진다.
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='+')
+    kind = models.PositiveSmallIntegerField()
+    hour = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('book', 'kind', 'hour',)
+        indexes = [
+            # compaction에서 오래된 bucket 범위 찾기
+            models.Index(fields=["hour"], name="bookevent_hour_idx"),
+        ]
+
+class TrendingScore(models.Model):
+    # window별 지수 감쇠 점수 (forward decay: 기준 시각 landmark에 대한 값이라 순위 비교만 하면 된다)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='+')
+    window = models.CharField(max_length=8)
+    score = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ('book', 'window',)
+        indexes = [
+            # books/trending/?window= TOP N
+            models.Index(fields=["window", "-score", "-book"], name="trending_window_score_idx"),
+        ]
+
+class BookNgram(models.Model):
+    # 한국어 n-gram 검색용 역색인 (articles.ngram)
+    gram = models.CharField(max_length=16, primary_key=True)
+    postings = models.BinaryField()
+
 class Favorite(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     book = models.ForeignKey(Book, on_delete=models.CASCADE)
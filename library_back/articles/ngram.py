@@ -0,0 +1,266 @@
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, ExpressionWrapper, FloatField, Q, Value, When
+from django.utils.html import escape
+
+from . import leaderboard
+from .models import Book, BookNgram
+
+
+# 한국어용 n-gram 역색인
+# "소년이", "소년은"처럼 조사가 붙은 어절은 공백 단위 토큰으로는 "소년"과 매칭되지 않는다.
+# 어절을 글자 n-gram(기본 bi-gram)으로 쪼개서 색인하면 어절 중간의 부분 문자열도 찾을 수 있다.
+#
+# - 어절의 각 위치에서 길이 n짜리 gram을 뽑고, 끝부분은 n보다 짧은 gram으로 채운다.
+#   그러면 어절 안의 길이 n 이하 부분 문자열은 모두 어떤 gram의 접두어가 된다.
+# - posting list(해당 gram이 나오는 book id 목록)는 정렬 후 차이값(delta)을 varint로 인코딩해서
+#   BookNgram.postings에 bytes로 저장한다.
+# - gram 교집합은 후보일 뿐이다. (gram이 다른 어절 / 다른 필드에서 왔을 수 있음)
+#   검색어가 실제로 부분 문자열로 들어 있는 책만 남기고, 어느 필드에 들어 있는지로 순위를 매긴다.
+
+SEARCH_FIELDS = ("title", "subTitle", "author", "publisher", "description")
+
+# 검색어가 들어 있는 필드별 가중치 (articles.search의 bm25 가중치와 같은 비율)
+FIELD_WEIGHTS = (10.0, 4.0, 6.0, 2.0, 1.0)
+
+MAX_CANDIDATE_IDS = 20000
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def enabled():
+    """BOOK_SEARCH_MODE가 "ngram"일 때만 색인을 유지한다."""
+    return settings.BOOK_SEARCH_MODE == "ngram"
+
+
+def ngram_size():
+    return settings.BOOK_SEARCH_NGRAM_SIZE
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def token_grams(token, n=None):
+    n = n or ngram_size()
+    return {token[i:i + n] for i in range(len(token))}
+
+
+def text_grams(text, n=None):
+    grams = set()
+    for token in tokenize(text):
+        grams |= token_grams(token, n)
+    return grams
+
+
+def book_grams(book, n=None):
+    grams = set()
+    for field in SEARCH_FIELDS:
+        grams |= text_grams(getattr(book, field) or "", n)
+    return grams
+
+
+# posting list 인코딩 (정렬된 id -> delta -> varint)
+
+def encode_postings(ids):
+    out = bytearray()
+    previous = 0
+    for book_id in sorted(set(ids)):
+        delta = book_id - previous
+        previous = book_id
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_postings(data):
+    ids = []
+    current = 0
+    delta = 0
+    shift = 0
+    for byte in data:
+        delta |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        current += delta
+        ids.append(current)
+        delta = 0
+        shift = 0
+    return ids
+
+
+# 색인 갱신
+
+def rebuild(batch_size=2000):
+    """BookNgram 전체를 다시 만든다. 만든 gram 수를 반환"""
+    postings = defaultdict(list)
+    book_qs = Book.objects.order_by("id").only("id", *SEARCH_FIELDS)
+    for book in book_qs.iterator(chunk_size=batch_size):
+        for gram in book_grams(book):
+            postings[gram].append(book.id)
+
+    with transaction.atomic():
+        BookNgram.objects.all().delete()
+        BookNgram.objects.bulk_create(
+            (BookNgram(gram=gram, postings=encode_postings(ids)) for gram, ids in postings.items()),
+            batch_size=batch_size,
+        )
+    return len(postings)
+
+
+def update_book(book_id, old_grams, new_grams):
+    """한 권의 gram 변화만큼 posting list를 고친다. (Book 저장/삭제 signal에서 호출)"""
+    update_books({book_id: (old_grams, new_grams)})
+
+
+def update_books(changes):
+    """
+    {book_id: (old_grams, new_grams)}만큼 posting list를 한 번에 고친다.
+    signal을 타지 않는 bulk 경로(BookImporter 등)는 배치마다 이걸 직접 호출한다.
+    """
+    added, removed = defaultdict(set), defaultdict(set)
+    for book_id, (old_grams, new_grams) in changes.items():
+        for gram in new_grams - old_grams:
+            added[gram].add(book_id)
+        for gram in old_grams - new_grams:
+            removed[gram].add(book_id)
+    if not added and not removed:
+        return
+
+    with transaction.atomic():
+        existing = {
+            row.gram: row
+            for row in BookNgram.objects.select_for_update().filter(gram__in=added.keys() | removed.keys())
+        }
+        to_create, to_update, to_delete = [], [], []
+
+        for gram in added.keys() | removed.keys():
+            row = existing.get(gram)
+            ids = set(decode_postings(row.postings)) if row else set()
+            ids = (ids | added[gram]) - removed[gram]
+            if row is None:
+                if ids:
+                    to_create.append(BookNgram(gram=gram, postings=encode_postings(ids)))
+            elif ids:
+                row.postings = encode_postings(ids)
+                to_update.append(row)
+            else:
+                to_delete.append(gram)
+
+        BookNgram.objects.bulk_create(to_create, batch_size=1000)
+        BookNgram.objects.bulk_update(to_update, ["postings"], batch_size=1000)
+        BookNgram.objects.filter(gram__in=to_delete).delete()
+
+
+# 검색
+
+def _term_candidates(term, n):
+    if len(term) < n:
+        # n보다 짧은 검색어는 그 검색어로 시작하는 gram들의 합집합
+        ids = set()
+        for postings in BookNgram.objects.filter(gram__startswith=term).values_list("postings", flat=True):
+            ids.update(decode_postings(postings))
+        return ids
+
+    grams = {term[i:i + n] for i in range(len(term) - n + 1)}
+    rows = dict(BookNgram.objects.filter(gram__in=grams).values_list("gram", "postings"))
+    if len(rows) < len(grams):
+        return set()
+
+    # 짧은 posting list부터 교집합
+    ids = None
+    for postings in sorted(rows.values(), key=len):
+        decoded = decode_postings(postings)
+        ids = set(decoded) if ids is None else ids.intersection(decoded)
+        if not ids:
+            break
+    return ids
+
+
+def candidate_ids(q):
+    """검색어의 모든 gram이 있는 책 id (검색어가 실제로 들어 있는지는 보지 않음)"""
+    n = ngram_size()
+    ids = None
+    for term in tokenize(q):
+        term_ids = _term_candidates(term, n)
+        ids = term_ids if ids is None else ids & term_ids
+        if not ids:
+            return set()
+    return ids or set()
+
+
+def matching_books(q):
+    """
+    후보 중 검색어가 실제로 부분 문자열로 들어 있는 책 queryset
+    관련도(검색어가 들어 있는 필드 가중치 합) -> 인기 순으로 정렬하고 relevance로 annotate한다.
+    """
+    ids = candidate_ids(q)
+    if not ids:
+        return Book.objects.none()
+
+    n = ngram_size()
+    contains, unverified = Q(), Q()
+    relevance = Value(0.0)
+    for term in tokenize(q):
+        term_condition = Q()
+        for field in SEARCH_FIELDS:
+            term_condition |= Q(**{f"{field}__icontains": term})
+        contains &= term_condition
+        # n글자 이하 검색어는 gram 자체(또는 gram의 접두어)라서 후보면 이미 들어 있다.
+        if len(term) > n:
+            unverified &= term_condition
+        # description(가중치가 가장 낮고 가장 긴 필드)은 관련도 계산에서 뺀다. 설명에만 있으면 0점
+        for field, weight in zip(SEARCH_FIELDS[:-1], FIELD_WEIGHTS[:-1]):
+            relevance += Case(When(**{f"{field}__icontains": term}, then=Value(weight)), default=Value(0.0))
+
+    # 후보가 너무 많으면 IN 목록 대신 부분 문자열 조건만으로 찾는다. (SQLite 변수 개수 제한)
+    if len(ids) <= MAX_CANDIDATE_IDS:
+        book_qs, condition = Book.objects.filter(id__in=ids), unverified
+    else:
+        book_qs, condition = Book.objects.all(), contains
+    return (
+        book_qs.filter(condition)
+        .annotate(relevance=ExpressionWrapper(relevance, output_field=FloatField()))
+        .order_by("-relevance", *leaderboard.ORDERING)
+    )
+
+
+def _highlight(text, terms, open_tag, close_tag):
+    """text를 HTML escape 하고 terms와 일치하는 부분만 open_tag / close_tag로 감싼다."""
+    if not terms:
+        return escape(text)
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE)
+    parts, end = [], 0
+    for match in pattern.finditer(text):
+        parts.append(escape(text[end:match.start()]))
+        parts.append(f"{open_tag}{escape(match.group(0))}{close_tag}")
+        end = match.end()
+    parts.append(escape(text[end:]))
+    return "".join(parts)
+
+
+def _snippet(text, terms, open_tag, close_tag, width=40):
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if lowered.find(term) >= 0]
+    start = max(min(positions) - width, 0) if positions else 0
+    snippet = text[start:start + width * 2]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width * 2 < len(text) else ""
+    return prefix + _highlight(snippet, terms, open_tag, close_tag) + suffix
+
+
+def search(q, limit, open_tag="<mark>", close_tag="</mark>"):
+    """검색어가 들어 있는 책을 관련도 순으로 limit권 돌려준다. (title_highlight, snippet, rank 속성 포함)"""
+    terms = tokenize(q)
+    book_list = list(matching_books(q)[:limit])
+    for book in book_list:
+        book.title_highlight = _highlight(book.title, terms, open_tag, close_tag)
+        book.snippet = _snippet(book.description, terms, open_tag, close_tag)
+        book.rank = None
+    return book_list
@@ -0,0 +1,132 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+# keyset(cursor) 페이지네이션
+# OFFSET 대신 "마지막으로 본 정렬 키 다음부터"를 조건으로 걸기 때문에
+# 정렬 키에 맞는 인덱스만 있으면 몇 번째 페이지든 같은 비용으로 읽힌다.
+
+def encode_cursor(values):
+    raw = json.dumps(values, ensure_ascii=False, default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, queryset, keys):
+    """cursor를 정렬 키별 값 목록으로 되돌린다. 값은 각 필드 타입으로 변환하고, 맞지 않으면 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        # 모양만 맞고 타입이 다른 값이 Q 조건까지 가면 DB 단계에서 500이 난다.
+        converted = []
+        for (name, _, nullable), value in zip(keys, values):
+            if value is None:
+                if not nullable:
+                    raise ValueError
+                converted.append(None)
+            else:
+                converted.append(queryset.model._meta.get_field(name).to_python(value))
+        return converted
+    except (DjangoValidationError, ValueError, TypeError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+
+def get_page_size(request, default=None):
+    default = default or settings.BOOKS_PAGE_SIZE
+    raw = request.query_params.get("page_size")
+    if raw is None:
+        return default
+
+    try:
+        page_size = int(raw)
+    except ValueError:
+        raise ValidationError({"page_size": "A valid integer is required."})
+    return max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+
+def _parse_ordering(queryset, ordering):
+    keys = []
+    for item in ordering:
+        name = item.lstrip("-")
+        nullable = queryset.model._meta.get_field(name).null
+        keys.append((name, item.startswith("-"), nullable))
+    return keys
+
+
+def _order_by(keys):
+    # nullable 컬럼은 방향과 상관없이 NULL을 항상 마지막에 둔다.
+    order = []
+    for name, desc, nullable in keys:
+        if not nullable:
+            order.append(f"-{name}" if desc else name)
+        elif desc:
+            order.append(F(name).desc(nulls_last=True))
+        else:
+            order.append(F(name).asc(nulls_last=True))
+    return order
+
+
+def _after(keys, values):
+    # (k1, k2, ...) > (v1, v2, ...) 를 정렬 방향에 맞게 풀어 쓴 조건
+    condition = Q(pk__in=[])
+    prefix = Q()
+    for (name, desc, nullable), value in zip(keys, values):
+        if value is not None:
+            beyond = Q(**{f"{name}__lt" if desc else f"{name}__gt": value})
+            if nullable:
+                beyond |= Q(**{f"{name}__isnull": True})
+            condition |= prefix & beyond
+            prefix &= Q(**{name: value})
+        else:
+            prefix &= Q(**{f"{name}__isnull": True})
+
+    # 첫 번째 키의 범위를 AND로 한 번 더 걸어두면 OR 조건이어도 인덱스에서 그 위치부터 바로 읽는다.
+    name, desc, nullable = keys[0]
+    if len(keys) > 1 and values[0] is not None and not nullable:
+        condition &= Q(**{f"{name}__lte" if desc else f"{name}__gte": values[0]})
+    return condition
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=None):
+    """
+    ordering 기준으로 cursor 다음 page_size개를 가져온다.
+    (rows, next_cursor)를 반환하고, 마지막 페이지면 next_cursor는 None
+    values() queryset이면 rows는 dict이고, 정렬 키가 values에 들어 있어야 한다.
+    """
+    page_size = page_size or settings.BOOKS_PAGE_SIZE
+    keys = _parse_ordering(queryset, ordering)
+
+    if cursor:
+        values = decode_cursor(cursor, queryset, keys)
+        queryset = queryset.filter(_after(keys, values))
+
+    rows = list(queryset.order_by(*_order_by(keys))[: page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    if isinstance(last, dict):
+        return rows, encode_cursor([last[name] for name, _, _ in keys])
+    return rows, encode_cursor([getattr(last, name) for name, _, _ in keys])
+
+
+def paginated_response(request, data, next_cursor, headers=None):
+    # 기존 프론트가 배열을 그대로 받고 있어서 본문은 리스트로 유지하고
+    # 다음 페이지 정보는 헤더로 내려준다.
+    # Link는 경로 기준 상대 URL (응답 캐시가 host와 상관없이 같은 헤더를 재사용한다.)
+    response = Response(data, status=status.HTTP_200_OK, headers=headers)
+    if next_cursor:
+        next_url = replace_query_param(request.get_full_path(), "cursor", next_cursor)
+        response["X-Next-Cursor"] = next_cursor
+        response["Link"] = f'<{next_url}>; rel="next"'
+    return response
@@ -0,0 +1,248 @@
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from rest_framework import serializers
+
+from .fastjson import FastJSONRenderer
+
+logger = logging.getLogger(__name__)
+
+
+# 요청별 성능 계측 (PerformanceMiddleware)
+# - 전체 시간, DB 쿼리 수 / 시간(connection.execute_wrapper), serializer 시간(TimedSerializerMixin을 상속한 것만),
+#   JSON 렌더링 시간(TimedJSONRenderer)을 잰다.
+# - 응답에 Server-Timing 헤더로 붙이고, 한 줄 JSON 로그(articles.performance)로 남긴다.
+# - route별로 최근 PERFORMANCE_WINDOW_MINUTES분의 지연 시간 히스토그램을 프로세스 메모리에 둔다. (GET /perf/stats/)
+# 요청마다 하는 일은 perf_counter 몇 번과 dict 갱신뿐이라 운영에서도 켜둘 수 있다.
+
+# 히스토그램 구간 경계 (ms), 마지막 구간은 그 이상 전부
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    __slots__ = ("started", "db_count", "db_time", "serialize_time", "render_time", "_depth")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self._depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.db_count += 1
+
+
+def current():
+    return _current.get()
+
+
+class _Window:
+    """한 route의 1분 단위 히스토그램 묶음"""
+
+    def __init__(self):
+        self.minutes = {}
+
+    def add(self, minute, total_ms, metrics):
+        slot = self.minutes.get(minute)
+        if slot is None:
+            slot = self.minutes[minute] = {
+                "buckets": [0] * (len(BUCKETS_MS) + 1),
+                "count": 0, "errors": 0, "total_ms": 0.0, "db_ms": 0.0, "db_count": 0,
+                "serialize_ms": 0.0, "render_ms": 0.0,
+            }
+        slot["buckets"][bisect.bisect_left(BUCKETS_MS, total_ms)] += 1
+        slot["count"] += 1
+        slot["total_ms"] += total_ms
+        slot["db_ms"] += metrics.db_time * 1000
+        slot["db_count"] += metrics.db_count
+        slot["serialize_ms"] += metrics.serialize_time * 1000
+        slot["render_ms"] += metrics.render_time * 1000
+
+    def prune(self, oldest):
+        for minute in [minute for minute in self.minutes if minute < oldest]:
+            del self.minutes[minute]
+
+
+def _percentile(buckets, count, p):
+    # 해당 백분위가 들어있는 구간의 상한 (마지막 구간이면 마지막 경계 이상)
+    target = count * p / 100
+    seen = 0
+    for index, value in enumerate(buckets):
+        seen += value
+        if seen >= target and value:
+            return BUCKETS_MS[index] if index < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}"
+    return None
+
+
+class RouteStats:
+    """route별 최근 window_minutes분 히스토그램 (프로세스별)"""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def window_minutes(self):
+        return settings.PERFORMANCE_WINDOW_MINUTES
+
+    def record(self, route, total_ms, metrics, error=False):
+        minute = int(time.time() // 60)
+        with self._lock:
+            window = self._routes.get(route)
+            if window is None:
+                window = self._routes[route] = _Window()
+            window.add(minute, total_ms, metrics)
+            if error:
+                window.minutes[minute]["errors"] += 1
+            window.prune(minute - self.window_minutes + 1)
+
+    def snapshot(self):
+        oldest = int(time.time() // 60) - self.window_minutes + 1
+        result = {}
+        with self._lock:
+            for route, window in sorted(self._routes.items()):
+                window.prune(oldest)
+                slots = list(window.minutes.values())
+                count = sum(slot["count"] for slot in slots)
+                if not count:
+                    continue
+                buckets = [sum(values) for values in zip(*(slot["buckets"] for slot in slots))]
+                total = {key: sum(slot[key] for slot in slots)
+                         for key in ("errors", "total_ms", "db_ms", "db_count", "serialize_ms", "render_ms")}
+                result[route] = {
+                    "count": count,
+                    "errors": total["errors"],
+                    "mean_ms": round(total["total_ms"] / count, 3),
+                    "p50_ms": _percentile(buckets, count, 50),
+                    "p95_ms": _percentile(buckets, count, 95),
+                    "p99_ms": _percentile(buckets, count, 99),
+                    "mean_db_queries": round(total["db_count"] / count, 2),
+                    "mean_db_ms": round(total["db_ms"] / count, 3),
+                    "mean_serialize_ms": round(total["serialize_ms"] / count, 3),
+                    "mean_render_ms": round(total["render_ms"] / count, 3),
+                    "histogram_ms": dict(zip([*map(str, BUCKETS_MS), "inf"], buckets)),
+                }
+        return {"window_minutes": self.window_minutes, "routes": result}
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_stats = RouteStats()
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return f"{request.method} /{match.route}"
+
+
+class PerformanceMiddleware:
+    """
+    요청 하나의 전체 시간 / DB / serializer / 렌더링 시간을 재서 Server-Timing 헤더, 로그, route 통계에 남긴다.
+    StreamingHttpResponse는 본문을 보내기 전까지만 잰다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with connection.execute_wrapper(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total_ms = (time.perf_counter() - metrics.started) * 1000
+        db_ms = metrics.db_time * 1000
+        serialize_ms = metrics.serialize_time * 1000
+        render_ms = metrics.render_time * 1000
+        route = _route(request)
+
+        response["Server-Timing"] = ", ".join((
+            f'db;dur={db_ms:.2f};desc="{metrics.db_count} queries"',
+            f"serialize;dur={serialize_ms:.2f}",
+            f"render;dur={render_ms:.2f}",
+            f"total;dur={total_ms:.2f}",
+        ))
+        route_stats.record(route, total_ms, metrics, error=response.status_code >= 500)
+
+        if total_ms >= settings.PERFORMANCE_LOG_THRESHOLD_MS:
+            logger.info(json.dumps({
+                "route": route,
+                "path": request.path,
+                "status": response.status_code,
+                "total_ms": round(total_ms, 2),
+                "db_queries": metrics.db_count,
+                "db_ms": round(db_ms, 2),
+                "serialize_ms": round(serialize_ms, 2),
+                "render_ms": round(render_ms, 2),
+            }, ensure_ascii=False))
+        return response
+
+
+def _timed_data(get_data):
+    # 가장 바깥 serializer.data만 잰다. 그 안에서 lazy queryset이 실행한 DB 시간은 빼서 겹치지 않게 한다.
+    metrics = _current.get()
+    if metrics is None or metrics._depth:
+        return get_data()
+    metrics._depth += 1
+    started, db_before = time.perf_counter(), metrics.db_time
+    try:
+        return get_data()
+    finally:
+        metrics._depth -= 1
+        metrics.serialize_time += (time.perf_counter() - started) - (metrics.db_time - db_before)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    """many=True 목록의 .data 시간을 현재 요청 계측에 더한다. (Meta.list_serializer_class로 지정)"""
+
+    @property
+    def data(self):
+        return _timed_data(lambda: super(TimedListSerializer, self).data)
+
+
+class TimedSerializerMixin:
+    """
+    .data 시간을 현재 요청 계측(Server-Timing의 serialize)에 더한다.
+    DRF 클래스를 고치지 않고 재고 싶은 serializer만 상속한다. (목록은 Meta.list_serializer_class = TimedListSerializer)
+    """
+
+    @property
+    def data(self):
+        return _timed_data(lambda: super(TimedSerializerMixin, self).data)
+
+
+class TimedJSONRenderer(FastJSONRenderer):
+    """JSON 렌더링 시간을 현재 요청 계측에 더한다."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        started = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            metrics.render_time += time.perf_counter() - started
@@ -0,0 +1,227 @@
+import heapq
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from . import leaderboard, versioning
+from .models import Book, BookNeighbor, Checkpoint, Favorite
+
+
+# 즐겨찾기 기반 item-item 협업 필터링
+# 1. Favorite(user, book)을 user x book 0/1 행렬로 보고
+# 2. 같은 사용자가 같이 담은 책 쌍의 수(co-occurrence)를 numpy로 한 번에 센 뒤
+# 3. cosine 유사도 = co(i, j) / sqrt(deg(i) * deg(j)) 로 책마다 상위 K개 이웃만 BookNeighbor에 저장한다.
+# 추천할 때는 프로세스에 올려둔 이웃 목록에서 즐겨찾기 책들의 이웃 점수를 더하기만 한다.
+
+CHECKPOINT = "recommender"
+
+
+def _favorite_matrix(max_per_user):
+    rows = np.array(
+        Favorite.objects.order_by("user_id", "-id").values_list("user_id", "book_id"),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    users, books = rows[:, 0], rows[:, 1]
+    if not len(users):
+        return users, books
+
+    # 사용자별로 최근 max_per_user개만 사용 (책 쌍 수가 사용자별 k^2으로 늘어나는 것 방지)
+    _, group_start, group_size = np.unique(users, return_index=True, return_counts=True)
+    position = np.arange(len(users)) - np.repeat(group_start, group_size)
+    keep = position < max_per_user
+    return users[keep], books[keep]
+
+
+def _co_occurrence(users, books):
+    """같은 사용자 안의 모든 (i, j) 책 쌍과 그 횟수"""
+    _, group_start, group_size = np.unique(users, return_index=True, return_counts=True)
+    size_per_row = np.repeat(group_size, group_size)
+    start_per_row = np.repeat(group_start, group_size)
+
+    left = np.repeat(books, size_per_row)
+    offsets = np.arange(len(left)) - np.repeat(np.cumsum(size_per_row) - size_per_row, size_per_row)
+    right = books[np.repeat(start_per_row, size_per_row) + offsets]
+
+    mask = left != right
+    return left[mask], right[mask]
+
+
+def compute_neighbors(top_k=None, max_per_user=None):
+    """(book_ids, neighbor_ids, scores) numpy 배열, 책마다 점수 높은 순으로 top_k개"""
+    top_k = top_k or settings.RECOMMENDER_TOP_K
+    max_per_user = max_per_user or settings.RECOMMENDER_MAX_FAVORITES_PER_USER
+
+    users, books = _favorite_matrix(max_per_user)
+    empty = np.array([], dtype=np.int64)
+    if not len(users):
+        return empty, empty, np.array([], dtype=np.float64)
+
+    item_ids, item_index = np.unique(books, return_inverse=True)
+    degree = np.bincount(item_index).astype(np.float64)
+
+    left, right = _co_occurrence(users, item_index)
+    if not len(left):
+        return empty, empty, np.array([], dtype=np.float64)
+
+    pair_keys, co_count = np.unique(left * len(item_ids) + right, return_counts=True)
+    left, right = np.divmod(pair_keys, len(item_ids))
+    scores = co_count / np.sqrt(degree[left] * degree[right])
+
+    # 책(left)별 점수 내림차순 정렬 후 앞에서 top_k개
+    order = np.lexsort((-scores, left))
+    left, right, scores = left[order], right[order], scores[order]
+    _, group_start, group_size = np.unique(left, return_index=True, return_counts=True)
+    rank = np.arange(len(left)) - np.repeat(group_start, group_size)
+    keep = rank < top_k
+
+    return item_ids[left[keep]], item_ids[right[keep]], scores[keep]
+
+
+def rebuild(top_k=None, max_per_user=None, batch_size=5000):
+    """BookNeighbor를 다시 만들고 저장한 이웃 수를 반환한다."""
+    favorites_version = versioning.current(versioning.FAVORITES)[0][0]
+    book_ids, neighbor_ids, scores = compute_neighbors(top_k, max_per_user)
+
+    with transaction.atomic():
+        BookNeighbor.objects.all().delete()
+        BookNeighbor.objects.bulk_create(
+            (
+                BookNeighbor(book_id=int(book_id), neighbor_id=int(neighbor_id), score=float(score))
+                for book_id, neighbor_id, score in zip(book_ids, neighbor_ids, scores)
+            ),
+            batch_size=batch_size,
+        )
+        Checkpoint.objects.update_or_create(
+            name=CHECKPOINT, defaults={"state": {"favorites_version": favorites_version}}
+        )
+        versioning.bump(versioning.NEIGHBORS)
+    return len(book_ids)
+
+
+def is_stale():
+    """마지막으로 만든 뒤 즐겨찾기가 바뀌었는지"""
+    favorites_version = versioning.current(versioning.FAVORITES)[0][0]
+    checkpoint = Checkpoint.objects.filter(name=CHECKPOINT).first()
+    return checkpoint is None or checkpoint.state.get("favorites_version") != favorites_version
+
+
+class NeighborIndex:
+    """
+    BookNeighbor를 {book_id: [(neighbor_id, score), ...]}로 프로세스에 올려둔다.
+    RECOMMENDER_REFRESH_INTERVAL초마다 NEIGHBORS 버전만 확인해서 바뀌었으면 다시 읽는다.
+    """
+
+    def __init__(self):
+        self._neighbors = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < settings.RECOMMENDER_REFRESH_INTERVAL:
+            return
+
+        with self._lock:
+            if self._version is not None and now - self._checked_at < settings.RECOMMENDER_REFRESH_INTERVAL:
+                return
+            version = versioning.current(versioning.NEIGHBORS)[0]
+            if version != self._version:
+                neighbors = {}
+                rows = BookNeighbor.objects.order_by("book_id", "-score").values_list(
+                    "book_id", "neighbor_id", "score"
+                )
+                for book_id, neighbor_id, score in rows.iterator(chunk_size=5000):
+                    neighbors.setdefault(book_id, []).append((neighbor_id, score))
+                self._neighbors = neighbors
+                self._version = version
+            self._checked_at = now
+
+    def version(self):
+        self._refresh()
+        return self._version
+
+    def recommend(self, favorite_ids, limit):
+        """즐겨찾기 책들의 이웃 점수를 합쳐서 점수 높은 book_id limit개"""
+        self._refresh()
+        neighbors = self._neighbors
+        favorite_ids = set(favorite_ids)
+
+        scores = {}
+        for book_id in favorite_ids:
+            for neighbor_id, score in neighbors.get(book_id, ()):
+                if neighbor_id not in favorite_ids:
+                    scores[neighbor_id] = scores.get(neighbor_id, 0.0) + score
+        return heapq.nlargest(limit, scores, key=lambda book_id: (scores[book_id], book_id))
+
+
+neighbor_index = NeighborIndex()
+
+
+# 사용자별 추천 결과
+# 추천 1: 협업 필터링 / 추천 2: 즐겨찾기 작가의 다른 책 / 나머지: 인기 TOP
+# 결과(직렬화된 목록)는 사용자별로 공유 캐시에 두고, 그 사용자의 즐겨찾기가 바뀌면
+# signal에서 invalidate_user()로 지운다. 이웃 목록을 다시 만들면 버전이 달라져서 자연히 다시 계산된다.
+
+def recommend_for_user(user_id, limit=5):
+    favorite_book_ids = list(
+        Favorite.objects.filter(user_id=user_id).values_list("book_id", flat=True)
+    )
+    popular_qs = Book.objects.order_by(*leaderboard.ORDERING)
+
+    # 즐겨찾기 없으면 인기 TOP 그대로
+    if not favorite_book_ids:
+        return list(popular_qs[:limit])
+
+    cf_ids = neighbor_index.recommend(favorite_book_ids, limit)
+    book_map = Book.objects.in_bulk(cf_ids) if cf_ids else {}
+    recommended_list = [book_map[book_id] for book_id in cf_ids if book_id in book_map]
+
+    if len(recommended_list) < limit:
+        used_ids = set(favorite_book_ids) | {b.id for b in recommended_list}
+        favorite_authors = Book.objects.filter(id__in=favorite_book_ids).values("author")
+        rec_qs = (
+            Book.objects.filter(author__in=favorite_authors)
+            .exclude(id__in=used_ids)
+            .order_by("-views", "-id")
+        )
+        recommended_list.extend(list(rec_qs[: limit - len(recommended_list)]))
+
+    if len(recommended_list) < limit:
+        used_ids = set(favorite_book_ids) | {b.id for b in recommended_list}
+        filler_qs = popular_qs.exclude(id__in=used_ids)
+        recommended_list.extend(list(filler_qs[: limit - len(recommended_list)]))
+
+    return recommended_list
+
+
+def _user_cache():
+    return caches[settings.RECOMMENDATION_CACHE]
+
+
+def _user_key(user_id):
+    return f"recommend:user:{user_id}"
+
+
+def get_cached(user_id):
+    cached = _user_cache().get(_user_key(user_id))
+    if cached is None:
+        return None
+    version, data = cached
+    return data if version == neighbor_index.version() else None
+
+
+def set_cached(user_id, data):
+    _user_cache().set(
+        _user_key(user_id),
+        (neighbor_index.version(), data),
+        settings.RECOMMENDATION_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_user(user_id):
+    _user_cache().delete(_user_key(user_id))
@@ -0,0 +1,134 @@
+import logging
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Q
+from django.utils.html import escape
+
+from . import ngram
+from .models import Book
+
+
+# 도서 검색 (title, subTitle, author, publisher, description)
+# BOOK_SEARCH_MODE
+# - "fts": SQLite에서는 0009_book_fts 마이그레이션이 만든 FTS5 인덱스를 bm25로 정렬해서 쓰고,
+#          다른 DB에서는 icontains로 대신 찾는다.
+# - "ngram": articles.ngram의 글자 n-gram 역색인 (어절 중간 부분 문자열도 찾는다)
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+
+# title_highlight / snippet은 HTML로 내려가므로 DB 텍스트는 escape 하고 <mark>만 태그로 남긴다.
+# FTS5 highlight() / snippet()에는 텍스트에 나오지 않는 제어 문자를 표시로 넘기고,
+# escape 한 뒤에 <mark> / </mark>로 바꾼다.
+FTS_MARK_OPEN = "\x02"
+FTS_MARK_CLOSE = "\x03"
+
+# bm25 컬럼 가중치: title, subTitle, author, publisher, description
+BM25_WEIGHTS = (10.0, 4.0, 6.0, 2.0, 1.0)
+
+SEARCH_FIELDS = ("title", "subTitle", "author", "publisher", "description")
+
+FTS_TRIGGERS = ("articles_book_fts_ai", "articles_book_fts_ad", "articles_book_fts_au")
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_fts_triggers(using="default"):
+    """
+    FTS 인덱스를 고치는 트리거가 모두 있는지 확인하고, 빠진 게 있으면 다시 만들고 인덱스를 다시 채운다.
+    SQLite에서 articles_book을 다시 만드는 마이그레이션은 트리거를 말없이 지우기 때문에 migrate 후마다 확인한다.
+    다시 만들었으면 True
+    """
+    db = connections[using]
+    if db.vendor != "sqlite":
+        return False
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE (type = 'table' AND name = 'articles_book_fts') "
+            "OR (type = 'trigger' AND tbl_name = 'articles_book')"
+        )
+        names = {name for name, in cursor.fetchall()}
+        # FTS 테이블이 없으면 (0009 이전으로 되돌린 경우) 할 게 없다.
+        if "articles_book_fts" not in names or names.issuperset(FTS_TRIGGERS):
+            return False
+        logger.warning("FTS 트리거가 없어서 다시 만들고 검색 인덱스를 다시 채웁니다: %s",
+                       ", ".join(sorted(set(FTS_TRIGGERS) - names)))
+        for sql in import_module("articles.migrations.0009_book_fts").RECREATE_TRIGGERS_SQL:
+            cursor.execute(sql)
+    return True
+
+
+def fts_query(q):
+    """
+    사용자 입력을 FTS5 MATCH 문법으로 바꾼다.
+    단어마다 따옴표로 감싸서 연산자로 해석되지 않게 하고, 접두어 검색(*)을 붙여
+    "소년"으로 "소년이"도 찾을 수 있게 한다.
+    """
+    terms = []
+    for term in q.split():
+        term = term.replace('"', '""')
+        terms.append(f'"{term}"*')
+    return " ".join(terms)
+
+
+def _fts_search(q, limit):
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    sql = f"""
+        SELECT b.*,
+               highlight(articles_book_fts, 0, %s, %s) AS title_highlight,
+               snippet(articles_book_fts, 4, %s, %s, '…', 16) AS snippet,
+               bm25(articles_book_fts, {weights}) AS rank
+        FROM articles_book_fts
+        JOIN articles_book b ON b.id = articles_book_fts.rowid
+        WHERE articles_book_fts MATCH %s
+        ORDER BY rank
+        LIMIT %s
+    """
+    params = [
+        FTS_MARK_OPEN, FTS_MARK_CLOSE,
+        FTS_MARK_OPEN, FTS_MARK_CLOSE,
+        fts_query(q), limit,
+    ]
+    book_list = list(Book.objects.raw(sql, params))
+    for book in book_list:
+        book.title_highlight = _fts_marked(book.title_highlight)
+        book.snippet = _fts_marked(book.snippet)
+    return book_list
+
+
+def _fts_marked(text):
+    # DB 텍스트에 원래 \x02 / \x03이 있으면 <mark>가 더 생길 뿐, 만들어지는 태그는 <mark>뿐이다.
+    return (
+        escape(text or "")
+        .replace(FTS_MARK_OPEN, HIGHLIGHT_OPEN)
+        .replace(FTS_MARK_CLOSE, HIGHLIGHT_CLOSE)
+    )
+
+
+def _icontains_search(q, limit):
+    condition = Q()
+    for term in q.split():
+        term_condition = Q()
+        for field in SEARCH_FIELDS:
+            term_condition |= Q(**{f"{field}__icontains": term})
+        condition &= term_condition
+
+    book_list = list(Book.objects.filter(condition).order_by("-score", "-id")[:limit])
+    for book in book_list:
+        book.title_highlight = escape(book.title)
+        book.snippet = escape(book.description[:80])
+        book.rank = None
+    return book_list
+
+
+def search_books(q, limit):
+    """관련도 순으로 최대 limit권을 반환한다. (title_highlight, snippet, rank 속성 포함)"""
+    if not q.split():
+        return []
+    if settings.BOOK_SEARCH_MODE == "ngram":
+        return ngram.search(q, limit, HIGHLIGHT_OPEN, HIGHLIGHT_CLOSE)
+    if connection.vendor == "sqlite":
+        return _fts_search(q, limit)
+    return _icontains_search(q, limit)
@@ -1,51 +1,94 @@
 from rest_framework import serializers
 from .models import Book, Category, Comment, Favorite
+from .performance import TimedListSerializer, TimedSerializerMixin
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
+        list_serializer_class = TimedListSerializer
         fields = ("id", "title", "author", "cover")
 
+    def __init__(self, *args, **kwargs):
+        # ?fields=id,title 처럼 필요한 필드만 골라서 내려줄 수 있게 한다.
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
 
-class BookDetailSerializer(serializers.ModelSerializer):
+
+class BookSearchSerializer(BookSerializer):
+    title_highlight = serializers.CharField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+    rank = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta(BookSerializer.Meta):
+        fields = BookSerializer.Meta.fields + ("title_highlight", "snippet", "rank")
+
+
+class BookDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
+    # 내용 기반 유사 도서 (manage.py build_similar_books로 채움), 유사도 순위(rank) 순
+    recommends = serializers.SerializerMethodField()
+    related_books = serializers.SerializerMethodField()
 
     class Meta:
         model = Book
-        fields = "__all__"
+        # review_rank는 정렬용 계산 컬럼 (customer_review_rank와 같은 값)
+        exclude = ("review_rank",)
         read_only_fields = ("category",)
 
+    # recommendation_links는 view에서 rank 순으로 prefetch 한다.
+    def get_recommends(self, obj):
+        return [link.to_book_id for link in obj.recommendation_links.all()]
+
+    def get_related_books(self, obj):
+        return BookSerializer([link.to_book for link in obj.recommendation_links.all()], many=True).data
 
-class CommentSerializer(serializers.ModelSerializer):
+
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     username = serializers.CharField(source="user.username", read_only=True)
 
     class Meta:
         model = Comment
+        list_serializer_class = TimedListSerializer
         fields = "__all__"
         read_only_fields = ("book", "user")
 
 
-class FavoriteBookSerializer(serializers.ModelSerializer):
+class FavoriteBookSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     book_title = serializers.CharField(source="book.title", read_only=True)
     count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Favorite
+        list_serializer_class = TimedListSerializer
         fields = ("book_title", "count")
 
 
-class CategoryListSerializer(serializers.ModelSerializer):
+class FavoriteOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=("add", "remove"))
+    book_pk = serializers.IntegerField()
+
+
+class FavoriteBatchSerializer(serializers.Serializer):
+    operations = FavoriteOperationSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class CategoryListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
+        list_serializer_class = TimedListSerializer
         fields = "__all__"
 
 
-class PopularBookSerializer(serializers.ModelSerializer):
+class PopularBookSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     comment_count = serializers.IntegerField(read_only=True)
     score = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Book
+        list_serializer_class = TimedListSerializer
         # 프론트에서 바로 쓰게 id/title/author/cover 포함
         fields = ("id", "title", "author", "cover", "views", "comment_count", "score")
@@ -0,0 +1,86 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import ngram, recommender, versioning
+from .suggest import suggest_index
+from .models import Book, Category, Comment, Favorite
+
+
+# fixture(loaddata)는 raw 저장이라 auto_now가 채워지지 않는다.
+
+@receiver(pre_save, sender=Book)
+def fill_raw_updated_at(sender, instance, raw=False, **kwargs):
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+# n-gram 검색 색인 (BOOK_SEARCH_MODE = "ngram"일 때만 유지)
+
+@receiver(pre_save, sender=Book)
+def remember_book_grams(sender, instance, raw=False, **kwargs):
+    if raw or not ngram.enabled():
+        return
+    old = Book.objects.filter(pk=instance.pk).only(*ngram.SEARCH_FIELDS).first() if instance.pk else None
+    instance._old_grams = ngram.book_grams(old) if old else set()
+
+
+@receiver(post_save, sender=Book)
+def update_book_grams(sender, instance, raw=False, **kwargs):
+    if raw or not ngram.enabled():
+        return
+    old_grams = getattr(instance, "_old_grams", set())
+    ngram.update_book(instance.pk, old_grams, ngram.book_grams(instance))
+
+
+@receiver(post_delete, sender=Book)
+def delete_book_grams(sender, instance, **kwargs):
+    if not ngram.enabled():
+        return
+    ngram.update_book(instance.pk, ngram.book_grams(instance), set())
+
+
+# 자동완성 색인 (프로세스 메모리, articles.suggest)
+
+@receiver(post_save, sender=Book)
+def update_suggest_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    suggest_index.update_book(instance)
+
+
+@receiver(post_delete, sender=Book)
+def remove_from_suggest_index(sender, instance, **kwargs):
+    suggest_index.remove_book(instance.pk)
+
+
+# 데이터 버전 (ETag / 응답 캐시)
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_catalog_version(sender, raw=False, **kwargs):
+    if raw:
+        return
+    versioning.bump()
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def bump_favorites_version(sender, raw=False, **kwargs):
+    if raw:
+        return
+    versioning.bump(versioning.FAVORITES)
+
+
+# 사용자별 추천 캐시
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+def invalidate_user_recommendations(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    recommender.invalidate_user(instance.user_id)
@@ -0,0 +1,281 @@
+import zlib
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import ngram
+from .models import Book, BookRecommendation, BookVector, Checkpoint
+
+
+# 내용 기반 유사 도서 (Book.recommends)
+# description(어절 + 글자 bi-gram), author, category, publisher를 feature hashing으로
+# 고정 차원 TF-IDF 벡터로 만들고, cosine 유사도 상위 K권을 순위(rank) / 점수와 함께 Book.recommends에 저장한다.
+# - 책마다 hashing 결과(log TF)를 BookVector에 저장해 두고, 다시 실행하면 updated_at이 바뀐 책만 다시 featurize 한다.
+# - 전체 벡터는 sparse(CSR)로만 들고 있고, 유사도는 BLOCK_SIZE행씩 dense로 펼쳐서 계산한다.
+#   (dense N x dimensions 행렬을 만들지 않으므로 메모리는 nnz + 블록 하나 크기)
+# - 다시 계산하는 책: 바뀐 책, 목록에 바뀐 책이 있는 책, 바뀐 책이 목록의 K번째보다 가까운 책,
+#   목록이 K개보다 짧은 책 (목록에 있던 책이 삭제되면 through row가 같이 지워져서 여기에 걸린다)
+
+CHECKPOINT = "content_similarity"
+
+# feature 종류별 가중치
+FIELD_WEIGHTS = {"d": 1.0, "a": 3.0, "c": 2.0, "p": 1.0}
+
+FIELDS = ("id", "description", "author", "category_id", "publisher")
+
+BLOCK_SIZE = 8192
+
+COLUMN_DTYPE = np.dtype("<u2")
+VALUE_DTYPE = np.dtype("<f4")
+
+
+def _features(description, author, category_id, publisher):
+    features = []
+    for token in ngram.tokenize(description):
+        features.append(f"d:{token}")
+        if len(token) > 2:
+            features.extend(f"d:{gram}" for gram in ngram.token_grams(token, 2) if len(gram) == 2)
+    if author:
+        features.append(f"a:{author.strip().lower()}")
+    features.append(f"c:{category_id}")
+    if publisher:
+        features.append(f"p:{publisher.strip().lower()}")
+    return features
+
+
+def featurize(description, author, category_id, publisher, dimensions):
+    """(열 번호, log TF) -> 열 번호 순으로 정렬된 두 배열"""
+    weights = {}
+    for feature in _features(description or "", author, category_id, publisher):
+        column = zlib.crc32(feature.encode()) % dimensions
+        weights[column] = weights.get(column, 0.0) + FIELD_WEIGHTS[feature[0]]
+    columns = np.array(sorted(weights), dtype=COLUMN_DTYPE)
+    # TF는 log로 눌러준다. (IDF는 계산할 때 전체 문서 빈도로 곱한다.)
+    values = np.log1p(np.array([weights[column] for column in columns.tolist()], dtype=VALUE_DTYPE))
+    return columns, values
+
+
+def encode_vector(columns, values):
+    return len(columns).to_bytes(4, "little") + columns.astype(COLUMN_DTYPE).tobytes() + values.astype(VALUE_DTYPE).tobytes()
+
+
+def decode_vector(data):
+    data = bytes(data)
+    count = int.from_bytes(data[:4], "little")
+    columns = np.frombuffer(data, dtype=COLUMN_DTYPE, count=count, offset=4)
+    values = np.frombuffer(data, dtype=VALUE_DTYPE, count=count, offset=4 + count * COLUMN_DTYPE.itemsize)
+    return columns, values
+
+
+class VectorSet:
+    """book_id 순으로 정렬된 sparse(CSR) log TF 벡터 + IDF / 행 norm. dense()로 일부 행만 펼친다."""
+
+    def __init__(self, book_ids, vectors, dimensions):
+        self.book_ids = np.asarray(book_ids, dtype=np.int64)
+        self.dimensions = dimensions
+        lengths = np.fromiter((len(columns) for columns, _ in vectors), dtype=np.int64, count=len(vectors))
+        self.indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = np.concatenate([columns for columns, _ in vectors]).astype(np.int32) if vectors else np.zeros(0, np.int32)
+        self.data = np.concatenate([values for _, values in vectors]).astype(np.float32) if vectors else np.zeros(0, np.float32)
+
+        document_frequency = np.bincount(self.indices, minlength=dimensions)
+        self.idf = (np.log((1 + len(self)) / (1 + document_frequency)) + 1).astype(np.float32)
+        rows = np.repeat(np.arange(len(self)), lengths)
+        squared = np.bincount(rows, weights=(self.data * self.idf[self.indices]) ** 2, minlength=len(self))
+        self.norms = np.sqrt(squared).astype(np.float32)
+        self.norms[self.norms == 0] = 1
+
+    def __len__(self):
+        return len(self.book_ids)
+
+    def positions(self, ids):
+        """ids의 행 위치, 없는 id는 -1"""
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(self):
+            return np.full(len(ids), -1, dtype=np.int64)
+        positions = np.searchsorted(self.book_ids, ids)
+        positions[positions >= len(self)] = 0
+        return np.where(self.book_ids[positions] == ids, positions, -1)
+
+    def dense(self, positions):
+        """positions 행을 L2 정규화된 TF-IDF dense 행렬로"""
+        positions = np.asarray(positions, dtype=np.int64)
+        starts = self.indptr[positions]
+        lengths = self.indptr[positions + 1] - starts
+        # 행마다 다른 길이의 구간을 한 번에 모은다.
+        offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        nnz = offsets + np.arange(lengths.sum())
+        rows = np.repeat(np.arange(len(positions)), lengths)
+        matrix = np.zeros((len(positions), self.dimensions), dtype=np.float32)
+        columns = self.indices[nnz]
+        matrix[rows, columns] = self.data[nnz] * self.idf[columns] / self.norms[positions][rows]
+        return matrix
+
+    def blocks(self, block_size=BLOCK_SIZE):
+        for start in range(0, len(self), block_size):
+            yield start, self.dense(np.arange(start, min(start + block_size, len(self))))
+
+
+def _top_k(vectors, row_positions, top_k, chunk_size=1024):
+    """row_positions 행마다 자기 자신을 뺀 유사도 상위 top_k (열 위치, 점수), 점수 내림차순"""
+    row_positions = np.asarray(row_positions, dtype=np.int64)
+    k = min(top_k, len(vectors) - 1)
+    if k <= 0 or not len(row_positions):
+        return {int(position): (np.zeros(0, np.int64), np.zeros(0, np.float32)) for position in row_positions}
+
+    best_scores = np.full((len(row_positions), k), -np.inf, dtype=np.float32)
+    best_columns = np.full((len(row_positions), k), -1, dtype=np.int64)
+    for block_start, block in vectors.blocks():
+        for start in range(0, len(row_positions), chunk_size):
+            positions = row_positions[start:start + chunk_size]
+            scores = vectors.dense(positions) @ block.T
+            inside = (positions >= block_start) & (positions < block_start + len(block))
+            scores[np.flatnonzero(inside), positions[inside] - block_start] = -np.inf
+
+            # 지금까지의 상위 k와 이번 블록을 합쳐서 다시 상위 k
+            merged_scores = np.concatenate([best_scores[start:start + chunk_size], scores], axis=1)
+            merged_columns = np.concatenate([
+                best_columns[start:start + chunk_size],
+                np.broadcast_to(np.arange(block_start, block_start + len(block)), scores.shape),
+            ], axis=1)
+            top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores[start:start + chunk_size] = np.take_along_axis(merged_scores, top, axis=1)
+            best_columns[start:start + chunk_size] = np.take_along_axis(merged_columns, top, axis=1)
+
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_columns = np.take_along_axis(best_columns, order, axis=1)
+    return {int(position): (columns, scores) for position, columns, scores in zip(row_positions, best_columns, best_scores)}
+
+
+def _affected_positions(vectors, changed, top_k, chunk_size=1024):
+    """바뀐 책 + 바뀐 책 때문에 목록이 달라질 수 있는 책의 행 위치"""
+    changed_positions = vectors.positions(sorted(changed))
+    changed_positions = changed_positions[changed_positions >= 0]
+    affected = set(changed_positions.tolist())
+
+    # 목록의 K번째 점수와 목록 길이 (저장된 score, 목록이 K개 미만이면 다시 계산)
+    kth_score = np.full(len(vectors), np.inf, dtype=np.float32)
+    link_count = np.zeros(len(vectors), dtype=np.int64)
+    links = np.array(
+        BookRecommendation.objects.values_list("from_book_id", "to_book_id", "score"), dtype=np.float64
+    ).reshape(-1, 3)
+    from_positions = vectors.positions(links[:, 0].astype(np.int64))
+    to_ids = links[:, 1].astype(np.int64)
+    known = from_positions >= 0
+    np.minimum.at(kth_score, from_positions[known], links[known, 2].astype(np.float32))
+    np.add.at(link_count, from_positions[known], 1)
+    affected.update(np.flatnonzero(link_count < min(top_k, len(vectors) - 1)).tolist())
+    if not len(changed_positions):
+        return affected
+
+    # 1) 지금 목록에 바뀐 책이 들어 있는 책
+    affected.update(from_positions[known & np.isin(to_ids, vectors.book_ids[changed_positions])].tolist())
+
+    # 2) 바뀐 책과의 유사도가 지금 목록의 K번째 점수보다 높은 책
+    for block_start, block in vectors.blocks():
+        best = np.full(len(block), -np.inf, dtype=np.float32)
+        for start in range(0, len(changed_positions), chunk_size):
+            changed_block = vectors.dense(changed_positions[start:start + chunk_size])
+            np.maximum(best, (block @ changed_block.T).max(axis=1), out=best)
+        kth = kth_score[block_start:block_start + len(block)]
+        affected.update((block_start + np.flatnonzero(best > kth)).tolist())
+    return affected
+
+
+def _refresh_vectors(dimensions, changed_since, batch_size):
+    """
+    BookVector를 지금 책 목록에 맞춘다. (changed_since 이후 바뀐 책과 아직 벡터가 없는 책만 featurize)
+    다시 만든 책 id를 반환한다. 삭제된 책의 벡터는 CASCADE로 이미 지워져 있다.
+    """
+    book_qs = Book.objects.order_by("id")
+    if changed_since is not None:
+        book_qs = book_qs.filter(
+            Q(updated_at__gte=changed_since) | ~Q(id__in=BookVector.objects.values("book_id"))
+        )
+
+    refreshed, batch = [], []
+    for book_id, description, author, category_id, publisher in book_qs.values_list(*FIELDS).iterator(
+        chunk_size=batch_size
+    ):
+        columns, values = featurize(description, author, category_id, publisher, dimensions)
+        batch.append(BookVector(book_id=book_id, vector=encode_vector(columns, values)))
+        refreshed.append(book_id)
+        if len(batch) >= batch_size:
+            _save_vectors(batch, batch_size)
+            batch = []
+    _save_vectors(batch, batch_size)
+    return refreshed
+
+
+def _save_vectors(batch, batch_size):
+    if batch:
+        BookVector.objects.bulk_create(
+            batch, batch_size=batch_size, update_conflicts=True, unique_fields=["book"], update_fields=["vector"]
+        )
+
+
+def load_vectors(dimensions):
+    """저장된 BookVector 전체를 VectorSet으로"""
+    book_ids, vectors = [], []
+    for book_id, data in BookVector.objects.order_by("book_id").values_list("book_id", "vector").iterator(chunk_size=5000):
+        book_ids.append(book_id)
+        vectors.append(decode_vector(data))
+    return VectorSet(book_ids, vectors, dimensions)
+
+
+def rebuild(full=False, top_k=None, dimensions=None, batch_size=5000):
+    """Book.recommends를 다시 계산하고 다시 계산한 책 수를 반환한다."""
+    top_k = top_k or settings.BOOK_RECOMMENDS_TOP_K
+    dimensions = dimensions or settings.SIMILARITY_DIMENSIONS
+    started_at = timezone.now()
+
+    checkpoint = Checkpoint.objects.filter(name=CHECKPOINT).first()
+    state = checkpoint.state if checkpoint else {}
+    last_run = parse_datetime(state.get("last_run", ""))
+    # 차원 수가 바뀌면 저장된 벡터를 쓸 수 없다.
+    full = full or last_run is None or state.get("dimensions") != dimensions
+    if full:
+        BookVector.objects.all().delete()
+
+    changed = _refresh_vectors(dimensions, None if full else last_run, batch_size)
+    vectors = load_vectors(dimensions)
+
+    if full:
+        positions = np.arange(len(vectors))
+    else:
+        positions = np.array(sorted(_affected_positions(vectors, changed, top_k)), dtype=np.int64)
+
+    neighbors = _top_k(vectors, positions, top_k)
+    recomputed_ids = [int(vectors.book_ids[position]) for position in neighbors]
+
+    with transaction.atomic():
+        if full:
+            BookRecommendation.objects.all().delete()
+        else:
+            for start in range(0, len(recomputed_ids), batch_size):
+                BookRecommendation.objects.filter(from_book_id__in=recomputed_ids[start:start + batch_size]).delete()
+        # bulk_create는 넘긴 객체를 전부 list로 만들기 때문에 batch_size씩 나눠서 넣는다.
+        links = (
+            BookRecommendation(
+                from_book_id=int(vectors.book_ids[position]),
+                to_book_id=int(vectors.book_ids[column]),
+                rank=rank,
+                score=float(score),
+            )
+            for position, (columns, scores) in neighbors.items()
+            for rank, (column, score) in enumerate(zip(columns, scores))
+            if column >= 0
+        )
+        while batch := list(islice(links, batch_size)):
+            BookRecommendation.objects.bulk_create(batch)
+        Checkpoint.objects.update_or_create(
+            name=CHECKPOINT, defaults={"state": {"last_run": started_at.isoformat(), "dimensions": dimensions}}
+        )
+    return len(recomputed_ids)
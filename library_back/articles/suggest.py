@@ -0,0 +1,233 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+from django.db.models import Max
+
+from .models import Book
+
+
+# 검색어 자동완성 (GET /books/suggest/?q=)
+# title / subTitle / author의 각 어절 시작부터를 자모 단위 키로 만들어 정렬된 배열에 넣고,
+# 입력한 글자의 자모열로 bisect해서 접두어가 같은 구간만 읽는다. DB는 보지 않는다.
+# - 자모로 풀기 때문에 입력 중인 글자도 맞는다: "한" -> "하늘"(ㅎㅏㄴㅡㄹ), "달" -> "닭", "고" -> "과"
+# - 프로세스마다 첫 요청에서 한 번 읽고, 같은 프로세스의 저장 / 삭제는 Book signal로 바로 반영한다.
+#   다른 프로세스(가져오기, 동기화 등)의 변경은 SUGGEST_REFRESH_INTERVAL초마다 updated_at 이후 것만 다시 읽는다.
+#   (다른 프로세스에서 삭제된 책은 재시작 전까지 후보에 남을 수 있다.)
+
+# 겹자모는 기본 자모로 나눠서 입력 도중의 글자와 맞춘다.
+INITIALS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+MEDIALS = ("ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+           "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ")
+FINALS = ("", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+          "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+# 따로 입력된 호환 자모(ㅘ, ㄺ 등)도 같은 기본 자모로
+COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+# 기본 자모 33개를 1바이트 문자(U+0080~)로 바꿔서 키 문자열을 latin-1 크기로 유지한다.
+BASIC_JAMO = INITIALS + "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅛㅜㅠㅡㅣ"
+JAMO_CODES = {jamo: chr(0x80 + index) for index, jamo in enumerate(BASIC_JAMO)}
+
+# 접두어 구간의 끝을 bisect로 찾을 때 쓰는 가장 큰 문자
+_LAST = chr(0x10FFFF)
+
+_SPACES = re.compile(r"\s+")
+
+
+def _jamo_table():
+    # 완성형 음절 11172자 + 호환 자모 -> 자모 코드 문자열 (str.translate용)
+    def codes(jamo):
+        return "".join(JAMO_CODES[char] for char in jamo)
+
+    table = {ord(jamo): codes(COMPOUND_JAMO.get(jamo, jamo)) for jamo in (*BASIC_JAMO, *COMPOUND_JAMO)}
+    for code in range(11172):
+        jamo = INITIALS[code // 588] + MEDIALS[code % 588 // 28] + FINALS[code % 28]
+        table[0xAC00 + code] = codes(jamo)
+    return table
+
+
+JAMO_TABLE = _jamo_table()
+
+
+def encode(text):
+    """소문자 + 공백 정리 + 한글 자모 분해 -> 키 문자열"""
+    text = _SPACES.sub(" ", unicodedata.normalize("NFC", text or "").lower()).strip()
+    return text.translate(JAMO_TABLE)
+
+
+def book_keys(title, sub_title, author, length):
+    """필드별 어절 시작부터의 키 (앞 length글자까지만)"""
+    keys = set()
+    for value in (title, sub_title, author):
+        encoded = encode(value)
+        start = 0
+        while encoded:
+            keys.add(encoded[start:start + length])
+            start = encoded.find(" ", start) + 1
+            if not start:
+                break
+    return tuple(keys)
+
+
+class SuggestIndex:
+    """
+    keys(정렬) / book_ids 두 배열을 같은 순서로 둔 접두어 색인 + 인기 순 책 목록 (프로세스별)
+    배열은 스냅샷이고, 그 뒤에 바뀐(저장 / 삭제된) 책은 _changed에만 모아 두었다가 쌓이면 한 번에 합친다.
+    (책 하나 바뀔 때마다 list.insert로 배열을 밀지 않는다.) 스냅샷에서 _changed에 있는 책은 건너뛴다.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._book_ids = []
+        # 스냅샷의 책 id, (-score, id) 순
+        self._ranking = []
+        # book_id -> (title, author, keys) / book_id -> score (항상 최신)
+        self._books = {}
+        self._scores = {}
+        self._changed = set()
+        self._loaded = False
+        self._watermark = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    def _rows(self, queryset):
+        return queryset.values_list("id", "title", "subTitle", "author", "score", "updated_at").iterator(
+            chunk_size=5000
+        )
+
+    def load(self):
+        # 읽는 도중에 바뀐 책은 다음 refresh 때 다시 읽도록 watermark를 먼저 잡는다.
+        watermark = Book.objects.aggregate(latest=Max("updated_at"))["latest"]
+        length = settings.SUGGEST_KEY_LENGTH
+        books, scores = {}, {}
+        for book_id, title, sub_title, author, score, _ in self._rows(Book.objects.all()):
+            books[book_id] = (title, author, book_keys(title, sub_title, author, length))
+            scores[book_id] = score
+
+        with self._lock:
+            self._keys, self._book_ids, self._ranking = [], [], []
+            self._books = books
+            self._scores = scores
+            self._changed = set(books)
+            self._merge()
+            self._watermark = watermark
+            self._checked_at = time.monotonic()
+            self._loaded = True
+
+    def _merge(self):
+        """_changed의 책을 스냅샷 배열에 합친다. O(스냅샷 + 바뀐 책 log 바뀐 책)"""
+        changed = self._changed
+        new_entries = sorted(
+            (key, book_id) for book_id in changed if book_id in self._books for key in self._books[book_id][2]
+        )
+        entries = list(heapq.merge(
+            ((key, book_id) for key, book_id in zip(self._keys, self._book_ids) if book_id not in changed),
+            new_entries,
+        ))
+        self._keys = [key for key, _ in entries]
+        self._book_ids = [book_id for _, book_id in entries]
+
+        new_ranking = sorted((book_id for book_id in changed if book_id in self._scores), key=self._rank_key)
+        self._ranking = list(heapq.merge(
+            (book_id for book_id in self._ranking if book_id not in changed), new_ranking, key=self._rank_key
+        ))
+        self._changed = set()
+
+    def _rank_key(self, book_id):
+        # 점수가 같으면 id 순
+        return -self._scores[book_id], book_id
+
+    def _refresh(self):
+        if self._loaded and time.monotonic() - self._checked_at < settings.SUGGEST_REFRESH_INTERVAL:
+            return
+
+        with self._lock:
+            if not self._loaded:
+                self.load()
+                return
+            if time.monotonic() - self._checked_at < settings.SUGGEST_REFRESH_INTERVAL:
+                return
+            self._checked_at = time.monotonic()
+            queryset = Book.objects.all()
+            if self._watermark is not None:
+                queryset = queryset.filter(updated_at__gt=self._watermark)
+            for book_id, title, sub_title, author, score, updated_at in self._rows(queryset):
+                self._put(book_id, title, sub_title, author, score)
+                self._watermark = updated_at if self._watermark is None else max(self._watermark, updated_at)
+
+    def _put(self, book_id, title, sub_title, author, score):
+        keys = book_keys(title, sub_title, author, settings.SUGGEST_KEY_LENGTH)
+        self._books[book_id] = (title, author, keys)
+        self._scores[book_id] = score
+        self._mark_changed(book_id)
+
+    def _remove(self, book_id):
+        if self._books.pop(book_id, None) is not None:
+            del self._scores[book_id]
+            self._mark_changed(book_id)
+
+    def _mark_changed(self, book_id):
+        self._changed.add(book_id)
+        if len(self._changed) >= settings.SUGGEST_PENDING_MAX:
+            self._merge()
+
+    def update_book(self, book):
+        # Book post_save signal: 아직 안 읽은 프로세스면 첫 요청 때 어차피 전부 읽는다.
+        if self._loaded:
+            with self._lock:
+                self._put(book.pk, book.title, book.subTitle, book.author, book.score)
+
+    def remove_book(self, book_id):
+        if self._loaded:
+            with self._lock:
+                self._remove(book_id)
+
+    def _has_prefix(self, book_id, prefix):
+        return any(key.startswith(prefix) for key in self._books[book_id][2])
+
+    def suggest(self, q, limit):
+        """
+        q로 시작하는 어절이 있는 책을 인기(score) 순으로 최대 limit권
+        - 접두어 구간이 SUGGEST_MAX_SCAN개 이하면 구간을 다 읽는다.
+        - 더 길면(짧은 접두어) 인기 순 목록을 앞에서부터 훑어서 맞는 책 limit권에서 멈춘다.
+          구간이 길수록 맞는 책이 많아서 일찍 끝난다.
+        - 스냅샷 뒤에 바뀐 책(_changed, 많아야 SUGGEST_PENDING_MAX권)은 따로 확인한다.
+        """
+        prefix = encode(q)[:settings.SUGGEST_KEY_LENGTH]
+        if not prefix or limit <= 0:
+            return []
+        self._refresh()
+
+        with self._lock:
+            changed = self._changed
+            found = {
+                book_id for book_id in changed if book_id in self._books and self._has_prefix(book_id, prefix)
+            }
+            start = bisect.bisect_left(self._keys, prefix)
+            end = bisect.bisect_left(self._keys, prefix + _LAST, start)
+            if end - start <= settings.SUGGEST_MAX_SCAN:
+                found.update(book_id for book_id in self._book_ids[start:end] if book_id not in changed)
+            else:
+                count = 0
+                for book_id in self._ranking:
+                    if book_id not in changed and self._has_prefix(book_id, prefix):
+                        found.add(book_id)
+                        count += 1
+                        if count >= limit:
+                            break
+            top = heapq.nsmallest(limit, found, key=self._rank_key)
+            return [{"id": book_id, "title": self._books[book_id][0], "author": self._books[book_id][1]}
+                    for book_id in top]
+
+    def size(self):
+        return len(self._keys)
+
+
+suggest_index = SuggestIndex()
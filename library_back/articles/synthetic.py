@@ -0,0 +1,243 @@
+import datetime
+import time
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from . import leaderboard, ngram, versioning
+from .models import Book, Category, Comment, Favorite
+
+
+# 벤치마크 / 부하 테스트용 합성 데이터 (manage.py generate_dataset, manage.py bench_api --seed)
+# - 한국어 제목 / 설명 / 작가 / 출판사 / 댓글을 단어 조합으로 만든다.
+# - 책 인기도는 Zipf 분포: 순위 r인 책이 즐겨찾기 / 댓글 / 조회수를 1 / r^s 비율로 받는다.
+# - 모두 bulk_create로 넣고, signal을 타지 않으므로 끝나면 leaderboard / n-gram 색인 / 데이터 버전을 직접 맞춘다.
+# 같은 random_seed면 같은 데이터가 만들어진다.
+
+CATEGORY_NAMES = (
+    "소설/시/희곡", "경제/경영", "자기계발", "인문학", "역사", "과학", "사회과학", "에세이",
+    "여행", "요리/살림", "건강/취미", "어린이", "청소년", "만화", "컴퓨터/모바일", "예술/대중문화",
+)
+
+USERNAME_PREFIX = "synthetic"
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류전홍고문양손배백허유남심노하곽성차주우구민진지엄채원천방공현함변염여추도소석선설마길연위표명기반왕금옥육인맹제모탁국어은편용"
+GIVEN_SYLLABLES = "민서지현수영준우예은도윤하진성연주희혜경아원재호태정동승유나소채다한결빈율린솔온"
+
+ADJECTIVES = (
+    "작은", "푸른", "조용한", "낯선", "오래된", "따뜻한", "차가운", "눈부신", "사라진", "보이지 않는",
+    "마지막", "처음의", "느린", "깊은", "빛나는", "외로운", "이상한", "긴", "하얀", "붉은",
+)
+NOUNS = (
+    "바다", "기억", "도시", "여름", "편지", "시간", "사람", "마음", "겨울", "나무", "숲", "거리", "별",
+    "정원", "기차", "섬", "새벽", "집", "이름", "목소리", "그림자", "계절", "파도", "서점", "골목",
+    "경제", "미래", "습관", "철학", "역사", "우주", "데이터", "세계", "언어", "도서관", "식탁", "여행",
+)
+TOPICS = (
+    "삶과 죽음", "가족의 의미", "일의 본질", "사랑과 상실", "성장의 기록", "기술과 사회", "돈의 흐름",
+    "몸과 마음", "도시의 역사", "자연과 인간", "관계의 기술", "생각하는 법",
+)
+SENTENCES = (
+    "{noun}에 대한 {adj} 이야기를 담았다.",
+    "저자는 {topic}에 관해 오랫동안 품어온 질문을 차분하게 풀어낸다.",
+    "{adj} {noun} 속에서 우리가 놓친 것들을 다시 바라보게 한다.",
+    "출간 직후 독자들의 입소문을 타며 꾸준히 사랑받고 있다.",
+    "{topic}을 이해하고 싶은 모든 사람에게 권하는 책이다.",
+    "한 문장 한 문장이 {adj} {noun}처럼 마음에 남는다.",
+)
+COMMENTS = (
+    "정말 재미있게 읽었어요.", "추천합니다!", "생각보다 어려웠지만 좋았어요.", "두 번째 읽는 중입니다.",
+    "문장이 아름다워요.", "기대보다는 아쉬웠어요.", "선물하기 좋은 책이에요.", "밤새 읽었습니다.",
+    "{noun} 이야기가 인상 깊었어요.", "{adj} 분위기가 좋아요.",
+)
+
+
+class TextGenerator:
+    """단어 목록을 조합해서 그럴듯한 한국어 문자열을 만든다."""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def _pick(self, items):
+        return items[self.rng.integers(len(items))]
+
+    def _fill(self, template):
+        return template.format(adj=self._pick(ADJECTIVES), noun=self._pick(NOUNS), topic=self._pick(TOPICS))
+
+    def person(self):
+        given = "".join(self._pick(GIVEN_SYLLABLES) for _ in range(2))
+        return self._pick(SURNAMES) + given
+
+    def title(self):
+        if self.rng.random() < 0.5:
+            return f"{self._pick(ADJECTIVES)} {self._pick(NOUNS)}"
+        return f"{self._pick(NOUNS)}의 {self._pick(NOUNS)}"
+
+    def description(self):
+        count = int(self.rng.integers(2, 7))
+        return " ".join(self._fill(self._pick(SENTENCES)) for _ in range(count))
+
+    def publisher(self):
+        return f"{self._pick(NOUNS)}{self._pick(('출판사', '북스', '문학사', '미디어', '출판'))}"
+
+    def comment(self):
+        return self._fill(self._pick(COMMENTS))
+
+
+class ZipfSampler:
+    """
+    0..n-1을 Zipf 분포(순위 r의 확률 ∝ 1 / r^exponent)로 뽑는다.
+    어느 위치가 몇 위인지는 permutation으로 섞어서, 인기 책이 id 순서에 몰리지 않게 한다.
+    """
+
+    def __init__(self, n, exponent, rng):
+        self.rng = rng
+        weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** exponent
+        self.probabilities = weights / weights.sum()
+        self._cdf = np.cumsum(self.probabilities)
+        self.order = rng.permutation(n)
+
+    def sample(self, size):
+        ranks = np.searchsorted(self._cdf, self.rng.random(size) * self._cdf[-1])
+        return self.order[np.minimum(ranks, len(self.order) - 1)]
+
+    def expected(self, total):
+        """total을 인기도 비율대로 나눴을 때 위치별 몫 (조회수 등)"""
+        counts = np.zeros(len(self.order), dtype=np.int64)
+        counts[self.order] = np.floor(self.probabilities * total).astype(np.int64)
+        return counts
+
+
+def _batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bulk(model, objects, batch_size, **options):
+    total = 0
+    for batch in _batched(objects, batch_size):
+        model.objects.bulk_create(batch, batch_size=batch_size, **options)
+        total += len(batch)
+    return total
+
+
+def ensure_categories():
+    Category.objects.bulk_create(
+        (Category(name=name) for name in CATEGORY_NAMES), ignore_conflicts=True
+    )
+    # "전체"(fixture의 0번)는 책을 넣는 카테고리가 아니다.
+    return list(Category.objects.exclude(name="전체").order_by("id").values_list("id", flat=True))
+
+
+def _books(text, rng, start, count, category_ids, views):
+    for offset in range(count):
+        index = start + offset
+        author = text.person()
+        yield Book(
+            category_id=category_ids[rng.integers(len(category_ids))],
+            title=text.title(),
+            description=text.description(),
+            isbn=f"990{index:010d}",
+            cover="",
+            publisher=text.publisher(),
+            pub_date=datetime.date(1990, 1, 1) + datetime.timedelta(days=int(rng.integers(12500))),
+            author=author,
+            author_info=f"{author}은(는) {text.title()}(으)로 데뷔했다.",
+            author_photo="",
+            customer_review_rank=None if rng.random() < 0.2 else int(rng.integers(11)),
+            subTitle="",
+            views=int(views[offset]),
+        )
+
+
+def seed(books=0, users=0, favorites_per_user=0, comments=0, views=None, zipf_exponent=1.1,
+         batch_size=5000, random_seed=0, progress=None):
+    """
+    지정한 수만큼 책 / 사용자(관심 카테고리 포함) / 즐겨찾기 / 댓글을 추가하고 종류별로 추가한 수를 반환한다.
+    favorites_per_user는 사용자별 평균, views는 전체 책에 인기도대로 나눌 조회수 합계 중 새 책 몫만 들어간다. (기본 books * 50)
+    progress(name, count, seconds): 종류별로 끝날 때마다 호출
+    """
+    rng = np.random.default_rng(random_seed)
+    text = TextGenerator(rng)
+    report = progress or (lambda name, count, seconds: None)
+    views = books * 50 if views is None else views
+    User = get_user_model()
+    created = {}
+
+    def stage(name, run):
+        started = time.perf_counter()
+        created[name] = run()
+        report(name, created[name], time.perf_counter() - started)
+
+    with transaction.atomic():
+        category_ids = ensure_categories()
+
+        # 인기도 순위는 기존 책까지 포함한 전체 책(id 순 위치)에 한 번 정하고 조회수 / 즐겨찾기 / 댓글에 같이 쓴다.
+        start = Book.objects.count()
+        popularity = ZipfSampler(start + books, zipf_exponent, rng) if start + books else None
+        book_views = popularity.expected(views)[start:] if books else []
+        stage("books", lambda: _bulk(Book, _books(text, rng, start, books, category_ids, book_views), batch_size))
+
+        start = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        stage("users", lambda: _bulk(
+            User,
+            (User(username=f"{USERNAME_PREFIX}{index}", password="!") for index in range(start, start + users)),
+            batch_size,
+        ))
+
+        book_ids = np.array(Book.objects.order_by("id").values_list("id", flat=True), dtype=np.int64)
+        user_ids = np.array(
+            User.objects.filter(username__startswith=USERNAME_PREFIX).order_by("id").values_list("id", flat=True),
+            dtype=np.int64,
+        )
+        new_user_ids = user_ids[len(user_ids) - users:] if users else user_ids[:0]
+
+        # 사용자 관심 카테고리 (User.categories) 1~3개
+        through = User.categories.through
+        stage("user_categories", lambda: _bulk(
+            through,
+            (
+                through(user_id=int(user_id), category_id=int(category_id))
+                for user_id in new_user_ids
+                for category_id in rng.choice(category_ids, size=min(int(rng.integers(1, 4)), len(category_ids)),
+                                              replace=False)
+            ),
+            batch_size,
+            ignore_conflicts=True,
+        ))
+
+        def favorites():
+            if popularity is None:
+                return
+            for user_id in new_user_ids:
+                count = min(int(rng.poisson(favorites_per_user)), len(book_ids))
+                for book_id in np.unique(book_ids[popularity.sample(count)]):
+                    yield Favorite(user_id=int(user_id), book_id=int(book_id))
+
+        stage("favorites", lambda: _bulk(Favorite, favorites(), batch_size, ignore_conflicts=True))
+
+        def comment_rows():
+            if popularity is None or not len(user_ids):
+                return
+            for batch_start in range(0, comments, batch_size):
+                size = min(batch_size, comments - batch_start)
+                books_for_batch = book_ids[popularity.sample(size)]
+                users_for_batch = user_ids[rng.integers(len(user_ids), size=size)]
+                for book_id, user_id in zip(books_for_batch, users_for_batch):
+                    yield Comment(user_id=int(user_id), book_id=int(book_id), content=text.comment())
+
+        stage("comments", lambda: _bulk(Comment, comment_rows(), batch_size))
+
+        leaderboard.rebuild()
+        if books and ngram.enabled():
+            ngram.rebuild(batch_size=batch_size)
+        for scope in (versioning.CATALOG, versioning.VIEWS, versioning.FAVORITES):
+            versioning.bump(scope)
+    return created
@@ -1,3 +1,1515 @@
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import io
+import itertools
+import json
+import math
+import os
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.models import F
+from django.db.models.signals import pre_delete
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.serializers import ListSerializer, ModelSerializer, Serializer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from . import (
+    aladin, benchmark, cache, export, fake_aladin, importer, leaderboard, ngram, pagination, performance, recommender,
+    search, similarity, synthetic, trending, versioning, viewcounter,
+)
+from .conditional import catalog_conditional
+from .suggest import suggest_index
+from .serializers import CategoryListSerializer
+from .models import (
+    Book, BookEvent, BookNgram, BookRecommendation, BookVector, Category, Checkpoint, Comment, Favorite, TrendingScore,
+)
+
+
+# endpoint별 쿼리 수 예산
+# 데이터가 10 / 100 / 1000건으로 늘어나도 쿼리 수가 예산을 넘거나 늘어나면 실패한다. (N+1 방지)
+
+SIZES = (10, 100, 1000)
+
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests"},
+    "recommendations": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tests-rec"},
+}
+
+
+def clear_caches():
+    for alias in TEST_CACHES:
+        caches[alias].clear()
+
+
+@override_settings(VIEW_COUNTER_MAX_PENDING=1, CACHES=TEST_CACHES)
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="소설/시/희곡")
+        cls.user = User.objects.create_user(username="reader", password="password1234!")
+        # 버전 row가 처음 만들어지는 INSERT가 첫 요청에만 끼지 않도록 미리 만들어 둔다.
+        for scope in (versioning.CATALOG, versioning.VIEWS, versioning.FAVORITES):
+            versioning.bump(scope)
+        trending.compact(force=True)
+
+    def setUp(self):
+        clear_caches()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _seed(self, size):
+        # 책, 즐겨찾기, 댓글을 size건까지 채운다.
+        book_count = Book.objects.count()
+        Book.objects.bulk_create(
+            Book(
+                category=self.category,
+                title=f"테스트 도서 {i}",
+                description="설명",
+                isbn=f"{i:013d}",
+                cover="",
+                publisher="출판사",
+                pub_date=datetime.date(2024, 1, 1),
+                author=f"작가 {i % 7}",
+                author_info="",
+                author_photo="",
+                subTitle="",
+            )
+            for i in range(book_count, size)
+        )
+        books = list(Book.objects.order_by("id")[:size])
+
+        user_count = User.objects.count()
+        User.objects.bulk_create(User(username=f"user{i}") for i in range(user_count, size))
+        users = list(User.objects.order_by("id")[:size])
+
+        Favorite.objects.bulk_create(
+            (Favorite(user=self.user, book=book) for book in books[: size // 2]),
+            ignore_conflicts=True,
+        )
+        comment_count = Comment.objects.filter(book=books[0]).count()
+        Comment.objects.bulk_create(
+            Comment(user=users[i], book=books[0], content=f"댓글 {i}")
+            for i in range(comment_count, size)
+        )
+        return books
+
+    def assertQueryBudget(self, url, budget):
+        counts = []
+        for size in SIZES:
+            with self.subTest(url=url, size=size):
+                self._seed(size)
+                clear_caches()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(
+                    len(queries), budget,
+                    "\n".join(query["sql"] for query in queries.captured_queries),
+                )
+                counts.append(len(queries))
+        self.assertEqual(counts, sorted(counts, reverse=True), f"{url} 쿼리 수가 데이터 크기에 따라 늘어남: {counts}")
+
+    def test_books(self):
+        self.assertQueryBudget("/api/v1/articles/books/", 2)
+
+    def test_books_detail(self):
+        # 조회수 반영 2 (views, 버전) + 최근 인기 이벤트 3 (landmark, 이벤트, 점수) + 응답 3
+        self._seed(1)
+        self.assertQueryBudget(f"/api/v1/articles/books/{Book.objects.first().pk}/", 8)
+
+    def test_popular_books(self):
+        self.assertQueryBudget("/api/v1/articles/books/popular/", 2)
+
+    def test_trending_books(self):
+        for book in self._seed(1000):
+            trending.record(trending.VIEW, {book.pk: book.pk % 7})
+        self.assertQueryBudget("/api/v1/articles/books/trending/?window=7d", 2)
+
+    def test_recommended_books(self):
+        # 협업 필터링 이웃 목록을 프로세스에 처음 올리는 쿼리 2개 포함
+        self.assertQueryBudget("/api/v1/articles/books/recommended/", 5)
+
+    def test_comments(self):
+        # 댓글 수(Book.comment_count) 1 + 댓글 페이지 1
+        self._seed(1)
+        self.assertQueryBudget(f"/api/v1/articles/books/{Book.objects.first().pk}/comments/", 2)
+
+    def test_favorites(self):
+        self.assertQueryBudget("/api/v1/articles/favorites/", 1)
+
+    def test_category_books(self):
+        for sort in ("views", "pub_date", "rank"):
+            self.assertQueryBudget(f"/api/v1/articles/categories/{self.category.pk}/books/?sort={sort}", 2)
+
+    def test_categories(self):
+        self.assertQueryBudget("/api/v1/articles/categories/", 2)
+
+
+class FlakyClient(aladin.AladinClient):
+    """fail_after번 요청한 뒤부터 실패하는 클라이언트 (중간에 끊긴 동기화 재현)"""
+
+    def __init__(self, fail_after, **kwargs):
+        super().__init__(**kwargs)
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def search(self, query, page, per_page=aladin.MAX_PER_PAGE):
+        self.calls += 1
+        if self.calls > self.fail_after:
+            raise aladin.AladinError("interrupted")
+        return super().search(query, page, per_page)
+
+
+class AladinSyncTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server, cls.base_url = fake_aladin.start_in_thread(total=120)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.categories = [Category.objects.create(name=name) for name in ("소설/시/희곡", "경제/경영")]
+
+    def test_sync_resumes_from_checkpoint(self):
+        options = {"categories": self.categories, "max_pages": 10, "per_page": 20, "workers": 1, "batch_size": 30}
+        with self.assertRaises(aladin.AladinError):
+            aladin.sync(FlakyClient(4, base_url=self.base_url, rate=0), **options)
+        state = Checkpoint.objects.get(name=f"aladin:{self.categories[0].id}").state
+        self.assertFalse(state["done"])
+
+        result = aladin.sync(aladin.AladinClient(base_url=self.base_url, rate=0), **options)
+        self.assertLess(result.rows, 240)
+        self.assertEqual(Book.objects.count(), 240)
+        for category in self.categories:
+            state = Checkpoint.objects.get(name=f"aladin:{category.id}").state
+            self.assertEqual(state, {"page": 6, "last_page": 6, "done": True})
+            self.assertEqual(category.books.count(), 120)
+
+        # 다 받은 카테고리는 다시 요청하지 않는다.
+        client = FlakyClient(0, base_url=self.base_url, rate=0)
+        self.assertEqual(aladin.sync(client, **options).rows, 0)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PerformanceMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name="소설/시/희곡")
+        cls.admin = User.objects.create_superuser(username="admin", password="password1234!")
+
+    def setUp(self):
+        clear_caches()
+        performance.route_stats.reset()
+        self.client = APIClient()
+
+    def test_server_timing_and_stats(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/articles/categories/")
+        metrics = dict(part.strip().split(";", 1) for part in response["Server-Timing"].split(","))
+        self.assertEqual(set(metrics), {"db", "serialize", "render", "total"})
+        self.assertIn(f'desc="{len(queries)} queries"', metrics["db"])
+
+        self.assertEqual(self.client.get("/api/v1/articles/perf/stats/").status_code, 401)
+        self.client.force_authenticate(self.admin)
+        routes = self.client.get("/api/v1/articles/perf/stats/").json()["routes"]
+        self.assertEqual(routes["GET /api/v1/articles/categories/"]["count"], 1)
+
+    def test_serializer_timing_is_opt_in(self):
+        # DRF 클래스는 그대로 두고 TimedSerializerMixin을 상속한 serializer만 잰다.
+        for cls in (Serializer, ListSerializer):
+            self.assertEqual(cls.data.fget.__module__, "rest_framework.serializers")
+
+        class PlainCategorySerializer(ModelSerializer):
+            class Meta:
+                model = Category
+                fields = "__all__"
+
+        categories = Category.objects.all()
+        metrics = performance.RequestMetrics()
+        token = performance._current.set(metrics)
+        self.addCleanup(performance._current.reset, token)
+        with mock.patch.object(performance.time, "perf_counter", side_effect=itertools.count()):
+            PlainCategorySerializer(categories, many=True).data
+            self.assertEqual(metrics.serialize_time, 0)
+            data = CategoryListSerializer(categories, many=True).data
+            self.assertEqual(metrics.serialize_time, 1)
+            CategoryListSerializer(categories[0]).data
+            self.assertEqual(metrics.serialize_time, 2)
+        self.assertIsInstance(CategoryListSerializer(categories, many=True), performance.TimedListSerializer)
+        self.assertEqual(data, [{"id": categories[0].pk, "name": "소설/시/희곡"}])
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FastJSONTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="소설/시/희곡")
+        Book.objects.bulk_create(
+            Book(
+                category=cls.category,
+                # JSON escape가 갈리기 쉬운 문자들
+                title=f'따옴표" 역슬래시\\ 제어\x01\t 줄바꿈   이모지\U0001F4DA {i}',
+                description="설명",
+                isbn=f"{i:013d}",
+                cover="",
+                publisher="출판사",
+                pub_date=datetime.date(2024, 1, 1),
+                author=f"작가 {i % 3}",
+                author_info="",
+                author_photo="",
+                subTitle="",
+                views=i * 7 % 5,
+                customer_review_rank=None if i % 4 == 0 else i % 10,
+            )
+            for i in range(30)
+        )
+
+    def test_same_bytes_as_serializers(self):
+        client = APIClient()
+        category = f"/api/v1/articles/categories/{self.category.pk}/books/"
+        urls = [
+            "/api/v1/articles/books/",
+            "/api/v1/articles/books/?fields=title,id&page_size=7",
+            "/api/v1/articles/books/popular/",
+            "/api/v1/articles/categories/",
+            f"{category}?sort=rank&page_size=11",
+            f"{category}?sort=views&fields=cover",
+            "/api/v1/articles/books/?format=json&page_size=3",
+        ]
+        for url in urls:
+            # 커서를 따라가며 모든 페이지를 비교한다.
+            while url:
+                with self.subTest(url=url):
+                    responses = []
+                    for fast in (False, True):
+                        clear_caches()
+                        with self.settings(FAST_JSON_RESPONSES=fast):
+                            responses.append(client.get(url))
+                    slow, fast = responses
+                    self.assertEqual(slow.status_code, 200)
+                    self.assertEqual(slow.content, fast.content)
+                    self.assertEqual(slow.get("X-Next-Cursor"), fast.get("X-Next-Cursor"))
+                url = slow.get("Link", "")[1:].split(">")[0]
+
+
+class TrendingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="소설/시/희곡")
+        cls.old, cls.new = Book.objects.bulk_create(
+            Book(
+                category=category, title=title, description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author="", author_info="", author_photo="", subTitle="",
+            )
+            for title in ("예전 인기", "요즘 인기")
+        )
+
+    def ranking(self, window):
+        return [book.pk for book in trending.top(window, 10)]
+
+    def test_decay_compaction_and_rebase(self):
+        start = 480000.0  # epoch 기준 시간 번호 (하루의 시작)
+        trending.record(trending.VIEW, {self.old.pk: 100, 0: 5}, now=start)
+        trending.record(trending.VIEW, {self.new.pk: 40}, now=start + 48)
+        # 48시간 전 조회 100 × e^-2 ≈ 13.5 < 40 / 7일 창에서는 100 × e^(-48/168) ≈ 75 > 40
+        self.assertEqual(self.ranking("24h"), [self.new.pk, self.old.pk])
+        self.assertEqual(self.ranking("7d"), [self.old.pk, self.new.pk])
+
+        for hour in range(1, 6):
+            trending.record(trending.COMMENT, {self.new.pk: 1}, now=start + hour)
+        now = start + 24 * 10 + 0.5
+        result = trending.compact(now=now, force=True)
+        self.assertEqual(result["rolled_up"], 5)
+        self.assertTrue(result["rebased"])
+        # 하루 bucket으로 합쳐져도 이벤트 수는 그대로
+        self.assertEqual(
+            dict(BookEvent.objects.filter(hour__lt=start + 24).values_list("kind", "count")),
+            {trending.VIEW: 100, trending.COMMENT: 5},
+        )
+        # rebase 후 점수는 지금 시각의 감쇠 점수
+        score = TrendingScore.objects.get(book=self.new, window="7d").score
+        expected = 40 * math.exp(-(now // 1 - start - 48) / 168) + sum(
+            5 * math.exp(-(now // 1 - start - hour) / 168) for hour in range(1, 6)
+        )
+        self.assertAlmostEqual(score, expected, places=6)
+        self.assertEqual(self.ranking("24h"), [self.new.pk])  # 0.01 미만 점수는 지워진다.
+
+        self.assertIsNone(trending.compact(now=now + 0.1))
+        # 이벤트로 다시 계산해도 (bucket 가운데 시각 기준이라 약간 차이) 같은 점수 / 순위
+        before = dict(TrendingScore.objects.filter(window="7d").values_list("book_id", "score"))
+        trending.rebuild(now=now)
+        after = dict(TrendingScore.objects.filter(window="7d").values_list("book_id", "score"))
+        for book_id, score in before.items():
+            self.assertAlmostEqual(after[book_id], score, delta=score * 0.01)
+        self.assertEqual(self.ranking("7d"), [self.old.pk, self.new.pk])
+
+
+class SuggestTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="소설/시/희곡")
+        cls.sky, cls.chicken, cls.fruit = Book.objects.bulk_create(
+            Book(
+                category=category, title=title, description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author=author, author_info="", author_photo="",
+                subTitle=sub_title, score=score,
+            )
+            for title, sub_title, author, score in (
+                ("하늘과 바람과 별과 시", "", "윤동주", 30),
+                ("닭 울음", "새벽의 기록", "Han Kang", 20),
+                ("과일 가게", "", "하지민", 10),
+            )
+        )
+
+    def setUp(self):
+        suggest_index.load()
+
+    def titles(self, q):
+        return [row["title"] for row in suggest_index.suggest(q, 10)]
+
+    def test_jamo_prefix(self):
+        # 입력 중인 글자(받침이 다음 글자 초성이 될 수도 있음), 겹받침 / 겹모음, 어절 중간, 작가
+        self.assertEqual(self.titles("한"), ["하늘과 바람과 별과 시"])
+        self.assertEqual(self.titles("하"), ["하늘과 바람과 별과 시", "과일 가게"])
+        self.assertEqual(self.titles("달"), ["닭 울음"])
+        self.assertEqual(self.titles("고"), ["과일 가게"])
+        self.assertEqual(self.titles("바람과 ㅂ"), ["하늘과 바람과 별과 시"])
+        self.assertEqual(self.titles("새벽"), ["닭 울음"])
+        self.assertEqual(self.titles("HAN k"), ["닭 울음"])
+        self.assertEqual(self.titles("늘"), [])
+
+    def test_signals_and_endpoint(self):
+        self.fruit.title = "하얀 달"
+        self.fruit.save()
+        self.assertEqual(self.titles("달"), ["닭 울음", "하얀 달"])
+        self.assertEqual(self.titles("과일"), [])
+        self.sky.delete()
+        self.assertEqual(self.titles("하"), ["하얀 달"])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = APIClient().get("/api/v1/articles/books/suggest/", {"q": "닭", "page_size": 1})
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(response.json(), [{"id": self.chicken.pk, "title": "닭 울음", "author": "Han Kang"}])
+
+    def test_short_prefix_returns_most_popular(self):
+        # 키 순으로 앞에 있는 인기 없는 책이 많아도 인기 있는 책이 나와야 한다.
+        Book.objects.bulk_create(
+            Book(
+                category=self.sky.category, title=f"하{syllable}", description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author="", author_info="", author_photo="", subTitle="",
+                score=index,
+            )
+            for index, syllable in enumerate("가나다라마바사")
+        )
+        suggest_index.load()
+        for max_scan in (2, 1000):
+            with self.subTest(max_scan=max_scan), self.settings(SUGGEST_MAX_SCAN=max_scan):
+                self.assertEqual(
+                    [row["title"] for row in suggest_index.suggest("ㅎ", 3)], ["하늘과 바람과 별과 시", "과일 가게", "하사"]
+                )
+                self.assertEqual([row["title"] for row in suggest_index.suggest("하", 2)], ["하늘과 바람과 별과 시", "과일 가게"])
+
+    def check_changes(self):
+        Book.objects.filter(pk=self.fruit.pk).update(score=40)
+        self.fruit.refresh_from_db()
+        self.fruit.save()
+        self.assertEqual(self.titles("하"), ["과일 가게", "하늘과 바람과 별과 시"])
+        self.sky.title = "별 헤는 밤"
+        self.sky.save()
+        self.assertEqual(self.titles("하"), ["과일 가게"])
+        self.assertEqual(self.titles("별"), ["별 헤는 밤"])
+        self.chicken.delete()
+        self.assertEqual(self.titles("달"), [])
+
+        # 스냅샷에 합친 뒤에도 같은 결과
+        suggest_index._merge()
+        self.assertEqual(suggest_index.size(), len(suggest_index._book_ids))
+        self.assertEqual(self.titles("하"), ["과일 가게"])
+        self.assertEqual(self.titles("ㅎ"), ["과일 가게", "별 헤는 밤"])
+        self.assertEqual(self.titles("달"), [])
+
+    @override_settings(SUGGEST_MAX_SCAN=1)
+    def test_changes_before_merge(self):
+        self.check_changes()
+
+    @override_settings(SUGGEST_MAX_SCAN=1, SUGGEST_PENDING_MAX=1)
+    def test_changes_merged_immediately(self):
+        self.check_changes()
+
+
+@override_settings(BOOK_SEARCH_MODE="fts")
+class SearchTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name="소설/시/희곡")
+        self.book = Book.objects.create(
+            category=category, title="소년이 온다", description="광주의 오월", isbn="", cover="",
+            publisher="창비", pub_date=datetime.date(2014, 5, 19), author="한강", author_info="",
+            author_photo="", subTitle="",
+        )
+
+    def search(self, q):
+        response = APIClient().get("/api/v1/articles/books/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.json()]
+
+    def test_index_follows_book_changes(self):
+        self.assertEqual(self.search("소년"), ["소년이 온다"])
+        self.assertEqual(self.search("오월"), ["소년이 온다"])
+
+        self.book.title = "흰"
+        self.book.save()
+        self.assertEqual(self.search("소년"), [])
+        self.assertEqual(self.search("흰"), ["흰"])
+
+        self.book.delete()
+        self.assertEqual(self.search("흰"), [])
+
+    def test_missing_triggers_are_recreated(self):
+        # 테이블을 다시 만드는 마이그레이션이 트리거를 지운 상황
+        with connection.cursor() as cursor:
+            for name in search.FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {name}")
+        with self.assertLogs("articles.search", "WARNING"):
+            self.assertTrue(search.ensure_fts_triggers())
+        self.assertFalse(search.ensure_fts_triggers())
+
+        Book.objects.filter(pk=self.book.pk).update(title="흰")
+        self.assertEqual(self.search("흰"), ["흰"])
+        self.assertEqual(self.search("소년"), [])
+
+    def test_highlight_escapes_book_text(self):
+        book = Book.objects.create(
+            category=self.book.category, title="<script>alert(1)</script> 소년", isbn="", cover="",
+            description='<img src=x onerror="alert(1)"> 소년 & 오월', publisher="", pub_date=datetime.date(2024, 1, 1),
+            author="", author_info="", author_photo="", subTitle="",
+        )
+        title = "&lt;script&gt;alert(1)&lt;/script&gt; <mark>소년</mark>"
+        snippet = "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <mark>소년</mark> &amp; 오월"
+
+        def results():
+            response = APIClient().get("/api/v1/articles/books/search/", {"q": "소년"})
+            return {row["id"]: row for row in response.json()}
+
+        row = results()[book.pk]
+        self.assertEqual((row["title_highlight"], row["snippet"]), (title, snippet))
+        with self.settings(BOOK_SEARCH_MODE="ngram"):
+            ngram.rebuild()
+            row = results()[book.pk]
+            self.assertEqual((row["title_highlight"], row["snippet"]), (title, snippet))
+
+        # FTS가 없는 DB
+        found = {found.pk: found for found in search._icontains_search("소년", 10)}[book.pk]
+        self.assertNotIn("<", found.title_highlight + found.snippet)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CursorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="소설/시/희곡")
+        Book.objects.bulk_create(
+            Book(
+                category=cls.category, title=f"책 {index}", description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1 + index), author="", author_info="", author_photo="",
+                subTitle="", customer_review_rank=None if index % 2 else index,
+            )
+            for index in range(5)
+        )
+
+    def setUp(self):
+        clear_caches()
+
+    def get(self, url, cursor, **params):
+        return APIClient().get(url, {"cursor": pagination.encode_cursor(cursor), **params})
+
+    def test_wrong_value_types_are_rejected(self):
+        category_url = f"/api/v1/articles/categories/{self.category.pk}/books/"
+        for url, cursor, params in (
+            ("/api/v1/articles/books/", ["abc"], {}),
+            ("/api/v1/articles/books/", [[1]], {}),
+            ("/api/v1/articles/books/", [None], {}),
+            ("/api/v1/articles/books/", [1, 2], {}),
+            (category_url, ["notadate", 1], {"sort": "pub_date"}),
+            (category_url, [{"a": 1}, 1], {"sort": "views"}),
+        ):
+            with self.subTest(url=url, cursor=cursor):
+                response = self.get(url, cursor, **params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"cursor": "Invalid cursor."})
+
+        response = APIClient().get("/api/v1/articles/books/", {"cursor": "!!!"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_pages_follow_cursor(self):
+        # nullable 키(rank)의 NULL 값도 cursor로 넘어간다.
+        url = f"/api/v1/articles/categories/{self.category.pk}/books/"
+        titles, cursor = [], None
+        while True:
+            params = {"sort": "rank", "page_size": 2, **({"cursor": cursor} if cursor else {})}
+            response = APIClient().get(url, params)
+            self.assertEqual(response.status_code, 200)
+            titles += [row["title"] for row in response.json()]
+            cursor = response.get("X-Next-Cursor")
+            if not cursor:
+                break
+        self.assertEqual(titles, ["책 4", "책 2", "책 0", "책 3", "책 1"])
+
+    def test_category_books_sorts(self):
+        books = list(Book.objects.filter(category=self.category))
+        for index, book in enumerate(books):
+            # 조회수가 같은 책은 id 역순
+            Book.objects.filter(pk=book.pk).update(views=[3, 9, 3, 1, 9][index])
+        books = list(Book.objects.filter(category=self.category))
+        # 다른 카테고리의 책은 나오지 않는다.
+        other = Category.objects.create(name="에세이")
+        Book.objects.create(
+            category=other, title="다른 카테고리", description="", isbn="", cover="", publisher="",
+            pub_date=datetime.date(2030, 1, 1), author="", author_info="", author_photo="", subTitle="", views=100,
+        )
+        expected = {
+            "views": sorted(books, key=lambda book: (-book.views, -book.pk)),
+            "pub_date": sorted(books, key=lambda book: (-book.pub_date.toordinal(), -book.pk)),
+            # 평점 없는 책은 맨 뒤
+            "rank": sorted(books, key=lambda book: (-(book.customer_review_rank if book.customer_review_rank is not None else -1), -book.pk)),
+        }
+        url = f"/api/v1/articles/categories/{self.category.pk}/books/"
+        for fast in (False, True):
+            for sort, ordered in expected.items():
+                with self.subTest(sort=sort, fast=fast), self.settings(FAST_JSON_RESPONSES=fast):
+                    ids, cursor = [], None
+                    while True:
+                        clear_caches()
+                        params = {"sort": sort, "page_size": 2, "fields": "id,title"}
+                        response = APIClient().get(url, {**params, **({"cursor": cursor} if cursor else {})})
+                        self.assertEqual(response.status_code, 200)
+                        self.assertEqual({tuple(row) for row in response.json()}, {("id", "title")})
+                        ids += [row["id"] for row in response.json()]
+                        cursor = response.get("X-Next-Cursor")
+                        if not cursor:
+                            break
+                    self.assertEqual(ids, [book.pk for book in ordered])
+
+        # 기본 정렬은 조회수
+        default = [row["id"] for row in APIClient().get(url, {"page_size": 10}).json()]
+        self.assertEqual(default, [book.pk for book in expected["views"]])
+        response = APIClient().get(url, {"sort": "title"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("sort", response.json())
+        self.assertEqual(APIClient().get("/api/v1/articles/categories/999999/books/").status_code, 404)
+
+    def test_comment_pages_and_total_count(self):
+        book = Book.objects.order_by("id").first()
+        user = User.objects.create_user(username="reader", password="password1234!")
+        client = APIClient()
+        client.force_authenticate(user)
+        for index in range(5):
+            client.post(f"/api/v1/articles/books/{book.pk}/comments/", {"content": f"댓글 {index}"})
+        url = f"/api/v1/articles/books/{book.pk}/comments/"
+
+        def pages():
+            contents, totals, cursor = [], [], None
+            while True:
+                response = APIClient().get(url, {"page_size": 2, **({"cursor": cursor} if cursor else {})})
+                self.assertEqual(response.status_code, 200)
+                contents.append([row["content"] for row in response.json()])
+                totals.append(response["X-Total-Count"])
+                cursor = response.get("X-Next-Cursor")
+                if not cursor:
+                    self.assertFalse(response.has_header("Link"))
+                    return contents, totals
+                self.assertIn(f"cursor={cursor}", response["Link"])
+
+        # 최신순, 전체 수는 COUNT(*) 없이 Book.comment_count
+        self.assertEqual(pages(), ([["댓글 4", "댓글 3"], ["댓글 2", "댓글 1"], ["댓글 0"]], ["5", "5", "5"]))
+        self.assertEqual(APIClient().get(url).json()[0]["username"], "reader")
+
+        comment = Comment.objects.get(content="댓글 2")
+        self.assertEqual(client.delete(f"/api/v1/articles/comments/{comment.pk}/").status_code, 204)
+        with CaptureQueriesContext(connection) as queries:
+            contents, totals = pages()
+        self.assertEqual((contents, totals), ([["댓글 4", "댓글 3"], ["댓글 1", "댓글 0"]], ["4", "4"]))
+        self.assertFalse([query for query in queries if "COUNT(" in query["sql"].upper()])
+
+        self.assertEqual(APIClient().get("/api/v1/articles/books/999999/comments/").status_code, 404)
+
+
+class CommentCountTests(TestCase):
+
+    def test_concurrent_delete_decrements_once(self):
+        category = Category.objects.create(name="소설/시/희곡")
+        book = Book.objects.create(
+            category=category, title="소년이 온다", description="", isbn="", cover="", publisher="",
+            pub_date=datetime.date(2014, 5, 19), author="한강", author_info="", author_photo="", subTitle="",
+        )
+        user = User.objects.create_user(username="reader", password="password1234!")
+        client = APIClient()
+        client.force_authenticate(user)
+        client.post(f"/api/v1/articles/books/{book.pk}/comments/", {"content": "첫 댓글"})
+        client.post(f"/api/v1/articles/books/{book.pk}/comments/", {"content": "둘째 댓글"})
+        book.refresh_from_db()
+        self.assertEqual(book.comment_count, 2)
+
+        # 두 요청이 모두 댓글을 읽은 뒤 차례로 지우는 상황
+        comment = Comment.objects.filter(book=book).first()
+        stale = Comment.objects.get(pk=comment.pk)
+        url = f"/api/v1/articles/comments/{comment.pk}/"
+        self.assertEqual(client.delete(url).status_code, 204)
+        with mock.patch("articles.views.get_object_or_404", return_value=stale):
+            self.assertEqual(client.delete(url).status_code, 204)
+
+        book.refresh_from_db()
+        self.assertEqual(book.comment_count, 1)
+
+    def make_books(self):
+        category = Category.objects.create(name="소설/시/희곡")
+        return Book.objects.bulk_create(
+            Book(
+                category=category, title=title, description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2014, 5, 19), author="한강", author_info="", author_photo="", subTitle="",
+            )
+            for title in ("소년이 온다", "흰")
+        )
+
+    def comment(self, user, book, count=1):
+        client = APIClient()
+        client.force_authenticate(user)
+        for index in range(count):
+            client.post(f"/api/v1/articles/books/{book.pk}/comments/", {"content": f"댓글 {index}"})
+
+    def counts(self):
+        return {
+            book.pk: (book.comment_count, book.comment_set.count(), book.score)
+            for book in Book.objects.all()
+        }
+
+    def test_signout_subtracts_rows_it_deleted(self):
+        first, second = self.make_books()
+        user = User.objects.create_user(username="reader", password="password1234!")
+        other = User.objects.create_user(username="other", password="password1234!")
+        self.comment(user, first, 2)
+        self.comment(user, second)
+        self.comment(other, first)
+        concurrent = list(Comment.objects.filter(user=user).order_by("id").values_list("pk", "book_id"))[1:]
+
+        # signout이 지우기 직전에 다른 요청(DELETE /comments/<pk>/)이 같은 댓글을 먼저 지운 상황
+        def delete_concurrently(sender, **kwargs):
+            pre_delete.disconnect(delete_concurrently, sender=Comment)
+            for pk, book_id in concurrent:
+                deleted, _ = Comment.objects.filter(pk=pk).delete()
+                leaderboard.record_comments({book_id: -deleted})
+
+        pre_delete.connect(delete_concurrently, sender=Comment)
+        self.addCleanup(pre_delete.disconnect, delete_concurrently, sender=Comment)
+        client = APIClient()
+        client.force_authenticate(user)
+        self.assertEqual(client.delete("/api/v1/accounts/signout/").status_code, 204)
+
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertEqual(self.counts(), {first.pk: (1, 1, 1), second.pk: (0, 0, 0)})
+        self.assertEqual(leaderboard.reconcile_comment_counts(), 0)
+
+    def test_reconcile_and_rebuild_commands(self):
+        first, second = self.make_books()
+        user = User.objects.create_user(username="reader", password="password1234!")
+        self.comment(user, first, 2)
+        Book.objects.filter(pk=first.pk).update(views=5, comment_count=7, score=0)
+        Book.objects.filter(pk=second.pk).update(views=3, score=0)
+
+        def run(name):
+            stdout = io.StringIO()
+            call_command(name, stdout=stdout)
+            return stdout.getvalue()
+
+        # 어긋난 책만 comment_count와 score를 고친다.
+        self.assertIn("1권의 comment_count를 바로잡았습니다.", run("reconcile_comment_counts"))
+        self.assertEqual(self.counts(), {first.pk: (2, 2, 7), second.pk: (0, 0, 0)})
+        self.assertIn("어긋난 comment_count가 없습니다.", run("reconcile_comment_counts"))
+
+        self.assertIn("2권의 score를 다시 계산했습니다.", run("rebuild_leaderboard"))
+        self.assertEqual(self.counts(), {first.pk: (2, 2, 7), second.pk: (0, 0, 3)})
+
+
+@override_settings(BOOK_SEARCH_MODE="ngram", BOOK_SEARCH_NGRAM_SIZE=2)
+class NgramTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Category.objects.create(name="소설/시/희곡")
+
+    def record(self, isbn, title, **fields):
+        return {
+            "isbn": isbn, "title": title, "pub_date": "2014-05-19", "category": "소설/시/희곡",
+            "author": "한강", **fields,
+        }
+
+    def titles(self, q):
+        return [book.title for book in search.search_books(q, 10)]
+
+    def test_tokenizer(self):
+        self.assertEqual(ngram.tokenize("소년이 온다, Human Acts!"), ["소년이", "온다", "human", "acts"])
+        # 어절 끝은 n보다 짧은 gram으로 채워서 길이 n 이하 부분 문자열이 모두 어떤 gram의 접두어가 된다.
+        self.assertEqual(ngram.token_grams("소년이"), {"소년", "년이", "이"})
+        self.assertEqual(ngram.text_grams("흰 소년"), {"흰", "소년", "년"})
+
+    def test_grams_without_substring_do_not_match(self):
+        # "소년이"의 gram(소년, 년이)이 다 있지만 "소년이"는 없는 책
+        importer.import_books([
+            self.record("9788936434120", "소년이 온다"),
+            self.record("9788936434121", "소년과 청년이"),
+            self.record("9788936434122", "흰", description="소년이 있었다"),
+        ])
+        Book.objects.filter(title="소년과 청년이").update(score=100)
+        Book.objects.filter(title="흰").update(score=50)
+        self.assertEqual(ngram.candidate_ids("소년이"), set(Book.objects.values_list("id", flat=True)))
+        # 인기와 상관없이 제목에 있는 책이 설명에만 있는 책보다 먼저
+        self.assertEqual(self.titles("소년이"), ["소년이 온다", "흰"])
+        self.assertEqual(self.titles("청년 소년"), ["소년과 청년이"])
+
+    def test_imported_books_are_indexed(self):
+        # bulk_create / executemany UPDATE는 signal을 타지 않는다.
+        result = importer.import_books([
+            self.record("9788936434120", "소년이 온다"),
+            self.record("9788954651134", "흰", description="작별하지 않는다"),
+        ])
+        self.assertEqual(result.created, 2)
+        self.assertEqual(self.titles("년이"), ["소년이 온다"])
+        self.assertEqual(self.titles("작별"), ["흰"])
+
+        # description은 덮어쓰지 않는 가져오기: 제목 gram만 바뀌고 기존 description gram은 남는다.
+        result = importer.import_books(
+            [self.record("9788954651134", "채식주의자")], update_fields=("title", "updated_at")
+        )
+        self.assertEqual(result.updated, 1)
+        self.assertEqual(self.titles("흰"), [])
+        self.assertEqual(self.titles("채식"), ["채식주의자"])
+        self.assertEqual(self.titles("작별"), ["채식주의자"])
+
+        # 색인을 처음부터 다시 만든 결과와 같아야 한다.
+        postings = dict(BookNgram.objects.values_list("gram", "postings"))
+        ngram.rebuild()
+        self.assertEqual(dict(BookNgram.objects.values_list("gram", "postings")), postings)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FavoriteBatchTests(TestCase):
+    url = "/api/v1/articles/favorites/batch/"
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="소설/시/희곡")
+        cls.books = Book.objects.bulk_create(
+            Book(
+                category=category, title=f"책 {index}", description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author="", author_info="", author_photo="", subTitle="",
+            )
+            for index in range(4)
+        )
+        cls.user = User.objects.create_user(username="reader", password="password1234!")
+        cls.other = User.objects.create_user(username="other", password="password1234!")
+
+    def setUp(self):
+        clear_caches()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, *operations):
+        return self.client.post(
+            self.url, {"operations": [{"op": op, "book_pk": book.pk} for op, book in operations]}, format="json"
+        )
+
+    def favorite_ids(self, user=None):
+        return set(Favorite.objects.filter(user=user or self.user).values_list("book_id", flat=True))
+
+    def favorites_version(self):
+        return versioning.current(versioning.FAVORITES)[0][0]
+
+    def test_add_and_remove(self):
+        first, second, third, _ = self.books
+        Favorite.objects.create(user=self.user, book=third)
+        Favorite.objects.create(user=self.other, book=third)
+        recommender.set_cached(self.user.pk, ["cached"])
+        recommender.set_cached(self.other.pk, ["cached"])
+        version = self.favorites_version()
+
+        # 같은 책에 여러 번 오면 마지막 작업만 반영, 이미 있는 즐겨찾기 add는 그대로
+        response = self.post(("add", first), ("remove", first), ("add", second), ("add", first), ("add", third))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row["id"] for row in response.json()}, {first.pk, second.pk, third.pk})
+        self.assertEqual(self.favorite_ids(), {first.pk, second.pk, third.pk})
+        self.assertGreater(self.favorites_version(), version)
+        self.assertIsNone(recommender.get_cached(self.user.pk))
+        self.assertEqual(recommender.get_cached(self.other.pk), ["cached"])
+
+        recommender.set_cached(self.user.pk, ["cached"])
+        version = self.favorites_version()
+        response = self.post(("remove", first), ("remove", third))
+        self.assertEqual([row["id"] for row in response.json()], [second.pk])
+        self.assertEqual(self.favorite_ids(), {second.pk})
+        self.assertEqual(self.favorite_ids(self.other), {third.pk})
+        self.assertGreater(self.favorites_version(), version)
+        self.assertIsNone(recommender.get_cached(self.user.pk))
+
+    def test_invalid_requests_change_nothing(self):
+        Favorite.objects.create(user=self.user, book=self.books[0])
+        recommender.set_cached(self.user.pk, ["cached"])
+        version = self.favorites_version()
+
+        response = self.client.post(self.url, {"operations": []}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("operations", response.json())
+
+        # 없는 책이 하나라도 있으면 transaction 전체를 되돌린다.
+        response = self.client.post(self.url, {"operations": [
+            {"op": "remove", "book_pk": self.books[0].pk},
+            {"op": "add", "book_pk": self.books[1].pk},
+            {"op": "add", "book_pk": 999999},
+        ]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"book_pk": "Unknown books: [999999]"})
+
+        self.assertEqual(self.favorite_ids(), {self.books[0].pk})
+        self.assertEqual(self.favorites_version(), version)
+        self.assertEqual(recommender.get_cached(self.user.pk), ["cached"])
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.post(("add", self.books[1])).status_code, 401)
+
+
+@override_settings(VIEW_COUNTER_MAX_PENDING=1, CACHES=TEST_CACHES)
+class SimilarityTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="소설/시/희곡")
+        rows = {
+            "고래 1": ("고래 바다 항해 선장", "멜빌"),
+            "고래 2": ("고래 바다 선장 작살", "멜빌"),
+            "고래 3": ("고래 바다 항구", "콘래드"),
+            "우주 1": ("우주 로켓 행성 궤도", "세이건"),
+            "우주 2": ("우주 로켓 행성 은하", "세이건"),
+            "우주 3": ("우주 은하 별빛", "호킹"),
+        }
+        Book.objects.bulk_create(
+            Book(
+                category=category, title=title, description=description, isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author=author, author_info="", author_photo="", subTitle="",
+            )
+            for title, (description, author) in rows.items()
+        )
+        cls.books = {book.title: book for book in Book.objects.all()}
+
+    def setUp(self):
+        clear_caches()
+
+    def related(self, title):
+        response = APIClient().get(f"/api/v1/articles/books/{self.books[title].pk}/")
+        data = response.json()
+        self.assertEqual(data["recommends"], [book["id"] for book in data["related_books"]])
+        return [book["title"] for book in data["related_books"]]
+
+    def lists(self):
+        lists = {}
+        for link in BookRecommendation.objects.select_related("from_book", "to_book").order_by("rank"):
+            lists.setdefault(link.from_book.title, []).append(link.to_book.title)
+        return lists
+
+    @override_settings(BOOK_RECOMMENDS_TOP_K=2)
+    def test_related_books_in_rank_order(self):
+        call_command("build_similar_books", "--full", stdout=mock.MagicMock())
+        self.assertEqual(BookVector.objects.count(), 6)
+        for book in self.books.values():
+            scores = list(
+                BookRecommendation.objects.filter(from_book=book).order_by("rank").values_list("rank", "score")
+            )
+            self.assertEqual([rank for rank, _ in scores], [0, 1])
+            self.assertEqual(scores, sorted(scores, key=lambda row: -row[1]))
+        # 같은 작가 + 겹치는 단어가 많은 책이 먼저
+        self.assertEqual(self.related("고래 1"), ["고래 2", "고래 3"])
+        self.assertEqual(self.related("우주 1"), ["우주 2", "우주 3"])
+
+    @override_settings(BOOK_RECOMMENDS_TOP_K=2)
+    def test_rerun_after_edit_and_delete(self):
+        similarity.rebuild(full=True)
+
+        # 다시 실행하면 바뀐 책만 featurize 하고, 결과는 처음부터 다시 계산한 것과 같다.
+        book = self.books["우주 3"]
+        book.description, book.author = "고래 바다 항해 선장 작살", "멜빌"
+        book.save()
+        with mock.patch.object(similarity, "featurize", wraps=similarity.featurize) as featurize:
+            similarity.rebuild()
+        self.assertEqual(featurize.call_count, 1)
+        self.assertIn("우주 3", self.lists()["고래 1"])
+        self.assertEqual(self.lists()["우주 3"][0], "고래 2")
+        self.assertNotIn("우주 3", self.lists()["우주 1"])
+        incremental = self.lists()
+        similarity.rebuild(full=True)
+        self.assertEqual(self.lists(), incremental)
+
+        # 목록에 있던 책이 지워지면 그 목록을 다시 채운다.
+        self.books["고래 2"].delete()
+        with mock.patch.object(similarity, "featurize", wraps=similarity.featurize) as featurize:
+            similarity.rebuild()
+        self.assertEqual(featurize.call_count, 0)
+        lists = self.lists()
+        self.assertNotIn("고래 2", lists)
+        for title, related in lists.items():
+            self.assertEqual(len(related), 2, title)
+            self.assertNotIn("고래 2", related)
+        self.assertEqual(self.related("고래 1"), ["우주 3", "고래 3"])
+        incremental = self.lists()
+        similarity.rebuild(full=True)
+        self.assertEqual(self.lists(), incremental)
+
+
+@override_settings(CACHES=TEST_CACHES, RECOMMENDER_REFRESH_INTERVAL=0)
+class RecommendationCacheTests(TestCase):
+    url = "/api/v1/articles/books/recommended/"
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="소설/시/희곡")
+        cls.books = Book.objects.bulk_create(
+            Book(
+                category=category, title=f"책 {index}", description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author=f"작가 {index % 3}", author_info="", author_photo="",
+                subTitle="", views=index,
+            )
+            for index in range(8)
+        )
+        cls.user = User.objects.create_user(username="reader", password="password1234!")
+        cls.other = User.objects.create_user(username="other", password="password1234!")
+        cls.idle = User.objects.create_user(username="idle", password="password1234!")
+        for user, indexes in ((cls.user, (0, 1)), (cls.other, (1, 2, 3)), (cls.idle, (0, 2, 4))):
+            Favorite.objects.bulk_create(Favorite(user=user, book=cls.books[index]) for index in indexes)
+        recommender.rebuild()
+
+    def setUp(self):
+        clear_caches()
+
+    def recommended(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [book["id"] for book in response.json()]
+
+    def test_favorite_toggle_recomputes_only_that_user(self):
+        recommended = self.recommended(self.user)
+        other_recommended = self.recommended(self.other)
+        self.assertEqual([book["id"] for book in recommender.get_cached(self.user.pk)], recommended)
+        self.assertIsNotNone(recommender.get_cached(self.other.pk))
+
+        # 캐시된 사용자는 추천 계산 없이 바로 내려준다.
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.recommended(self.user), recommended)
+        self.assertFalse([query for query in queries if "articles_favorite" in query["sql"]])
+
+        added = next(book for book in self.books if book.pk in recommended)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.post("/api/v1/articles/favorites/", {"book_pk": added.pk}).status_code, 201)
+        self.assertIsNone(recommender.get_cached(self.user.pk))
+        self.assertEqual([book["id"] for book in recommender.get_cached(self.other.pk)], other_recommended)
+
+        recomputed = self.recommended(self.user)
+        self.assertNotIn(added.pk, recomputed)
+        self.assertEqual([book["id"] for book in recommender.get_cached(self.user.pk)], recomputed)
+
+        # 즐겨찾기 해제도 마찬가지
+        self.assertEqual(client.post("/api/v1/articles/favorites/", {"book_pk": added.pk}).status_code, 204)
+        self.assertIsNone(recommender.get_cached(self.user.pk))
+        self.assertEqual(self.recommended(self.user), recommended)
+        self.assertIsNotNone(recommender.get_cached(self.other.pk))
+
+        # 이웃 목록을 다시 만들면 모든 사용자의 캐시가 버전으로 무효화된다.
+        recommender.rebuild()
+        self.assertIsNone(recommender.get_cached(self.user.pk))
+        self.assertIsNone(recommender.get_cached(self.other.pk))
+
+    def test_warm_recommendations(self):
+        User.objects.filter(pk__in=[self.user.pk, self.other.pk]).update(last_login=timezone.now())
+        User.objects.filter(pk=self.idle.pk).update(last_login=timezone.now() - datetime.timedelta(days=30))
+
+        def warm(*args):
+            stdout = io.StringIO()
+            call_command("warm_recommendations", *args, stdout=stdout)
+            return stdout.getvalue()
+
+        self.assertIn("2명 계산, 0명 건너뜀", warm())
+        self.assertIsNone(recommender.get_cached(self.idle.pk))
+        # 미리 넣어 둔 결과는 API가 계산한 것과 같다.
+        warmed = [book["id"] for book in recommender.get_cached(self.user.pk)]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.recommended(self.user), warmed)
+        self.assertFalse([query for query in queries if "articles_favorite" in query["sql"]])
+        recommender.invalidate_user(self.user.pk)
+        self.assertEqual(self.recommended(self.user), warmed)
+
+        self.assertIn("0명 계산, 2명 건너뜀", warm())
+        recommender.invalidate_user(self.other.pk)
+        self.assertIn("1명 계산, 1명 건너뜀", warm())
+        self.assertIn("2명 계산, 0명 건너뜀", warm("--force"))
+        self.assertIn("3명 계산, 0명 건너뜀", warm("--force", "--days", "60"))
+
+
+@override_settings(VIEW_COUNTER_MAX_PENDING=1, CACHES=TEST_CACHES)
+class ConditionalTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="소설/시/희곡")
+        Book.objects.bulk_create(
+            Book(
+                category=cls.category, title=f"책 {index}", description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author="", author_info="", author_photo="", subTitle="",
+            )
+            for index in range(3)
+        )
+        for scope in (versioning.CATALOG, versioning.VIEWS, versioning.FAVORITES):
+            versioning.bump(scope)
+
+    def setUp(self):
+        clear_caches()
+        self.url = f"/api/v1/articles/categories/{self.category.pk}/books/"
+
+    def test_matching_etag_returns_304_without_running_the_view(self):
+        etag = self.client.get(self.url)["ETag"]
+        clear_caches()
+        with mock.patch("articles.views.keyset_page", wraps=pagination.keyset_page) as keyset_page, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        keyset_page.assert_not_called()
+        self.assertEqual([query["sql"] for query in queries if '"articles_book"' in query["sql"]], [])
+
+    def test_version_bump_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        versioning.bump(versioning.FAVORITES)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        for scope in (versioning.CATALOG, versioning.VIEWS):
+            versioning.bump(scope)
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, scope)
+            self.assertNotEqual(response["ETag"], etag, scope)
+            etag = response["ETag"]
+
+    def test_error_responses_have_no_validators(self):
+        for url in (
+            "/api/v1/articles/books/999999/",
+            "/api/v1/articles/categories/999999/books/",
+            f"{self.url}?sort=unknown",
+        ):
+            response = self.client.get(url)
+            self.assertIn(response.status_code, (400, 404), url)
+            self.assertFalse(response.has_header("ETag"), url)
+            self.assertFalse(response.has_header("Last-Modified"), url)
+
+        # 에러 응답을 예외 대신 그대로 돌려주는 view
+        view = catalog_conditional()(lambda request, status: HttpResponse(status=status))
+        request = RequestFactory().get("/")
+        self.assertTrue(view(request, 200).has_header("ETag"))
+        self.assertFalse(view(request, 404).has_header("ETag"))
+        self.assertFalse(view(request, 500).has_header("Last-Modified"))
+
+
+@override_settings(VIEW_COUNTER_MAX_PENDING=1, CACHES=TEST_CACHES, ALLOWED_HOSTS=["a.example", "b.example"])
+class ResponseCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="소설/시/희곡")
+        Book.objects.bulk_create(
+            Book(
+                category=cls.category, title=f"책 {index}", description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author="", author_info="", author_photo="", subTitle="",
+            )
+            for index in range(3)
+        )
+        for scope in (versioning.CATALOG, versioning.VIEWS):
+            versioning.bump(scope)
+
+    def setUp(self):
+        clear_caches()
+        self.url = f"/api/v1/articles/categories/{self.category.pk}/books/?page_size=2"
+
+    def get(self, host="a.example"):
+        return self.client.get(self.url, HTTP_HOST=host)
+
+    def test_miss_then_hit(self):
+        miss = self.get()
+        self.assertEqual(miss["X-Cache"], "MISS")
+        with CaptureQueriesContext(connection) as queries:
+            hit = self.get()
+        self.assertEqual(hit["X-Cache"], "HIT")
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual(hit["X-Next-Cursor"], miss["X-Next-Cursor"])
+        self.assertEqual([query["sql"] for query in queries if '"articles_book"' in query["sql"]], [])
+        self.assertEqual(cache.stats()["category_books"], {"hits": 1, "misses": 1})
+
+    def test_cached_link_does_not_leak_host(self):
+        miss = self.get("a.example")
+        hit = self.get("b.example")
+        self.assertEqual(hit["X-Cache"], "HIT")
+        self.assertTrue(miss["Link"].startswith(f"</api/v1/articles/categories/{self.category.pk}/books/?"))
+        self.assertIn(f"cursor={miss['X-Next-Cursor']}", miss["Link"])
+        self.assertEqual(hit["Link"], miss["Link"])
+
+    def test_version_bump_invalidates(self):
+        self.get()
+        self.assertEqual(self.get()["X-Cache"], "HIT")
+
+        # 조회수만 바뀌어도 정렬이 달라지므로 VIEWS 버전이 오르면 다시 계산한다.
+        book = Book.objects.order_by("id").first()
+        Book.objects.filter(pk=book.pk).update(views=100)
+        versioning.bump(versioning.VIEWS)
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()[0]["id"], book.pk)
+
+        # 책을 추가하면 signal이 CATALOG 버전을 올린다.
+        self.assertEqual(self.get()["X-Cache"], "HIT")
+        Book.objects.create(
+            category=self.category, title="새 책", description="", isbn="", cover="", publisher="",
+            pub_date=datetime.date(2024, 1, 1), author="", author_info="", author_photo="", subTitle="", views=200,
+        )
+        response = self.get()
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()[0]["title"], "새 책")
+
+
+class ExportTests(TestCase):
+    url = "/api/v1/articles/books/export/"
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="소설/시/희곡")
+        Book.objects.bulk_create(
+            Book(
+                category=category, title=title, description="", isbn="", cover="", publisher="",
+                pub_date=datetime.date(2024, 1, 1), author="", author_info="", author_photo="", subTitle="",
+            )
+            for title in ("소년이 온다", 'Say "hi", world', "흰")
+        )
+        cls.books = list(Book.objects.order_by("id"))
+        old = timezone.make_aware(datetime.datetime(2024, 1, 1))
+        Book.objects.filter(pk=cls.books[0].pk).update(updated_at=old)
+        cls.user = User.objects.create_user(username="reader", password="password1234!")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, content = self.export()
+        self.assertEqual(response["Content-Type"], export.TYPES["ndjson"])
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="books.ndjson"')
+        records = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([record["id"] for record in records], [book.pk for book in self.books])
+        self.assertEqual(list(records[1]), list(export.FIELDS))
+        self.assertEqual(records[1]["title"], 'Say "hi", world')
+        self.assertEqual(records[0]["pub_date"], "2024-01-01")
+
+    def test_csv(self):
+        response, content = self.export(type="csv")
+        self.assertEqual(response["Content-Type"], export.TYPES["csv"])
+        header, *rows = csv.reader(io.StringIO(content))
+        self.assertEqual(header, list(export.FIELDS))
+        self.assertEqual([int(row[0]) for row in rows], [book.pk for book in self.books])
+        self.assertEqual(rows[1][header.index("title")], 'Say "hi", world')
+
+    def test_updated_since(self):
+        recent = [book.pk for book in self.books[1:]]
+        for updated_since in ("2025-01-01", "2025-01-01T09:00:00+09:00"):
+            _, content = self.export(updated_since=updated_since)
+            self.assertEqual([json.loads(line)["id"] for line in content.splitlines()], recent, updated_since)
+        _, content = self.export(type="csv", updated_since="2023-12-31")
+        self.assertEqual(len(content.splitlines()), 1 + len(self.books))
+
+    def test_invalid_parameters(self):
+        for params, field in (
+            ({"updated_since": "yesterday"}, "updated_since"),
+            ({"updated_since": "2025-13-01"}, "updated_since"),
+            ({"type": "xml"}, "type"),
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn(field, response.json())
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_command(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command("export_books", "--updated-since", "2025-01-01", stdout=stdout, stderr=stderr)
+        self.assertEqual(
+            [json.loads(line)["id"] for line in stdout.getvalue().splitlines()], [book.pk for book in self.books[1:]]
+        )
+        self.assertIn("내보내기 완료", stderr.getvalue())
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "books.csv")
+            call_command("export_books", "--type", "csv", "-o", path, "--chunk-size", "1", stderr=io.StringIO())
+            with open(path, encoding="utf-8", newline="") as output:
+                _, content = self.export(type="csv")
+                self.assertEqual(output.read(), content)
+
+        with self.assertRaises(CommandError):
+            call_command("export_books", "--updated-since", "yesterday", stderr=io.StringIO())
+
+
+@override_settings(VIEW_COUNTER_MAX_PENDING=3, VIEW_COUNTER_FLUSH_INTERVAL=3600, CACHES=TEST_CACHES)
+class ViewCounterTests(TransactionTestCase):
+    # flush는 자기 transaction(savepoint=False)으로 반영하고 타이머 thread는 다른 connection을 써서
+    # TestCase의 transaction 안에서는 확인할 수 없다.
+
+    def setUp(self):
+        clear_caches()
+        category = Category.objects.create(name="소설/시/희곡")
+        self.book = Book.objects.create(
+            category=category, title="소년이 온다", description="", isbn="", cover="", publisher="",
+            pub_date=datetime.date(2014, 5, 19), author="한강", author_info="", author_photo="", subTitle="",
+        )
+        self.counter = viewcounter.ViewCounter()
+
+    def views(self):
+        return Book.objects.values_list("views", "score").get(pk=self.book.pk)
+
+    def test_flush_at_max_pending(self):
+        version = versioning.current(versioning.VIEWS)[0]
+        with mock.patch.object(self.counter, "_start_flusher"):
+            self.counter.hit(self.book.pk)
+            self.counter.hit(self.book.pk)
+            self.assertEqual(self.counter.pending(self.book.pk), 2)
+            self.assertEqual(self.views(), (0, 0))
+            self.assertEqual(versioning.current(versioning.VIEWS)[0], version)
+
+            self.counter.hit(self.book.pk)
+        self.assertEqual(self.counter.pending(self.book.pk), 0)
+        self.assertEqual(self.views(), (3, 3))
+        self.assertEqual(BookEvent.objects.get(book=self.book, kind=trending.VIEW).count, 3)
+        self.assertNotEqual(versioning.current(versioning.VIEWS)[0], version)
+
+    @override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0.05)
+    def test_flusher_thread_flushes_after_interval(self):
+        # 요청이 더 오지 않아도 interval이 지나면 thread가 반영한다.
+        self.counter._last_flush = time.monotonic() + 60
+        self.counter.hit(self.book.pk, 2)
+        self.assertTrue(self.counter._flusher.is_alive())
+        deadline = time.monotonic() + 5
+        while self.views() != (2, 2) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.views(), (2, 2))
+        self.assertEqual(self.counter.pending(self.book.pk), 0)
+
+    def test_failed_flush_is_retried(self):
+        with mock.patch.object(self.counter, "_start_flusher"):
+            self.counter.hit(self.book.pk, 2)
+            with mock.patch.object(leaderboard, "record_views", side_effect=OperationalError("locked")), \
+                    self.assertLogs("articles.viewcounter", "ERROR"):
+                self.assertEqual(self.counter.flush(), 0)
+            # 되돌려 놓은 조회수도 다음 기준에 포함된다.
+            self.assertEqual(self.counter.pending(self.book.pk), 2)
+            self.assertEqual(self.views(), (0, 0))
+            self.assertFalse(BookEvent.objects.exists())
+
+            self.counter.hit(self.book.pk)
+        self.assertEqual(self.views(), (3, 3))
+        self.assertEqual(BookEvent.objects.get(book=self.book, kind=trending.VIEW).count, 3)
+
+    def test_detail_includes_pending_views(self):
+        self.addCleanup(viewcounter.view_counter.flush)
+        with mock.patch.object(viewcounter.view_counter, "_start_flusher"), \
+                self.settings(VIEW_COUNTER_MAX_PENDING=100):
+            for expected in (1, 2):
+                response = APIClient().get(f"/api/v1/articles/books/{self.book.pk}/")
+                self.assertEqual((response.json()["views"], response.json()["score"]), (expected, expected))
+            self.assertEqual(self.views(), (0, 0))
+        viewcounter.view_counter.flush()
+        self.assertEqual(self.views(), (2, 2))
+        response = APIClient().get(f"/api/v1/articles/books/{self.book.pk}/")
+        self.assertEqual(response.json()["views"], 3)
+
+
+class ImporterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="소설/시/희곡")
+
+    def record(self, isbn, title, **fields):
+        return {"isbn": isbn, "title": title, "pub_date": "2014-05-19", "category": "소설/시/희곡", **fields}
+
+    def test_iter_records_streams_json_array(self):
+        records = [
+            {"model": "articles.book", "pk": 1, "fields": self.record("1", "괄호 ] 와 쉼표 , 가 든 제목")},
+            self.record("2", "두 번째", description="{\"json\": [1, 2]}"),
+            self.record("3", "세 번째"),
+        ]
+        text = " [\n" + ",\n".join(json.dumps(record, ensure_ascii=False) for record in records) + "\n] "
+
+        # 레코드가 chunk 경계에서 잘려도 이어서 읽고, 배열 전체를 읽기 전에 첫 레코드를 돌려준다.
+        stream = io.StringIO(text)
+        iterator = importer.iter_records(stream, chunk_size=16)
+        self.assertEqual(next(iterator), records[0])
+        self.assertLess(stream.tell(), len(text))
+        self.assertEqual(list(iterator), records[1:])
+
+        # NDJSON / 그냥 이어붙인 객체
+        ndjson = "\n".join(json.dumps(record) for record in records[1:]) + "\n"
+        self.assertEqual(list(importer.iter_records(io.StringIO(ndjson), chunk_size=8)), records[1:])
+        self.assertEqual(list(importer.iter_records(io.StringIO("{} {}"))), [{}, {}])
+
+        for broken in ('[{"isbn": "1"}', '[{"isbn": "1"},', '{"isbn": '):
+            with self.subTest(broken=broken), self.assertRaises(json.JSONDecodeError):
+                list(importer.iter_records(io.StringIO(broken), chunk_size=4))
+
+    def test_isbn_update_path(self):
+        result = importer.import_books([self.record("9788936434120", "소년이 온다", author="한강")])
+        self.assertEqual((result.created, result.updated), (1, 0))
+        book = Book.objects.get(isbn="9788936434120")
+        Book.objects.filter(pk=book.pk).update(views=7, comment_count=2, score=9)
+        # isbn이 같은 예전 중복 행은 가장 먼저 들어온 책만 갱신한다.
+        duplicate = Book.objects.create(
+            category=self.category, title="중복", description="", isbn="9788936434120", cover="", publisher="",
+            pub_date=datetime.date(2014, 5, 19), author="", author_info="", author_photo="", subTitle="",
+        )
+        version = versioning.current(versioning.CATALOG)[0][0]
+
+        result = importer.import_books([
+            self.record("9788936434120", "예전 제목"),
+            self.record("9788936434120", "소년이 온다 (개정판)", description="광주", author="한강"),
+            self.record("9788954651134", "흰", category=str(self.category.pk)),
+            self.record("9788954651135", "카테고리 없음", category="없는 카테고리"),
+            {"isbn": "9788954651136"},
+        ], batch_size=2)
+        self.assertEqual((result.rows, result.created, result.updated, result.invalid), (5, 1, 1, 2))
+        self.assertEqual(len(result.errors), 2)
+
+        updated = Book.objects.get(pk=book.pk)
+        self.assertEqual((updated.title, updated.description), ("소년이 온다 (개정판)", "광주"))
+        # 조회수 / 댓글 수 / 점수는 건드리지 않는다.
+        self.assertEqual((updated.views, updated.comment_count, updated.score), (7, 2, 9))
+        self.assertGreater(updated.updated_at, book.updated_at)
+        self.assertEqual(Book.objects.get(pk=duplicate.pk).title, "중복")
+        self.assertTrue(Book.objects.filter(isbn="9788954651134", category=self.category).exists())
+        self.assertGreater(versioning.current(versioning.CATALOG)[0][0], version)
+
+    def test_command_reads_gzip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "books.json.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as output:
+                json.dump([self.record("9788936434120", "소년이 온다"), {"isbn": "1"}], output, ensure_ascii=False)
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command("import_books", path, stdout=stdout, stderr=stderr)
+        self.assertIn("2행 처리: 추가 1권, 갱신 0권, 오류 1건", stdout.getvalue())
+        self.assertIn("#2: Missing fields", stderr.getvalue())
+        self.assertTrue(Book.objects.filter(title="소년이 온다").exists())
+
+        with self.assertRaises(CommandError):
+            call_command("import_books", "/nonexistent/books.json", stdout=io.StringIO())
+
+
+class GenerateDatasetTests(TestCase):
+
+    def test_small_dataset(self):
+        out = io.StringIO()
+        call_command(
+            "generate_dataset", "--books", "40", "--users", "6", "--favorites-per-user", "3",
+            "--comments", "25", "--views", "1000", "--batch-size", "7", stdout=out,
+        )
+        self.assertIn("합계", out.getvalue())
+        self.assertEqual(Book.objects.count(), 40)
+        self.assertEqual(User.objects.filter(username__startswith=synthetic.USERNAME_PREFIX).count(), 6)
+        self.assertEqual(Comment.objects.count(), 25)
+        self.assertTrue(Favorite.objects.exists())
+        self.assertFalse(Book.objects.filter(category__name="전체").exists())
+        # 조회수는 Zipf 비율대로 내림해서 나누므로 합계를 넘지 않고, 인기 책에 몰린다.
+        views = list(Book.objects.order_by("-views").values_list("views", flat=True))
+        self.assertLessEqual(sum(views), 1000)
+        self.assertGreater(views[0], views[-1])
+        # bulk insert 뒤 comment_count / score를 다시 맞춘다.
+        self.assertEqual(leaderboard.reconcile_comment_counts(), 0)
+        self.assertFalse(Book.objects.exclude(score=F("views") + F("comment_count")).exists())
+
+        # 두 번째 실행은 기존 데이터 뒤에 이어서 추가한다.
+        call_command("generate_dataset", "--books", "5", "--users", "2", "--comments", "0", stdout=io.StringIO())
+        self.assertEqual(Book.objects.count(), 45)
+        self.assertEqual(Book.objects.values("isbn").distinct().count(), 45)
+        self.assertEqual(User.objects.filter(username__startswith=synthetic.USERNAME_PREFIX).count(), 8)
+
+
+# 벤치마크는 스레드마다 DB 연결을 따로 열기 때문에 TransactionTestCase
+# 테스트는 DEBUG=False로 돌아서 벤치마크 클라이언트의 Host(localhost)를 따로 허용한다.
+@override_settings(VIEW_COUNTER_MAX_PENDING=1, CACHES=TEST_CACHES, ALLOWED_HOSTS=["localhost"])
+class BenchApiTests(TransactionTestCase):
+
+    def setUp(self):
+        clear_caches()
+
+    def test_seed_run_and_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "result.json")
+            # 테스트 DB(메모리 SQLite 공유 캐시)는 테이블 잠금을 기다리지 않으므로 클라이언트 스레드는 하나만
+            options = ["--clients", "1", "--requests", "4", "--warmup", "1"]
+            out = io.StringIO()
+            call_command(
+                "bench_api", "--seed", "--books", "30", "--users", "5", "--favorites-per-user", "3",
+                "--comments", "20", *options, "--output", output, stdout=out,
+            )
+            with open(output, encoding="utf-8") as file:
+                result = json.load(file)
+            self.assertEqual(result["meta"]["mode"], "in-process")
+            self.assertEqual(result["dataset"]["books"], 30)
+            self.assertEqual(set(result["endpoints"]), set(benchmark.SCENARIOS))
+            for name, endpoint in result["endpoints"].items():
+                with self.subTest(endpoint=name):
+                    self.assertEqual(endpoint["requests"], 4)
+                    self.assertEqual(endpoint["errors"], 0)
+                    self.assertGreater(endpoint["queries"]["max"], 0)
+                    self.assertIn(name, out.getvalue())
+
+            # seed 없이 같은 DB로 다시 돌리고 이전 결과와 비교
+            out = io.StringIO()
+            call_command(
+                "bench_api", "--endpoints", "books,comments", *options,
+                "--output", os.path.join(directory, "again.json"), "--compare", output, stdout=out,
+            )
+            self.assertIn("p95(이전 -> 현재)", out.getvalue())
+            compared = [line.split()[0] for line in out.getvalue().splitlines() if "ms (" in line]
+            self.assertEqual(compared, ["books", "comments"])
+
+    def test_rejects_unknown_endpoint_and_empty_db(self):
+        with self.assertRaisesMessage(CommandError, "nope"):
+            call_command("bench_api", "--endpoints", "books,nope", stdout=io.StringIO())
+        with self.assertRaisesMessage(CommandError, "Seed data first"):
+            call_command("bench_api", "--endpoints", "books", "--requests", "1", stdout=io.StringIO())
@@ -0,0 +1,179 @@
+import math
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from . import versioning
+from .models import Book, BookEvent, Checkpoint, TrendingScore
+
+
+# 최근 인기 도서 (GET /books/trending/?window=24h|7d)
+# - 조회 / 댓글을 BookEvent에 (책, 종류, 시간) bucket 단위로 더해 둔다. (append-only, upsert)
+# - 같은 시점에 window별 점수도 바로 더한다. 점수는 forward decay로 저장한다:
+#     score = Σ weight × count × e^((t - landmark) / τ)
+#   지금 시각의 감쇠 점수는 score × e^(-(now - landmark) / τ)인데 모든 책에 같은 값을 곱하는 것이라
+#   순위는 저장된 score 순서 그대로다. 그래서 옛 점수를 매번 깎는 UPDATE 없이 더하기만 하면 된다.
+# - 지수가 계속 커지므로 compaction 때 TRENDING_REBASE_HOURS마다 landmark를 지금으로 옮기고 (rebase)
+#   거의 0이 된 점수를 지운다.
+# - compaction은 TRENDING_COMPACT_INTERVAL마다 기록하는 쪽에서 commit 후 자동으로 돌고,
+#   오래된 시간 bucket을 하루 bucket으로 합치고 보관 기간이 지난 bucket을 지운다.
+#   (manage.py rebuild_trending으로 직접 돌릴 수도 있다.)
+
+VIEW = 1
+COMMENT = 2
+KIND_NAMES = {VIEW: "view", COMMENT: "comment"}
+
+CHECKPOINT = "trending"
+
+_EVENTS = connection.ops.quote_name(BookEvent._meta.db_table)
+_SCORES = connection.ops.quote_name(TrendingScore._meta.db_table)
+_BOOKS = connection.ops.quote_name(Book._meta.db_table)
+
+# 없는 책(이미 삭제된 책 등)은 SELECT에서 걸러진다.
+EVENT_UPSERT = f"""
+    INSERT INTO {_EVENTS} (book_id, kind, hour, "count")
+    SELECT id, %s, %s, %s FROM {_BOOKS} WHERE id = %s
+    ON CONFLICT (book_id, kind, hour) DO UPDATE SET "count" = {_EVENTS}."count" + excluded."count"
+"""
+
+SCORE_UPSERT = f"""
+    INSERT INTO {_SCORES} (book_id, "window", score)
+    SELECT id, %s, %s FROM {_BOOKS} WHERE id = %s
+    ON CONFLICT (book_id, "window") DO UPDATE SET score = {_SCORES}.score + excluded.score
+"""
+
+# hour가 하루의 시작이 아닌 오래된 bucket을 그날 0시 bucket에 더한다.
+ROLLUP = f"""
+    INSERT INTO {_EVENTS} (book_id, kind, hour, "count")
+    SELECT book_id, kind, hour - (hour %% 24), SUM("count") FROM {_EVENTS}
+    WHERE hour < %s AND hour %% 24 != 0
+    GROUP BY book_id, kind, hour - (hour %% 24)
+    ON CONFLICT (book_id, kind, hour) DO UPDATE SET "count" = {_EVENTS}."count" + excluded."count"
+"""
+ROLLUP_DELETE = f"DELETE FROM {_EVENTS} WHERE hour < %s AND hour %% 24 != 0"
+
+
+def windows():
+    """window 이름 -> 감쇠 시간 상수 τ (시간)"""
+    return settings.TRENDING_WINDOWS
+
+
+def now_hours():
+    return time.time() / 3600
+
+
+def _checkpoint(now):
+    # 같은 landmark로 더하도록 rebase와 기록을 직렬화한다. (transaction 안에서 호출)
+    checkpoint, _ = Checkpoint.objects.select_for_update().get_or_create(
+        name=CHECKPOINT, defaults={"state": {"landmark": int(now), "compacted_at": now}}
+    )
+    return checkpoint
+
+
+def record(kind, deltas, now=None):
+    """
+    {book_id: 횟수}만큼 kind 이벤트를 기록하고 window별 점수를 올린다.
+    호출한 쪽 transaction과 같이 commit되고, compaction할 때가 됐으면 commit 후에 돌린다.
+    """
+    deltas = {book_id: count for book_id, count in deltas.items() if count > 0}
+    if not deltas:
+        return
+    now = now_hours() if now is None else now
+    weight = settings.TRENDING_EVENT_WEIGHTS[KIND_NAMES[kind]]
+
+    with transaction.atomic(savepoint=False):
+        state = _checkpoint(now).state
+        landmark = state["landmark"]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                EVENT_UPSERT, [(kind, int(now), count, book_id) for book_id, count in deltas.items()]
+            )
+            cursor.executemany(SCORE_UPSERT, [
+                (window, weight * count * math.exp((now - landmark) / tau), book_id)
+                for window, tau in windows().items()
+                for book_id, count in deltas.items()
+            ])
+
+    if now - state["compacted_at"] >= settings.TRENDING_COMPACT_INTERVAL / 3600:
+        transaction.on_commit(compact)
+
+
+def compact(now=None, force=False):
+    """
+    오래된 시간 bucket을 하루 bucket으로 합치고, 보관 기간이 지난 bucket을 지우고, 필요하면 rebase한다.
+    다른 프로세스가 방금 compaction을 했으면 (force가 아니면) 아무것도 하지 않고 None을 반환한다.
+    """
+    now = now_hours() if now is None else now
+    hour = int(now)
+
+    with transaction.atomic():
+        checkpoint = _checkpoint(now)
+        state = checkpoint.state
+        if not force and now - state["compacted_at"] < settings.TRENDING_COMPACT_INTERVAL / 3600:
+            return None
+
+        with connection.cursor() as cursor:
+            rollup_before = hour - settings.TRENDING_HOURLY_HOURS
+            cursor.execute(ROLLUP, [rollup_before])
+            cursor.execute(ROLLUP_DELETE, [rollup_before])
+            rolled_up = cursor.rowcount
+        deleted, _ = BookEvent.objects.filter(hour__lt=hour - settings.TRENDING_RETENTION_DAYS * 24).delete()
+
+        rebased = hour - state["landmark"] >= settings.TRENDING_REBASE_HOURS
+        if rebased:
+            for window, tau in windows().items():
+                TrendingScore.objects.filter(window=window).update(
+                    score=F("score") * math.exp((state["landmark"] - hour) / tau)
+                )
+            TrendingScore.objects.filter(score__lt=settings.TRENDING_MIN_SCORE).delete()
+            state["landmark"] = hour
+
+        state["compacted_at"] = now
+        checkpoint.save(update_fields=["state", "updated_at"])
+
+    if rebased:
+        # 순위는 그대로지만 바닥 점수가 지워졌을 수 있다.
+        versioning.bump(versioning.VIEWS)
+    return {"rolled_up": rolled_up, "deleted": deleted, "rebased": rebased}
+
+
+def rebuild(now=None):
+    """남아 있는 BookEvent로 window별 점수를 처음부터 다시 계산한다. (landmark = 지금) 점수 row 수를 반환"""
+    now = now_hours() if now is None else now
+    landmark = int(now)
+    weights = {kind: settings.TRENDING_EVENT_WEIGHTS[name] for kind, name in KIND_NAMES.items()}
+
+    totals = defaultdict(float)
+    for book_id, kind, hour, count in BookEvent.objects.values_list("book_id", "kind", "hour", "count").iterator():
+        for window, tau in windows().items():
+            # bucket 안에서는 가운데 시각에 일어났다고 본다.
+            totals[book_id, window] += weights[kind] * count * math.exp((hour + 0.5 - landmark) / tau)
+
+    with transaction.atomic():
+        checkpoint = _checkpoint(now)
+        TrendingScore.objects.all().delete()
+        TrendingScore.objects.bulk_create(
+            (
+                TrendingScore(book_id=book_id, window=window, score=score)
+                for (book_id, window), score in totals.items()
+                if score >= settings.TRENDING_MIN_SCORE
+            ),
+            batch_size=5000,
+        )
+        checkpoint.state = {"landmark": landmark, "compacted_at": now}
+        checkpoint.save(update_fields=["state", "updated_at"])
+    versioning.bump(versioning.VIEWS)
+    return TrendingScore.objects.count()
+
+
+def top(window, limit):
+    """window 점수 상위 limit권 (Book 목록)"""
+    scores = (
+        TrendingScore.objects.filter(window=window)
+        .select_related("book")
+        .order_by("-score", "-book")[:limit]
+    )
+    return [score.book for score in scores]
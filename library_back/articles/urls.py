@@ -5,9 +5,17 @@ urlpatterns = [
     path('books/', views.books),
     path('books/popular/', views.popular_books),            # TOP 5 구현
     path('books/recommended/', views.recommended_books),    # 추천 도서
+    path('books/trending/', views.trending_books),          # 최근 인기 (시간 감쇠)
+    path('books/search/', views.books_search),              # 도서 검색
+    path('books/suggest/', views.books_suggest),            # 검색어 자동완성
+    path('books/export/', views.books_export),              # 전체 내보내기 (NDJSON / CSV)
     path('books/<int:book_pk>/', views.books_detail),
     path('books/<int:book_pk>/comments/', views.comments),
     path('comments/<int:comment_pk>/', views.delete_comment),
     path('favorites/', views.favorite),
+    path('favorites/batch/', views.favorite_batch),         # 즐겨찾기 일괄 추가/삭제
     path('categories/', views.categories),
+    path('categories/<int:category_pk>/books/', views.category_books),  # 카테고리별 정렬 목록
+    path('cache/stats/', views.cache_stats),
+    path('perf/stats/', views.performance_stats),           # route별 지연 시간 / 쿼리 통계
 ]
@@ -0,0 +1,56 @@
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion
+
+
+# 데이터 버전 카운터
+# - CATALOG: Book / Category / Comment가 바뀌면 signal에서 올린다.
+# - VIEWS: 조회수 버퍼(articles.viewcounter)가 flush될 때 올린다. (views, score가 바뀜)
+# - FAVORITES: Favorite이 바뀌면 signal에서 올린다.
+# - NEIGHBORS: 협업 필터링 이웃(BookNeighbor)을 다시 만들면 올린다.
+# 응답을 다시 만들 필요가 있는지는 current()의 버전/갱신 시각만 보고 판단한다.
+
+CATALOG = "catalog"
+VIEWS = "views"
+FAVORITES = "favorites"
+NEIGHBORS = "neighbors"
+
+
+def bump(scope=CATALOG):
+    now = timezone.now()
+    updated = CatalogVersion.objects.filter(scope=scope).update(
+        version=F("version") + 1, updated_at=now
+    )
+    if not updated:
+        try:
+            CatalogVersion.objects.create(scope=scope, version=1, updated_at=now)
+        except IntegrityError:
+            CatalogVersion.objects.filter(scope=scope).update(
+                version=F("version") + 1, updated_at=now
+            )
+
+
+def current(*scopes):
+    """
+    scopes별 버전 튜플과 가장 최근 갱신 시각을 한 번의 쿼리로 가져온다.
+    한 번도 안 바뀐 scope의 버전은 0
+    """
+    scopes = scopes or (CATALOG,)
+    rows = dict(
+        (scope, (version, updated_at))
+        for scope, version, updated_at in CatalogVersion.objects.filter(scope__in=scopes)
+        .values_list("scope", "version", "updated_at")
+    )
+    versions = tuple(rows.get(scope, (0, None))[0] for scope in scopes)
+    updated = [updated_at for _, updated_at in rows.values()]
+    return versions, max(updated) if updated else None
+
+
+def for_request(request, scopes):
+    """같은 요청 안에서는 ETag / 응답 캐시가 버전 조회 한 번을 같이 쓴다."""
+    cached = request.__dict__.setdefault("_data_versions", {})
+    if scopes not in cached:
+        cached[scopes] = current(*scopes)
+    return cached[scopes]
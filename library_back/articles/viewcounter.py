@@ -0,0 +1,113 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import leaderboard, trending, versioning
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    books_detail 조회수 write-behind 버퍼
+    - 조회할 때마다 UPDATE를 날리지 않고 프로세스 메모리에 book_id별로 모아둔다.
+    - VIEW_COUNTER_MAX_PENDING 번 쌓이거나 VIEW_COUNTER_FLUSH_INTERVAL 초가 지나면
+      leaderboard.record_views로 UPDATE 한 번에 반영한다. (최근 인기 점수 articles.trending도 같이)
+    - 정상 종료(atexit)면 남은 조회수를 내려보낸다. 비정상 종료되면 버퍼에 쌓이던 것(MAX_PENDING 미만)과
+      반영 중이던 한 묶음(MAX_PENDING + 동시 요청 수 정도)까지, 대략 2 x MAX_PENDING이 유실될 수 있다.
+    - flush가 DB 오류로 실패하면 버리지 않고 버퍼에 되돌려서 다음 flush에 다시 시도한다.
+      (그동안은 버퍼가 MAX_PENDING을 넘어 계속 쌓이므로 그 사이 비정상 종료되면 유실도 그만큼 늘어난다.)
+    """
+
+    def __init__(self):
+        self._pending = Counter()
+        self._hits = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flusher = None
+
+    @property
+    def max_pending(self):
+        return settings.VIEW_COUNTER_MAX_PENDING
+
+    @property
+    def interval(self):
+        return settings.VIEW_COUNTER_FLUSH_INTERVAL
+
+    def hit(self, book_id, count=1):
+        # 버퍼를 끈 경우(1 이하)는 예전처럼 바로 반영
+        if self.max_pending <= 1:
+            self._record({book_id: count})
+            return
+
+        with self._lock:
+            self._pending[book_id] += count
+            self._hits += count
+            due = (
+                self._hits >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.interval
+            )
+
+        self._start_flusher()
+        if due:
+            self.flush()
+
+    def pending(self, book_id):
+        with self._lock:
+            return self._pending.get(book_id, 0)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._hits = 0
+            self._last_flush = time.monotonic()
+
+        if not pending:
+            return 0
+
+        try:
+            return self._record(pending)
+        except Exception:
+            # DB 오류면 다음 flush 때 다시 시도하도록 되돌려 놓는다.
+            with self._lock:
+                self._pending.update(pending)
+                self._hits += sum(pending.values())
+            logger.exception("조회수 flush 실패 (%d권)", len(pending))
+            return 0
+
+    def _record(self, pending):
+        # 실패해서 다시 시도할 때 한쪽만 두 번 들어가지 않도록 같은 transaction으로 반영한다.
+        with transaction.atomic(savepoint=False):
+            updated = leaderboard.record_views(pending)
+            trending.record(trending.VIEW, pending)
+        versioning.bump(versioning.VIEWS)
+        return updated
+
+    def _start_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._run_flusher, name="view-counter-flusher", daemon=True
+            )
+        self._flusher.start()
+
+    def _run_flusher(self):
+        # 요청이 끊겨도 interval마다 남은 조회수를 내려보낸다.
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
@@ -1,103 +1,246 @@
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_list_or_404, get_object_or_404
-from django.db.models import Count, F
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Book, Category, Comment, Favorite
+from . import cache, export, fastjson, leaderboard, performance, recommender, search, trending, versioning
+from .cache import cached_response
+from .conditional import catalog_conditional
+from .models import Book, BookRecommendation, Category, Comment, Favorite
+from .pagination import get_page_size, keyset_page, paginated_response
+from .suggest import suggest_index
+from .viewcounter import view_counter
 from .serializers import (
     BookSerializer,
     BookDetailSerializer,
+    BookSearchSerializer,
     CommentSerializer,
     FavoriteBookSerializer,
     CategoryListSerializer,
+    FavoriteBatchSerializer,
     PopularBookSerializer,
 )
 
 
 def _popular_queryset():
-    # 기존 인기 TOP5 로직을 함수로 분리
-    return (
-        Book.objects
-        .annotate(comment_count=Count("comment"))  # 기존 코드 유지(현재 프로젝트에 맞춘 상태라고 가정)
-        .annotate(score=F("views") + F("comment_count"))
-        .order_by("-score", "-views", "-comment_count", "-id")
-    )
+    # score(= views + comment_count)는 leaderboard에서 미리 올려두기 때문에 인덱스만 타면 된다.
+    return Book.objects.order_by(*leaderboard.ORDERING)
 
 
 @api_view(["GET"])
+@catalog_conditional(versioning.CATALOG, versioning.VIEWS)
+@cached_response(versioning.CATALOG, versioning.VIEWS)
 def popular_books(request):
+    if fastjson.enabled():
+        names = fastjson.field_names(PopularBookSerializer)
+        return Response(fastjson.project(_popular_queryset().values(*names)[:5], names), status=status.HTTP_200_OK)
+
     book_queryset = _popular_queryset()[:5]
     serializer = PopularBookSerializer(book_queryset, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+@api_view(["GET"])
+@catalog_conditional(versioning.CATALOG, versioning.VIEWS)
+@cached_response(versioning.CATALOG, versioning.VIEWS)
+def trending_books(request):
+    """
+    GET /books/trending/?window=24h|7d&page_size=
+    최근 조회 / 댓글에 시간 감쇠를 준 점수(articles.trending) 순 TOP N
+    점수는 이벤트가 들어올 때 미리 더해 두기 때문에 (window, -score) 인덱스에서 N개만 읽는다.
+    """
+    window = request.query_params.get("window", "24h")
+    if window not in trending.windows():
+        raise ValidationError({"window": f"Must be one of: {', '.join(trending.windows())}"})
+
+    serializer = BookSerializer(trending.top(window, get_page_size(request)), many=True)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def recommended_books(request):
     """
     로그인 후:
-    - 즐겨찾기 작가(author) 기준으로 다른 도서 추천
+    - 즐겨찾기 협업 필터링(같은 책을 담은 사람들이 함께 담은 책) 기준으로 추천
+    - 부족하면 즐겨찾기 작가(author)의 다른 도서로 채우기
     - 즐겨찾기 없으면 인기 TOP5로 fallback
+    즐겨찾기가 바뀌기 전까지는 사용자별 캐시에서 바로 내려준다.
     """
     user = request.user
 
-    favorite_book_ids = list(
-        Favorite.objects.filter(user=user).values_list("book_id", flat=True)
+    data = recommender.get_cached(user.pk)
+    if data is None:
+        serializer = BookSerializer(recommender.recommend_for_user(user.pk), many=True)
+        data = list(serializer.data)
+        recommender.set_cached(user.pk, data)
+    return Response(data, status=status.HTTP_200_OK)
+
+
+def _requested_book_fields(request):
+    raw = request.query_params.get("fields")
+    if not raw:
+        return None
+
+    fields = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = set(fields) - set(BookSerializer.Meta.fields)
+    if unknown:
+        raise ValidationError({"fields": f"Unknown fields: {', '.join(sorted(unknown))}"})
+    return fields
+
+
+def _book_values_page(book_qs, ordering, fields, request):
+    # serializer 우회 경로: values()로 읽어서 정렬 키를 뺀 serializer 필드만 남긴다.
+    names = [name for name in fastjson.field_names(BookSerializer) if fields is None or name in fields]
+    keys = [item.lstrip("-") for item in ordering]
+    book_list, next_cursor = keyset_page(
+        book_qs.values(*dict.fromkeys([*keys, *names])),
+        ordering,
+        cursor=request.query_params.get("cursor"),
+        page_size=get_page_size(request),
     )
+    return fastjson.project(book_list, names), next_cursor
 
-    # 즐겨찾기 없으면 인기 TOP5 그대로 반환
-    if not favorite_book_ids:
-        serializer = BookSerializer(_popular_queryset()[:5], many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
 
-    favorite_authors = list(
-        Book.objects.filter(id__in=favorite_book_ids)
-        .values_list("author", flat=True)
-        .distinct()
+@api_view(["GET"])
+@catalog_conditional()
+@cached_response()
+def books(request):
+    """
+    GET /books/?cursor=&page_size=&fields=&category=&author=
+    - id 기준 keyset 페이지네이션 (다음 페이지는 X-Next-Cursor 헤더)
+    - category, author 필터는 (category, id), (author, id) 인덱스를 탄다.
+    """
+    fields = _requested_book_fields(request)
+    book_qs = Book.objects.all()
+
+    category = request.query_params.get("category")
+    if category:
+        if not category.isdigit():
+            raise ValidationError({"category": "A valid integer is required."})
+        book_qs = book_qs.filter(category_id=int(category))
+
+    author = request.query_params.get("author")
+    if author:
+        book_qs = book_qs.filter(author=author)
+
+    if fastjson.enabled():
+        return paginated_response(request, *_book_values_page(book_qs, ("id",), fields, request))
+
+    if fields is not None:
+        book_qs = book_qs.only("id", *fields)
+
+    book_list, next_cursor = keyset_page(
+        book_qs,
+        ("id",),
+        cursor=request.query_params.get("cursor"),
+        page_size=get_page_size(request),
     )
+    serializer = BookSerializer(book_list, many=True, fields=fields)
+    return paginated_response(request, serializer.data, next_cursor)
 
-    # 추천: 같은 작가의 다른 책(즐겨찾기 제외)
-    rec_qs = (
-        Book.objects.filter(author__in=favorite_authors)
-        .exclude(id__in=favorite_book_ids)
-        .order_by("-views", "-id")
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def books_export(request):
+    """
+    GET /books/export/?type=ndjson|csv&updated_since=2025-01-01T00:00:00
+    Book 전체 필드를 id 순으로 스트리밍한다. (목록을 메모리에 만들지 않음)
+    DRF가 format 파라미터를 응답 형식 선택에 쓰고 있어서 type으로 받는다.
+    """
+    export_type = request.query_params.get("type", "ndjson")
+    if export_type not in export.TYPES:
+        raise ValidationError({"type": f"Must be one of: {', '.join(export.TYPES)}"})
+
+    try:
+        updated_since = export.parse_updated_since(request.query_params.get("updated_since"))
+    except ValueError:
+        raise ValidationError({"updated_since": "A valid ISO 8601 date or datetime is required."})
+
+    response = StreamingHttpResponse(
+        export.stream(export_type, updated_since), content_type=export.TYPES[export_type]
     )
+    response["Content-Disposition"] = f'attachment; filename="books.{export_type}"'
+    return response
 
-    recommended_list = list(rec_qs[:5])
 
-    # 5개 미만이면 인기에서 채우기(중복/즐겨찾기 제외)
-    if len(recommended_list) < 5:
-        used_ids = set(favorite_book_ids) | {b.id for b in recommended_list}
-        filler_qs = _popular_queryset().exclude(id__in=used_ids)
-        recommended_list.extend(list(filler_qs[: 5 - len(recommended_list)]))
+@api_view(["GET"])
+def books_search(request):
+    """
+    GET /books/search/?q=&page_size=
+    FTS5 인덱스에서 관련도(bm25) 순으로 찾고, 제목/설명 일치 부분을 <mark>로 감싸서 내려준다.
+    """
+    q = request.query_params.get("q", "").strip()
+    if not q:
+        raise ValidationError({"q": "This field is required."})
 
-    serializer = BookSerializer(recommended_list, many=True)
+    book_list = search.search_books(q, get_page_size(request))
+    serializer = BookSearchSerializer(book_list, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
-def books(request):
-    book_list = get_list_or_404(Book)
-    serializer = BookSerializer(book_list, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+def books_suggest(request):
+    """
+    GET /books/suggest/?q=&page_size=
+    제목 / 부제 / 작가의 어절이 q로 시작하는 책 (입력 중인 글자도 자모 단위로 맞춤), 인기 순
+    프로세스 메모리의 접두어 색인(articles.suggest)에서 찾아서 DB를 보지 않는다.
+    """
+    q = request.query_params.get("q", "")
+    data = suggest_index.suggest(q, get_page_size(request, settings.SUGGEST_LIMIT))
+    return Response(data, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 def books_detail(request, book_pk):
-    Book.objects.filter(pk=book_pk).update(views=F("views") + 1)
-    book = get_object_or_404(Book, pk=book_pk)
+    # 조회수는 write-behind 버퍼에 쌓았다가 모아서 반영한다.
+    # 304로 끝나는 재방문도 조회수에는 포함되도록 조건부 GET 판단보다 먼저 센다.
+    view_counter.hit(book_pk)
+    return _book_detail_response(request, book_pk)
+
+
+@catalog_conditional(versioning.CATALOG, versioning.VIEWS)
+def _book_detail_response(request, book_pk):
+    book_qs = Book.objects.select_related("category").prefetch_related(
+        Prefetch(
+            "recommendation_links",
+            queryset=BookRecommendation.objects.select_related("to_book").order_by("rank", "id"),
+        )
+    )
+    book = get_object_or_404(book_qs, pk=book_pk)
+    pending = view_counter.pending(book.pk)
+    book.views += pending
+    book.score += pending
     serializer = BookDetailSerializer(book)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(["GET", "POST"])
 def comments(request, book_pk):
+    """
+    GET /books/<book_pk>/comments/?cursor=&page_size=
+    - 최신순 keyset 페이지네이션, (book, -id) 인덱스를 탄다. (다음 페이지는 X-Next-Cursor 헤더)
+    - 전체 댓글 수는 COUNT(*) 대신 Book.comment_count를 X-Total-Count 헤더로 내려준다.
+    """
     if request.method == "GET":
-        comment_list = Comment.objects.filter(book_id=book_pk).order_by("-id")
+        total = Book.objects.filter(pk=book_pk).values_list("comment_count", flat=True).first()
+        if total is None:
+            return Response({"detail": "Book not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        comment_list, next_cursor = keyset_page(
+            Comment.objects.filter(book_id=book_pk).select_related("user"),
+            ("-id",),
+            cursor=request.query_params.get("cursor"),
+            page_size=get_page_size(request, settings.COMMENTS_PAGE_SIZE),
+        )
         serializer = CommentSerializer(comment_list, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginated_response(request, serializer.data, next_cursor, headers={"X-Total-Count": str(total)})
 
     # POST
     if not request.user.is_authenticated:
@@ -105,7 +248,10 @@ def comments(request, book_pk):
 
     serializer = CommentSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    serializer.save(book_id=book_pk, user=request.user)
+    with transaction.atomic():
+        serializer.save(book_id=book_pk, user=request.user)
+        leaderboard.record_comments({book_pk: 1})
+        trending.record(trending.COMMENT, {book_pk: 1})
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
@@ -118,7 +264,11 @@ def delete_comment(request, comment_pk):
     if comment.user_id != request.user.id:
         return Response(status=status.HTTP_403_FORBIDDEN)
 
-    comment.delete()
+    with transaction.atomic():
+        # 같은 댓글 삭제 요청이 동시에 오면 한쪽은 지운 행이 없다. 그때는 개수를 줄이지 않는다.
+        deleted, _ = comment.delete()
+        if deleted:
+            leaderboard.record_comments({comment.book_id: -1})
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -127,7 +277,7 @@ def favorite(request):
     user = request.user
 
     if request.method == "GET":
-        favorite_books = Favorite.objects.filter(user=user)
+        favorite_books = Favorite.objects.filter(user=user).select_related("book")
         books = [favorite.book for favorite in favorite_books]
         serializer = BookSerializer(books, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -145,8 +295,121 @@ def favorite(request):
     return Response({"detail": "Book added to favorites."}, status=status.HTTP_201_CREATED)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def favorite_batch(request):
+    """
+    POST /favorites/batch/
+    {"operations": [{"op": "add" | "remove", "book_pk": 1}, ...]}
+    여러 건을 한 transaction으로 반영하고, 반영 후의 즐겨찾기 목록을 돌려준다.
+    같은 책에 작업이 여러 번 오면 마지막 작업만 반영한다.
+    """
+    user = request.user
+    serializer = FavoriteBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    final_ops = {}
+    for operation in serializer.validated_data["operations"]:
+        final_ops[operation["book_pk"]] = operation["op"]
+    add_ids = [book_pk for book_pk, op in final_ops.items() if op == "add"]
+    remove_ids = [book_pk for book_pk, op in final_ops.items() if op == "remove"]
+
+    with transaction.atomic():
+        if add_ids:
+            found_ids = set(Book.objects.filter(id__in=add_ids).values_list("id", flat=True))
+            unknown = sorted(set(add_ids) - found_ids)
+            if unknown:
+                raise ValidationError({"book_pk": f"Unknown books: {unknown}"})
+            Favorite.objects.bulk_create(
+                [Favorite(user=user, book_id=book_pk) for book_pk in add_ids],
+                ignore_conflicts=True,
+            )
+        if remove_ids:
+            Favorite.objects.filter(user=user, book_id__in=remove_ids).delete()
+
+    # bulk_create는 signal을 보내지 않아서 직접 무효화한다.
+    # (remove는 queryset.delete()가 지운 행마다 post_delete를 보내서 signals.py가 무효화한다.)
+    if add_ids:
+        versioning.bump(versioning.FAVORITES)
+        recommender.invalidate_user(user.pk)
+
+    favorite_books = Favorite.objects.filter(user=user).select_related("book")
+    serializer = BookSerializer([favorite.book for favorite in favorite_books], many=True)
+    return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 @api_view(["GET"])
+@catalog_conditional()
+@cached_response()
 def categories(request):
+    if fastjson.enabled():
+        rows = fastjson.Rows(Category.objects.values(*fastjson.field_names(CategoryListSerializer)))
+        if not rows:
+            raise Http404
+        return Response(rows, status=status.HTTP_200_OK)
+
     category_list = get_list_or_404(Category)
     serializer = CategoryListSerializer(category_list, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+# categories/<id>/books/ 정렬 기준 -> keyset 정렬 키 (Book.Meta의 (category, -key, -id) 인덱스와 같은 순서)
+CATEGORY_BOOK_ORDERINGS = {
+    "views": ("-views", "-id"),
+    "pub_date": ("-pub_date", "-id"),
+    # 평점 없는 책(NULL)은 review_rank = -1이라 맨 뒤
+    "rank": ("-review_rank", "-id"),
+}
+
+
+@api_view(["GET"])
+@catalog_conditional(versioning.CATALOG, versioning.VIEWS)
+@cached_response(versioning.CATALOG, versioning.VIEWS)
+def category_books(request, category_pk):
+    """
+    GET /categories/<category_pk>/books/?sort=views|pub_date|rank&cursor=&page_size=&fields=
+    - 카테고리 안에서 조회수 / 출간일 / 평점 내림차순 keyset 페이지네이션
+    - 평점이 없는 책(NULL)은 맨 뒤
+    """
+    sort = request.query_params.get("sort", "views")
+    if sort not in CATEGORY_BOOK_ORDERINGS:
+        raise ValidationError({"sort": f"Must be one of: {', '.join(CATEGORY_BOOK_ORDERINGS)}"})
+
+    ordering = CATEGORY_BOOK_ORDERINGS[sort]
+    fields = _requested_book_fields(request)
+    book_qs = Book.objects.filter(category_id=category_pk)
+    cursor = request.query_params.get("cursor")
+
+    if fastjson.enabled():
+        data, next_cursor = _book_values_page(book_qs, ordering, fields, request)
+    else:
+        if fields is not None:
+            # cursor를 만들려면 정렬 키도 읽어야 한다.
+            book_qs = book_qs.only("id", ordering[0].lstrip("-"), *fields)
+
+        book_list, next_cursor = keyset_page(
+            book_qs,
+            ordering,
+            cursor=cursor,
+            page_size=get_page_size(request),
+        )
+        data = BookSerializer(book_list, many=True, fields=fields).data
+
+    # 빈 첫 페이지일 때만 카테고리가 있는지 확인한다.
+    if not data and not cursor:
+        get_object_or_404(Category, pk=category_pk)
+    return paginated_response(request, data, next_cursor)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    # 응답 캐시 endpoint별 hit/miss (프로세스별 캐시 기준)
+    return Response(cache.stats(), status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def performance_stats(request):
+    # route별 최근 요청 지연 시간 백분위 / 평균 DB·serializer 시간 (프로세스별)
+    return Response(performance.route_stats.snapshot(), status=status.HTTP_200_OK)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -57,6 +58,109 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
+    # JSON 렌더링 시간을 Server-Timing에 넣고 fastjson.Rows를 orjson으로 인코딩한다. (articles.performance, articles.fastjson)
+    'DEFAULT_RENDERER_CLASSES': (
+        'articles.performance.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+}
+
+# books / books/popular / categories / categories/<id>/books 목록을 serializer 없이 values() + orjson으로 만든다.
+# (articles.fastjson, 출력은 serializer와 바이트 단위로 같음 / manage.py bench_fastjson)
+FAST_JSON_RESPONSES = os.getenv('FAST_JSON_RESPONSES', '') == '1'
+
+# Pagination
+BOOKS_PAGE_SIZE = 20
+COMMENTS_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# books_detail 조회수 write-behind 버퍼 (articles.viewcounter)
+# MAX_PENDING번 쌓이거나 FLUSH_INTERVAL초가 지나면 한 번에 반영한다.
+# 프로세스가 죽으면 대략 2 x MAX_PENDING까지 유실될 수 있고(articles.viewcounter), 1 이하로 두면 매번 바로 반영한다.
+VIEW_COUNTER_FLUSH_INTERVAL = 5
+VIEW_COUNTER_MAX_PENDING = 100
+
+# 조회 API 응답 캐시 (articles.cache)
+# 데이터 버전이 키에 들어가서 무효화는 signal이 하고, timeout은 안 쓰는 키를 치우는 용도
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'library-back',
+    },
+    # 사용자별 추천 결과: warm-up 명령과 다른 프로세스의 무효화가 보이도록 파일 캐시를 쓴다.
+    'recommendations': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'recommendations',
+    },
+}
+RESPONSE_CACHE_TIMEOUT = 60 * 10
+
+# 사용자별 추천 캐시 (articles.recommender, manage.py warm_recommendations)
+RECOMMENDATION_CACHE = 'recommendations'
+RECOMMENDATION_CACHE_TIMEOUT = 60 * 30
+
+# 즐겨찾기 협업 필터링 추천 (articles.recommender, manage.py build_recommendations)
+RECOMMENDER_TOP_K = 20
+RECOMMENDER_MAX_FAVORITES_PER_USER = 200
+RECOMMENDER_REFRESH_INTERVAL = 60
+
+# 최근 인기 도서 (articles.trending, GET /books/trending/?window=, manage.py rebuild_trending)
+# window 이름 -> 감쇠 시간 상수(시간): 이만큼 지난 조회 / 댓글의 가중치는 1/e
+TRENDING_WINDOWS = {"24h": 24, "7d": 24 * 7}
+TRENDING_EVENT_WEIGHTS = {"view": 1, "comment": 5}
+# compaction: COMPACT_INTERVAL초마다, HOURLY_HOURS보다 오래된 시간 bucket은 하루 단위로 합치고
+# RETENTION_DAYS보다 오래된 bucket은 지운다. REBASE_HOURS마다 점수 기준 시각을 옮기고 MIN_SCORE 미만 점수를 지운다.
+TRENDING_COMPACT_INTERVAL = 60 * 60
+TRENDING_HOURLY_HOURS = 48
+TRENDING_RETENTION_DAYS = 28
+TRENDING_REBASE_HOURS = 24 * 7
+TRENDING_MIN_SCORE = 0.01
+
+# 내용 기반 유사 도서 (articles.similarity, manage.py build_similar_books)
+BOOK_RECOMMENDS_TOP_K = 10
+SIMILARITY_DIMENSIONS = 1024
+
+# 도서 검색 (articles.search)
+# "fts": SQLite FTS5 / "ngram": 한국어 글자 n-gram 역색인 (manage.py build_ngram_index로 생성)
+BOOK_SEARCH_MODE = "fts"
+BOOK_SEARCH_NGRAM_SIZE = 2
+
+# 검색어 자동완성 (articles.suggest, GET /books/suggest/?q=)
+# 키는 자모 SUGGEST_KEY_LENGTH개까지만 저장한다.
+# 접두어 구간이 SUGGEST_MAX_SCAN개보다 길면(짧은 접두어) 구간 대신 인기 순으로 훑는다.
+# 바뀐 책이 SUGGEST_PENDING_MAX권 쌓이면 정렬 배열을 다시 합친다.
+SUGGEST_LIMIT = 10
+SUGGEST_KEY_LENGTH = 16
+SUGGEST_MAX_SCAN = 1000
+SUGGEST_PENDING_MAX = 1000
+SUGGEST_REFRESH_INTERVAL = 60
+
+# 알라딘 카탈로그 동기화 (articles.aladin, manage.py sync_aladin)
+# 로컬 테스트는 manage.py fake_aladin으로 띄운 서버 주소를 ALADIN_API_URL이나 --base-url로 넘긴다.
+ALADIN_API_URL = os.getenv('ALADIN_API_URL', 'http://www.aladin.co.kr/ttb/api/ItemSearch.aspx')
+ALADIN_TTB_KEY = os.getenv('ALADIN_TTB_KEY', '')
+ALADIN_SYNC_WORKERS = 4
+ALADIN_SYNC_RATE = 5  # 초당 요청 수
+
+# 요청별 성능 계측 (articles.performance.PerformanceMiddleware, GET /perf/stats/)
+# 모든 응답에 Server-Timing 헤더를 붙이고, LOG_THRESHOLD_MS 이상 걸린 요청만 articles.performance 로그로 남긴다. (0이면 전부)
+PERFORMANCE_WINDOW_MINUTES = 15
+PERFORMANCE_LOG_THRESHOLD_MS = float(os.getenv('PERFORMANCE_LOG_THRESHOLD_MS', 100))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'articles': {'handlers': ['console'], 'level': os.getenv('ARTICLES_LOG_LEVEL', 'INFO')},
+        'accounts': {'handlers': ['console'], 'level': 'INFO'},
+        'AIfeatures': {'handlers': ['console'], 'level': 'INFO'},
+    },
 }
 
 REST_AUTH = {
@@ -71,6 +175,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': False,
+    # 추천 캐시 warm-up 대상(최근 로그인 사용자)을 고르기 위해 로그인 시각을 남긴다.
+    'UPDATE_LAST_LOGIN': True,
 }
 
 
@@ -82,6 +188,8 @@ SIMPLE_JWT = {
 # }
 
 MIDDLEWARE = [
+    # 다른 middleware 시간까지 포함하도록 맨 앞에 둔다.
+    'articles.performance.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -95,6 +203,9 @@ MIDDLEWARE = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# keyset 페이지네이션 정보를 헤더로 내려주기 때문에 프론트에서 읽을 수 있게 열어준다.
+CORS_EXPOSE_HEADERS = ["X-Next-Cursor", "Link", "X-Total-Count", "Server-Timing"]
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173"
@@ -126,7 +237,8 @@ WSGI_APPLICATION = 'library_back.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # 벤치마크 / 합성 데이터용으로 다른 DB 파일을 쓰려면 LIBRARY_DB_PATH 지정
+        'NAME': os.getenv('LIBRARY_DB_PATH', BASE_DIR / 'db.sqlite3'),
     }
 }
 
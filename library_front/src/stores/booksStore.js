@@ -2,29 +2,75 @@ import { defineStore } from 'pinia'
 import api from '@/api/axios'
 import { normalizeBook, normalizeBookList } from '@/utils/adapters'
 
+const PAGE_SIZE = 40
+
 export const useBooksStore = defineStore('books', {
   state: () => ({
     books: [],
+    nextCursor: null,
     selectedBook: null,
+    suggestions: [],
+    suggestQuery: '',
     isLoading: false,
+    isLoadingMore: false,
     error: '',
   }),
 
+  getters: {
+    hasMoreBooks: (state) => Boolean(state.nextCursor),
+  },
+
   actions: {
+    // 목록은 cursor 페이지네이션: 첫 페이지만 받고, 다음 페이지는 fetchMoreBooks로 필요할 때 받는다.
     async fetchBooks() {
       this.isLoading = true
       this.error = ''
       try {
-        const response = await api.get('/articles/books/')
+        const response = await api.get('/articles/books/', { params: { page_size: PAGE_SIZE } })
         this.books = normalizeBookList(response.data)
+        this.nextCursor = response.headers['x-next-cursor'] ?? null
       } catch (error) {
         this.error = '도서 목록을 불러오지 못했습니다.'
         this.books = []
+        this.nextCursor = null
       } finally {
         this.isLoading = false
       }
     },
 
+    async fetchMoreBooks() {
+      if (!this.nextCursor || this.isLoadingMore) return
+      this.isLoadingMore = true
+      this.error = ''
+      try {
+        const response = await api.get('/articles/books/', {
+          params: { page_size: PAGE_SIZE, cursor: this.nextCursor },
+        })
+        this.books.push(...normalizeBookList(response.data))
+        this.nextCursor = response.headers['x-next-cursor'] ?? null
+      } catch (error) {
+        this.error = '도서 목록을 더 불러오지 못했습니다.'
+      } finally {
+        this.isLoadingMore = false
+      }
+    },
+
+    // 검색창 자동완성: 서버 메모리 색인이라 글자마다 불러도 된다. 늦게 도착한 이전 응답은 버린다.
+    async fetchSuggestions(q) {
+      const keyword = q.trim()
+      this.suggestQuery = keyword
+      if (!keyword) {
+        this.suggestions = []
+        return
+      }
+      try {
+        const response = await api.get('/articles/books/suggest/', { params: { q: keyword } })
+        if (this.suggestQuery === keyword) this.suggestions = response.data
+      } catch (error) {
+        this.suggestions = []
+      }
+    },
+
     async fetchBook(bookId) {
       this.isLoading = true
       this.error = ''
@@ -5,26 +5,33 @@ import { useAuthStore } from "@/stores/authStore";
 export const useCommentsStore = defineStore("comments", {
   state: () => ({
     items: [],
+    // cursor 페이지네이션: 다음 페이지 cursor / 전체 댓글 수 (응답 헤더)
+    nextCursor: null,
+    total: 0,
     isLoading: false,
     error: "",
   }),
 
   actions: {
-    async fetchByBook(bookId) {
+    async fetchByBook(bookId, { append = false } = {}) {
       this.isLoading = true;
       this.error = "";
 
       try {
-        const response = await api.get(`/articles/books/${bookId}/comments/`);
+        const cursor = append ? this.nextCursor : null;
+        const response = await api.get(`/articles/books/${bookId}/comments/`, {
+          params: cursor ? { cursor } : {},
+        });
         const data = response.data;
+        const page = Array.isArray(data) ? data : data?.results ?? [];
 
-        if (Array.isArray(data)) {
-          this.items = data;
-        } else {
-          this.items = data?.results ?? [];
-        }
+        this.items = append ? [...this.items, ...page] : page;
+        this.nextCursor = response.headers["x-next-cursor"] ?? null;
+        this.total = Number(response.headers["x-total-count"] ?? this.items.length);
       } catch (error) {
         this.items = [];
+        this.nextCursor = null;
+        this.total = 0;
         this.error = "댓글을 불러오지 못했습니다.";
       } finally {
         this.isLoading = false;
@@ -52,6 +59,7 @@ export const useCommentsStore = defineStore("comments", {
 
       // 작성 즉시 화면 반영
       this.items.unshift(response.data);
+      this.total += 1;
       return response.data;
     },
 
@@ -64,6 +72,7 @@ export const useCommentsStore = defineStore("comments", {
 
       await api.delete(`/articles/comments/${commentId}/`, { headers });
       this.items = this.items.filter((comment) => comment.id !== commentId);
+      this.total = Math.max(0, this.total - 1);
     },
   },
 });
@@ -30,6 +30,8 @@ export function normalizeBook(rawBook) {
     pubDate: rawBook.pub_date ?? rawBook.pubDate ?? '',
     categoryId: rawBook.category ?? rawBook.categoryId ?? null,
     recommends: Array.isArray(rawBook.recommends) ? rawBook.recommends : [],
+    // 상세 응답의 유사 도서 (id / title / author / cover)
+    relatedBooks: Array.isArray(rawBook.related_books) ? rawBook.related_books.map(normalizeBook) : [],
   }
 }
 